@@ -13,7 +13,8 @@ package.domain = org.test
 source.dir = .
 
 # (list) Source files to include (let empty to include all the files)
-source.include_exts = py,png,jpg,kv,atlas
+# 应用只有 Python 源码，模板图片由用户在手机上选择，不随包发布
+source.include_exts = py
 
 # (list) List of inclusions using pattern matching
 #source.include_patterns = assets/*,images/*.png
@@ -22,17 +23,20 @@ source.include_exts = py,png,jpg,kv,atlas
 #source.exclude_exts = spec
 
 # (list) List of directory to exclude (let empty to not exclude anything)
-#source.exclude_dirs = tests, bin, venv
+source.exclude_dirs = bin, venv, __pycache__, .buildozer, .git, tests
 
 # (list) List of exclusions using pattern matching
-#source.exclude_patterns = license,images/*/*.jpg
+# 只打包 main.py 与手机连点器用到的模块，桌面端（Tk / pyautogui / pynput）、
+# 跳一跳游戏和开发工具不进入 APK
+source.exclude_patterns = legacy_projects/jump_*.py,legacy_projects/number_random.py,legacy_projects/particles.py,legacy_projects/spatial_index.py,legacy_projects/click_macro.py,legacy_projects/startup.py,legacy_projects/number_solver.py,legacy_projects/number_server.py
 
 # (str) Application versioning (method 1)
 version = 0.1
 
 # (list) Application requirements
 # comma separated e.g. requirements = sqlite3,kivy
-requirements = python3,kivy
+# 模板定位（vision.py）需要 NumPy
+requirements = python3,kivy,numpy
 
 # (str) Custom source folders for requirements
 # Sets custom source for any requirements with recipes
@@ -108,6 +112,10 @@ android.minapi = 21
 # buildozer.
 # android.accept_sdk_license = False
 
+# (bool) Skip byte compile for .py files
+# 保持默认的预编译：APK 中只放 .pyc，手机上第一次启动不需要再编译源码
+android.no-byte-compile-python = False
+
 # (str) Android entry point, default is ok for Kivy-based app
 #android.entrypoint = org.kivy.android.PythonActivity
 
@@ -0,0 +1,629 @@
+"""Android 触摸注入后端
+
+os.system("input tap x y") 每次都要新建一个 shell，再启动一个 input 的 Java
+进程，单次约 100~300 ms。这里提供三种更快的方式：
+
+    ShellInjector   常驻一个 sh / su 子进程，把 input 命令逐行写进去，省掉
+                    每次新建 shell 的开销（input 本身的启动开销仍在）
+    RawInjector     直接向 /dev/input/eventN 写 input_event 结构体（多点触控
+                    B 协议），没有 root 时借助常驻的 `su -c 'cat > 设备'` 管道，
+                    每秒可以注入数百次点击
+    SystemInjector  原来的 os.system 方式，作为最后的后备
+
+FakeTouchDevice 在本机创建一个命名管道冒充触摸屏并解码写入的事件，可以在
+普通 Linux 上测试 RawInjector 的完整链路：
+
+    python -m legacy_projects.android_input        # 用假设备测量各后端速率
+"""
+import os
+import re
+import select
+import shlex
+import struct
+import subprocess
+import tempfile
+import threading
+import time
+from collections import namedtuple
+
+# struct input_event { struct timeval time; __u16 type; __u16 code; __s32 value; }
+# 使用本机字长（64 位系统为 24 字节），时间戳填 0 由内核补上
+EVENT = struct.Struct('llHHi')
+
+EV_SYN = 0x00
+EV_KEY = 0x01
+EV_ABS = 0x03
+SYN_REPORT = 0x00
+BTN_TOUCH = 0x14a
+BTN_TOOL_FINGER = 0x145
+ABS_MT_SLOT = 0x2f
+ABS_MT_TOUCH_MAJOR = 0x30
+ABS_MT_POSITION_X = 0x35
+ABS_MT_POSITION_Y = 0x36
+ABS_MT_TRACKING_ID = 0x39
+ABS_MT_PRESSURE = 0x3a
+
+# 管道单次写入不超过 PIPE_BUF 时是原子的，批量写入按事件大小对齐后分块
+PIPE_BUF = 4096
+WRITE_CHUNK = PIPE_BUF // EVENT.size * EVENT.size
+
+Axis = namedtuple('Axis', 'minimum maximum')
+
+
+class InjectError(Exception):
+    """注入后端不可用或写入失败"""
+
+
+class ShellSession:
+    """常驻的 sh / su 子进程，命令通过标准输入逐行写入"""
+
+    _counter = 0
+
+    def __init__(self, su=False, shell='sh'):
+        args = ['su'] if su else [shell]
+        try:
+            self.proc = subprocess.Popen(args, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                         stderr=subprocess.DEVNULL)
+        except OSError as e:
+            raise InjectError(f"无法启动 {args[0]}: {e}") from e
+        self.lock = threading.Lock()
+        self._pending = b''  # call() 已读入但还没处理的输出
+
+    def run(self, command, flush=True):
+        """异步执行命令，不等待结果（输出被丢弃）"""
+        self._write(f"{command} >/dev/null 2>&1\n".encode(), flush)
+
+    def run_many(self, commands):
+        """一次写入多条命令"""
+        self._write(''.join(f"{c} >/dev/null 2>&1\n" for c in commands).encode(), True)
+
+    def call(self, command, timeout=5.0):
+        """执行命令并返回其标准输出（文本）
+
+        用 select 等待管道可读，超时（例如 su 在等授权弹窗）后结束子进程，
+        之后这个会话不能再使用。
+        """
+        ShellSession._counter += 1
+        marker = f"__END_{os.getpid()}_{ShellSession._counter}__"
+        end = marker.encode()
+        with self.lock:
+            if self.proc.poll() is not None:
+                raise InjectError("shell 已退出")
+            self._write(f"{command} 2>/dev/null; echo {marker}\n".encode(), True, locked=True)
+            deadline = time.monotonic() + timeout
+            fd = self.proc.stdout.fileno()
+            lines = []
+            while True:
+                line, sep, rest = self._pending.partition(b'\n')
+                if sep:
+                    self._pending = rest
+                    if line.endswith(end):
+                        # 输出末尾没有换行时标记会接在最后一行后面
+                        if len(line) > len(end):
+                            lines.append(line[:-len(end)].decode(errors='replace'))
+                        return '\n'.join(lines)
+                    lines.append(line.decode(errors='replace'))
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+                    self.kill()
+                    raise InjectError(f"命令超时: {command}")
+                chunk = os.read(fd, 4096)
+                if not chunk:
+                    raise InjectError("shell 已退出")
+                self._pending += chunk
+
+    def _write(self, data, flush, locked=False):
+        try:
+            if locked:
+                self.proc.stdin.write(data)
+                if flush:
+                    self.proc.stdin.flush()
+            else:
+                with self.lock:
+                    self.proc.stdin.write(data)
+                    if flush:
+                        self.proc.stdin.flush()
+        except (BrokenPipeError, ValueError) as e:
+            raise InjectError("shell 已退出") from e
+
+    def flush(self):
+        with self.lock:
+            self.proc.stdin.flush()
+
+    def wait_idle(self, timeout=30.0):
+        """等待已写入的命令全部执行完"""
+        self.call(':', timeout)
+
+    def kill(self):
+        """立即结束子进程，不等待已写入的命令"""
+        if self.proc.poll() is None:
+            self.proc.kill()
+            self.proc.wait()
+
+    def close(self):
+        if self.proc.poll() is None:
+            try:
+                self.proc.stdin.write(b"exit\n")
+                self.proc.stdin.close()
+            except (BrokenPipeError, ValueError):
+                pass
+            try:
+                self.proc.wait(2)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TouchDevice:
+    """触摸屏设备信息：设备节点、坐标范围，以及屏幕像素到设备坐标的换算"""
+
+    def __init__(self, path, x_axis, y_axis, slots=10, has_pressure=False,
+                 has_touch_major=False, screen_size=None):
+        self.path = path
+        self.x_axis = x_axis
+        self.y_axis = y_axis
+        self.slots = slots
+        self.has_pressure = has_pressure
+        self.has_touch_major = has_touch_major
+        # 屏幕像素尺寸 (宽, 高)，未知时认为设备坐标就是像素坐标
+        self.screen_size = screen_size
+
+    def to_device(self, x, y):
+        """屏幕像素坐标 -> 设备坐标"""
+        if self.screen_size is None:
+            return int(x), int(y)
+        width, height = self.screen_size
+        xa, ya = self.x_axis, self.y_axis
+        dx = xa.minimum + x * (xa.maximum - xa.minimum + 1) // width
+        dy = ya.minimum + y * (ya.maximum - ya.minimum + 1) // height
+        return min(max(dx, xa.minimum), xa.maximum), min(max(dy, ya.minimum), ya.maximum)
+
+    def __repr__(self):
+        return (f"TouchDevice({self.path!r}, x={self.x_axis.minimum}..{self.x_axis.maximum}, "
+                f"y={self.y_axis.minimum}..{self.y_axis.maximum})")
+
+
+_ADD_DEVICE = re.compile(r'add device \d+:\s*(\S+)')
+_ABS_LINE = re.compile(r'(ABS_MT_\w+)\s*:\s*value -?\d+, min (-?\d+), max (-?\d+)')
+_WM_SIZE = re.compile(r'(?:Override|Physical) size:\s*(\d+)x(\d+)')
+
+
+def parse_getevent(text):
+    """解析 `getevent -pl` 的输出，返回第一个多点触控设备，没有时返回 None"""
+    devices = []
+    current = None
+    for line in text.splitlines():
+        match = _ADD_DEVICE.search(line)
+        if match:
+            current = {'path': match.group(1), 'abs': {}}
+            devices.append(current)
+            continue
+        match = _ABS_LINE.search(line)
+        if match and current is not None:
+            current['abs'][match.group(1)] = Axis(int(match.group(2)), int(match.group(3)))
+    for device in devices:
+        axes = device['abs']
+        if 'ABS_MT_POSITION_X' in axes and 'ABS_MT_POSITION_Y' in axes:
+            slot = axes.get('ABS_MT_SLOT')
+            return TouchDevice(device['path'], axes['ABS_MT_POSITION_X'],
+                               axes['ABS_MT_POSITION_Y'],
+                               slots=slot.maximum + 1 if slot else 1,
+                               has_pressure='ABS_MT_PRESSURE' in axes,
+                               has_touch_major='ABS_MT_TOUCH_MAJOR' in axes)
+    return None
+
+
+def probe_touch_device(session):
+    """通过 shell 找到触摸屏设备并读取屏幕尺寸"""
+    device = parse_getevent(session.call('getevent -pl'))
+    if device is None:
+        return None
+    sizes = _WM_SIZE.findall(session.call('wm size'))
+    if sizes:
+        # 有 Override 时以最后一行（覆盖值）为准
+        device.screen_size = tuple(int(v) for v in sizes[-1])
+    return device
+
+
+class RawInjector:
+    """直接写 /dev/input/eventN 的多点触控注入（B 协议，只使用 0 号触点）"""
+
+    name = 'raw'
+
+    def __init__(self, stream, device, owner=None):
+        self.stream = stream
+        self.device = device
+        self.owner = owner  # 持有管道的 su / sh 进程
+        self.tracking_id = 0
+        self.touching = False
+        self.pending = bytearray()
+        self._release = self._pack(
+            (EV_ABS, ABS_MT_TRACKING_ID, -1), (EV_KEY, BTN_TOUCH, 0),
+            (EV_KEY, BTN_TOOL_FINGER, 0), (EV_SYN, SYN_REPORT, 0))
+
+    @classmethod
+    def open(cls, device, su=False, shell='sh'):
+        """打开设备节点：能直接写就直接写，否则通过常驻的 cat 管道写入"""
+        if not su and os.access(device.path, os.W_OK):
+            return cls(open(device.path, 'wb', buffering=0), device)
+        args = ['su', '-c'] if su else [shell, '-c']
+        try:
+            proc = subprocess.Popen(args + [f"cat > {shlex.quote(device.path)}"],
+                                    stdin=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                    bufsize=0)
+        except OSError as e:
+            raise InjectError(f"无法打开 {device.path}: {e}") from e
+        return cls(proc.stdin, device, proc)
+
+    @staticmethod
+    def _pack(*events):
+        pack = EVENT.pack
+        return b''.join(pack(0, 0, type_, code, value) for type_, code, value in events)
+
+    def _contact(self, x, y):
+        dx, dy = self.device.to_device(x, y)
+        events = [(EV_ABS, ABS_MT_POSITION_X, dx), (EV_ABS, ABS_MT_POSITION_Y, dy)]
+        if self.device.has_touch_major:
+            events.append((EV_ABS, ABS_MT_TOUCH_MAJOR, 5))
+        if self.device.has_pressure:
+            events.append((EV_ABS, ABS_MT_PRESSURE, 50))
+        return events
+
+    def _down_events(self, x, y):
+        self.tracking_id = (self.tracking_id + 1) & 0xFFFF
+        return self._pack((EV_ABS, ABS_MT_SLOT, 0),
+                          (EV_ABS, ABS_MT_TRACKING_ID, self.tracking_id),
+                          *self._contact(x, y),
+                          (EV_KEY, BTN_TOUCH, 1), (EV_KEY, BTN_TOOL_FINGER, 1),
+                          (EV_SYN, SYN_REPORT, 0))
+
+    def down(self, x, y, flush=True):
+        if self.touching:
+            self.up(flush=False)
+        self.pending += self._down_events(x, y)
+        self.touching = True
+        if flush:
+            self.flush()
+
+    def move(self, x, y, flush=True):
+        if not self.touching:
+            return self.down(x, y, flush)
+        self.pending += self._pack(*self._contact(x, y), (EV_SYN, SYN_REPORT, 0))
+        if flush:
+            self.flush()
+
+    def up(self, x=0, y=0, flush=True):
+        """抬起手指（坐标仅为与其他后端接口一致，这里不使用）"""
+        if self.touching:
+            self.pending += self._release
+            self.touching = False
+        if flush:
+            self.flush()
+
+    def tap(self, x, y, flush=True):
+        self.down(x, y, flush=False)
+        self.up(flush=flush)
+
+    def tap_many(self, points):
+        """一次写入多次点击"""
+        for x, y in points:
+            self.tap(x, y, flush=False)
+        self.flush()
+
+    def flush(self):
+        data = self.pending
+        if not data:
+            return
+        self.pending = bytearray()
+        try:
+            for start in range(0, len(data), WRITE_CHUNK):
+                self.stream.write(data[start:start + WRITE_CHUNK])
+        except (BrokenPipeError, OSError, ValueError) as e:
+            raise InjectError(f"写入 {self.device.path} 失败: {e}") from e
+
+    def close(self):
+        try:
+            self.up()
+        except InjectError:
+            pass
+        self.stream.close()
+        if self.owner is not None:
+            try:
+                self.owner.wait(2)
+            except subprocess.TimeoutExpired:
+                self.owner.kill()
+
+
+class ShellInjector:
+    """通过常驻 shell 执行 input 命令
+
+    down/move/up 使用 `input motionevent`（Android 11 及以上）。
+    input_command 可以换成其他命令，便于在非 Android 环境中测量 shell 开销。
+    """
+
+    name = 'shell'
+
+    def __init__(self, session, input_command='input'):
+        self.session = session
+        self.input_command = input_command
+
+    def tap(self, x, y, flush=True):
+        self.session.run(f"{self.input_command} tap {int(x)} {int(y)}", flush)
+
+    def tap_many(self, points):
+        self.session.run_many(f"{self.input_command} tap {int(x)} {int(y)}" for x, y in points)
+
+    def down(self, x, y, flush=True):
+        self.session.run(f"{self.input_command} motionevent DOWN {int(x)} {int(y)}", flush)
+
+    def move(self, x, y, flush=True):
+        self.session.run(f"{self.input_command} motionevent MOVE {int(x)} {int(y)}", flush)
+
+    def up(self, x=0, y=0, flush=True):
+        self.session.run(f"{self.input_command} motionevent UP {int(x)} {int(y)}", flush)
+
+    def flush(self):
+        self.session.flush()
+
+    def close(self):
+        self.session.close()
+
+
+class SystemInjector:
+    """每次点击调用一次 os.system（原来的实现）"""
+
+    name = 'system'
+
+    def __init__(self, input_command='input'):
+        self.input_command = input_command
+
+    def tap(self, x, y, flush=True):
+        os.system(f"{self.input_command} tap {int(x)} {int(y)}")
+
+    def tap_many(self, points):
+        for x, y in points:
+            self.tap(x, y)
+
+    def down(self, x, y, flush=True):
+        os.system(f"{self.input_command} motionevent DOWN {int(x)} {int(y)}")
+
+    def move(self, x, y, flush=True):
+        os.system(f"{self.input_command} motionevent MOVE {int(x)} {int(y)}")
+
+    def up(self, x=0, y=0, flush=True):
+        os.system(f"{self.input_command} motionevent UP {int(x)} {int(y)}")
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def create_injector(backend='auto', su=True):
+    """按 backend（'auto' / 'raw' / 'shell' / 'system'）创建注入器
+
+    'auto' 依次尝试 raw、shell，最后退回 system。
+    """
+    if backend in ('auto', 'raw'):
+        session = None
+        try:
+            session = ShellSession(su=su)
+            device = probe_touch_device(session)
+            if device is None:
+                raise InjectError("没有找到触摸屏设备")
+            injector = RawInjector.open(device, su=su)
+            session.close()
+            return injector
+        except InjectError:
+            if session is not None:
+                session.close()
+            if backend == 'raw':
+                raise
+    if backend in ('auto', 'shell'):
+        try:
+            return ShellInjector(ShellSession(su=su))
+        except InjectError:
+            if su:
+                try:
+                    return ShellInjector(ShellSession(su=False))
+                except InjectError:
+                    pass
+            if backend == 'shell':
+                raise
+    return SystemInjector()
+
+
+class LazyInjector:
+    """第一次使用时才创建后端的注入器，可在多个任务之间共用
+
+    create_injector 需要启动 su、探测设备，可能较慢，适合放在后台线程中先调用 open()。
+    """
+
+    def __init__(self, backend='auto', su=True):
+        self.backend = backend
+        self.su = su
+        self.injector = None
+        self.lock = threading.Lock()
+
+    @property
+    def name(self):
+        return self.open().name
+
+    def open(self):
+        with self.lock:
+            if self.injector is None:
+                self.injector = create_injector(self.backend, self.su)
+            return self.injector
+
+    def tap(self, x, y, flush=True):
+        (self.injector or self.open()).tap(x, y, flush)
+
+    def tap_many(self, points):
+        (self.injector or self.open()).tap_many(points)
+
+    def down(self, x, y, flush=True):
+        (self.injector or self.open()).down(x, y, flush)
+
+    def move(self, x, y, flush=True):
+        (self.injector or self.open()).move(x, y, flush)
+
+    def up(self, x=0, y=0, flush=True):
+        (self.injector or self.open()).up(x, y, flush)
+
+    def flush(self):
+        if self.injector is not None:
+            self.injector.flush()
+
+    def close(self):
+        with self.lock:
+            injector, self.injector = self.injector, None
+        if injector is not None:
+            injector.close()
+
+
+class FakeTouchDevice:
+    """本机命名管道冒充的触摸屏：后台线程解码写入的事件并记录完整的点击"""
+
+    def __init__(self, width=1080, height=2400, x_max=4095, y_max=4095):
+        self.dir = tempfile.mkdtemp(prefix='fake_input_')
+        self.path = os.path.join(self.dir, 'event0')
+        os.mkfifo(self.path)
+        self.device = TouchDevice(self.path, Axis(0, x_max), Axis(0, y_max), slots=10,
+                                  has_pressure=True, screen_size=(width, height))
+        self.taps = []      # (x, y) 设备坐标
+        self.events = 0
+        self.errors = 0
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._read, daemon=True)
+        self._thread.start()
+
+    def getevent_text(self):
+        """与 `getevent -pl` 格式相同的设备描述"""
+        xa, ya = self.device.x_axis, self.device.y_axis
+        return (f"add device 1: {self.path}\n"
+                f"  name:     \"fake_touch\"\n"
+                f"  events:\n"
+                f"    ABS (0003): ABS_MT_SLOT           : value 0, min 0, max 9, fuzz 0\n"
+                f"                ABS_MT_POSITION_X     : value 0, min {xa.minimum}, "
+                f"max {xa.maximum}, fuzz 0\n"
+                f"                ABS_MT_POSITION_Y     : value 0, min {ya.minimum}, "
+                f"max {ya.maximum}, fuzz 0\n"
+                f"                ABS_MT_TRACKING_ID    : value 0, min 0, max 65535, fuzz 0\n"
+                f"                ABS_MT_PRESSURE       : value 0, min 0, max 255, fuzz 0\n")
+
+    def _read(self):
+        size = EVENT.size
+        x = y = None
+        down = False
+        buffer = b''
+        # 打开 FIFO 会阻塞到写端出现；写端全部关闭后继续等待下一个写端
+        while not self._done.is_set():
+            with open(self.path, 'rb', buffering=0) as fifo:
+                while True:
+                    data = fifo.read(65536)
+                    if not data:
+                        break
+                    buffer += data
+                    usable = len(buffer) - len(buffer) % size
+                    for _, _, type_, code, value in EVENT.iter_unpack(buffer[:usable]):
+                        self.events += 1
+                        if type_ == EV_ABS:
+                            if code == ABS_MT_POSITION_X:
+                                x = value
+                            elif code == ABS_MT_POSITION_Y:
+                                y = value
+                            elif code == ABS_MT_TRACKING_ID:
+                                if value >= 0:
+                                    down = True
+                                elif down:
+                                    self.taps.append((x, y))
+                                    down = False
+                        elif type_ not in (EV_SYN, EV_KEY):
+                            self.errors += 1
+                    buffer = buffer[usable:]
+
+    def wait_for(self, taps, timeout=10.0):
+        """等到收到 taps 次点击，返回是否等到"""
+        deadline = time.monotonic() + timeout
+        while len(self.taps) < taps:
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.001)
+        return True
+
+    def close(self):
+        self._done.set()
+        try:
+            # 打开一次写端，让阻塞在 open 上的读线程退出
+            fd = os.open(self.path, os.O_WRONLY | os.O_NONBLOCK)
+            os.close(fd)
+        except OSError:
+            pass
+        self._thread.join(1)
+        try:
+            os.unlink(self.path)
+            os.rmdir(self.dir)
+        except OSError:
+            pass
+
+
+def _measure(injector, taps, batch):
+    points = [(540 + i % 7, 1200 + i % 11) for i in range(batch)]
+    start = time.perf_counter()
+    for _ in range(taps // batch):
+        if batch > 1:
+            injector.tap_many(points)
+        else:
+            injector.tap(*points[0])
+    return time.perf_counter() - start
+
+
+def main():
+    print(f"{'backend':<22} {'taps':>6} {'seconds':>8} {'taps/s':>10}")
+
+    def report(label, taps, seconds):
+        print(f"{label:<22} {taps:>6} {seconds:>8.3f} {taps / seconds:>10.0f}")
+
+    fake = FakeTouchDevice()
+    try:
+        device = parse_getevent(fake.getevent_text())
+        device.screen_size = fake.device.screen_size
+        for label, su in (('raw (direct)', None), ('raw (sh cat pipe)', False)):
+            expected = len(fake.taps) + 2000
+            if su is None:
+                injector = RawInjector(open(device.path, 'wb', buffering=0), device)
+            else:
+                injector = RawInjector.open(device, su=su)
+            seconds = _measure(injector, 2000, 1)
+            injector.close()
+            ok = fake.wait_for(expected)
+            report(label + ('' if ok else ' (丢失)'), 2000, seconds)
+        injector = RawInjector(open(device.path, 'wb', buffering=0), device)
+        report('raw (batch 50)', 20000, _measure(injector, 20000, 50))
+        injector.close()
+    finally:
+        fake.close()
+
+    # 没有 input 命令时用 shell 内置的空命令 ':' 测量启动开销
+    session = ShellSession()
+    injector = ShellInjector(session, input_command=':')
+    start = time.perf_counter()
+    for _ in range(2000):
+        injector.tap(540, 1200)
+    session.wait_idle()
+    report('shell session (:)', 2000, time.perf_counter() - start)
+    injector.close()
+
+    injector = SystemInjector(input_command=':')
+    report('os.system (:)', 200, _measure(injector, 200, 1))
+
+
+if __name__ == '__main__':
+    main()
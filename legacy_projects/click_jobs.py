@@ -0,0 +1,331 @@
+"""连点任务的 asyncio 执行核心
+
+JobEngine 在自己的守护线程里运行一个 asyncio 事件循环，可以同时运行多个
+互不相关、各自节拍的 ClickJob，并支持取消、暂停和继续。点击动作默认放到
+一个单线程执行器中执行（同一时刻只有一个注入动作，不会阻塞事件循环）。
+
+界面不会每次点击都收到通知：状态由一个定时任务按 status_interval 汇总，
+有变化时以键 'jobs' 发布到 ProgressChannel（只保留最新值），界面按自己的
+刷新频率（Tk 的 after 或 Kivy 的 Clock）取用。每次点击可以选择记录到 RingLog。
+
+    channel = ProgressChannel()
+    channel.attach_tk(root, lambda key, statuses: show(statuses))
+    engine = JobEngine(channel)
+    job = engine.submit(ClickJob.uniform('left', 100, 5.0, pyautogui.click))
+    job.pause(); job.resume(); job.cancel()
+    engine.shutdown()
+"""
+import asyncio
+import threading
+import time
+from array import array
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+
+try:
+    from legacy_projects.click_scheduler import CATCH_UP, SKIP, ScheduleReport
+    from legacy_projects.progress import RateMeter
+except ImportError:
+    # 作为普通脚本运行时的路径处理
+    from click_scheduler import CATCH_UP, SKIP, ScheduleReport
+    from progress import RateMeter
+
+PENDING = 'pending'
+RUNNING = 'running'
+PAUSED = 'paused'
+DONE = 'done'
+CANCELLED = 'cancelled'
+FAILED = 'failed'
+FINISHED = (DONE, CANCELLED, FAILED)
+
+# cps 为最近两秒的速率，eta 为预计剩余秒数（未知时为 None）
+JobStatus = namedtuple('JobStatus', 'id name state done planned cps eta missed error')
+
+
+class ClickJob:
+    """一个按节拍执行的点击任务
+
+    events 为 (相对起点的纳秒, 事件) 的可迭代对象（可以是生成器），到点后调用
+    action(事件)。setup 为可选的准备动作（如打开注入后端），在执行器中于开始
+    计时前运行。blocking=False 表示 action 很快，直接在事件循环中调用。
+    log 为可选的 RingLog，每次点击记录 (任务编号, 事件, 延迟纳秒)。
+    """
+
+    _next_id = 0
+
+    def __init__(self, name, events, action, planned=None, start_delay=0.0, policy=CATCH_UP,
+                 blocking=True, tolerance_ms=2.0, setup=None, log=None):
+        if policy not in (CATCH_UP, SKIP):
+            raise ValueError(f"未知的调度策略: {policy}")
+        ClickJob._next_id += 1
+        self.id = ClickJob._next_id
+        self.name = name
+        self.events = events
+        self.action = action
+        self.planned = planned
+        self.start_delay = start_delay
+        self.policy = policy
+        self.blocking = blocking
+        self.tolerance_ns = int(tolerance_ms * 1e6)
+        self.setup = setup
+        self.log = log
+        self.meter = RateMeter()
+        self.state = PENDING
+        self.done = 0
+        self.missed = 0
+        self.skipped = 0
+        self.lateness = array('q')
+        self.error = None
+        self.report = None
+        self.started_ns = 0
+        self.engine = None
+        self.task = None
+        # 未暂停时置位；暂停时清除，_sleep_until 等待它重新置位
+        self._resume = asyncio.Event()
+        self._resume.set()
+        self._paused_at = None
+
+    @classmethod
+    def uniform(cls, name, count, duration, action, **kwargs):
+        """count 次点击均匀分布在 duration 秒内，action 不带参数"""
+        interval = int(duration * 1e9 / count) if count > 0 else 0
+        events = zip(range(0, count * interval, interval) if interval else repeat(0, count),
+                     repeat(None))
+        return cls(name, events, lambda _: action(), planned=count, **kwargs)
+
+    @classmethod
+    def from_timeline(cls, name, timeline, backend, **kwargs):
+        """执行 click_script 编译出的时间线"""
+        handlers = (backend.tap, backend.down, backend.move, backend.up)
+        ops, xs, ys = timeline.ops, timeline.xs, timeline.ys
+        return cls(name, zip(timeline.times_ns, range(len(timeline))),
+                   lambda i: handlers[ops[i]](xs[i], ys[i]), planned=len(timeline), **kwargs)
+
+    # 以下控制方法可以在任意线程调用
+    def pause(self):
+        self._call(self._pause)
+
+    def resume(self):
+        self._call(self._resume_now)
+
+    def toggle_pause(self):
+        self._call(self._resume_now if self.state == PAUSED else self._pause)
+
+    def cancel(self):
+        self._call(lambda: self.task is not None and self.task.cancel())
+
+    def _call(self, fn):
+        if self.engine is not None and self.state not in FINISHED:
+            self.engine.loop.call_soon_threadsafe(fn)
+
+    def _pause(self):
+        if self.state in (PENDING, RUNNING):
+            self._paused_at = time.perf_counter_ns()
+            self._resume.clear()
+            self._set_state(PAUSED)
+
+    def _resume_now(self):
+        if self.state == PAUSED:
+            # 暂停的时间整体顺延到后面所有的截止时间上；started_ns 为 0 表示还在
+            # 等待或准备（setup）中，计时尚未开始，不需要顺延
+            if self.started_ns:
+                self.started_ns += time.perf_counter_ns() - self._paused_at
+            self._paused_at = None
+            self._set_state(RUNNING)
+            self._resume.set()
+
+    def _set_state(self, state):
+        self.state = state
+        if self.engine is not None:
+            self.engine.dirty = True
+
+    def status(self):
+        if self.report is not None:
+            cps, eta = self.report.cps, 0.0
+        elif self.state == RUNNING and time.perf_counter_ns() >= self.started_ns > 0:
+            cps = self.meter.update(self.done)
+            eta = self.meter.eta(self.done, self.planned)
+        else:
+            # 倒计时或暂停中：速率不变，剩余时间未知
+            cps, eta = self.meter.rate, None
+        return JobStatus(self.id, self.name, self.state, self.done, self.planned, cps, eta,
+                         self.missed, self.error)
+
+    async def _sleep_until(self, deadline):
+        """等到 deadline（暂停期间 deadline 会随 started_ns 顺延）"""
+        while True:
+            if not self._resume.is_set():
+                await self._resume.wait()
+            remaining = self.started_ns + deadline - time.perf_counter_ns()
+            if remaining <= 0:
+                return
+            # 暂停会让截止时间后移，因此每次最多睡 50 ms 再重新计算
+            await asyncio.sleep(min(remaining, 50_000_000) / 1e9)
+
+    async def run(self, engine):
+        loop = asyncio.get_running_loop()
+        executor = engine.executor
+        clock = time.perf_counter_ns
+        action = self.action
+        tolerance = self.tolerance_ns
+        skip = self.policy == SKIP
+        record = self.lateness.append
+        log = self.log
+        if self.state == PENDING:
+            self._set_state(RUNNING)
+        try:
+            if self.setup is not None:
+                await loop.run_in_executor(executor, self.setup)
+            now = clock()
+            self.started_ns = now + int(self.start_delay * 1e9)
+            if self._paused_at is not None:
+                # 准备期间就已暂停：暂停时长从计时开始的这一刻算起
+                self._paused_at = now
+            seen = 0
+            for offset, event in self.events:
+                seen += 1
+                await self._sleep_until(offset)
+                late = clock() - (self.started_ns + offset)
+                if skip and late > tolerance:
+                    self.skipped += 1
+                    self.missed += 1
+                    continue
+                if late > tolerance:
+                    self.missed += 1
+                record(late)
+                if log is not None:
+                    log.append(self.id, event, late)
+                if self.blocking:
+                    await loop.run_in_executor(executor, action, event)
+                else:
+                    action(event)
+                self.done += 1
+            self._finish(DONE, seen)
+        except asyncio.CancelledError:
+            self._finish(CANCELLED, self.done + self.skipped)
+        except Exception as e:
+            self.error = str(e)
+            self._finish(FAILED, self.done + self.skipped)
+
+    def _finish(self, state, seen):
+        planned = self.planned if self.planned is not None else seen
+        self.report = ScheduleReport(planned, self.lateness, self.skipped, self.missed,
+                                     time.perf_counter_ns() - self.started_ns,
+                                     state == CANCELLED)
+        self._set_state(state)
+
+
+class JobEngine:
+    """在守护线程中运行 asyncio 事件循环，调度多个 ClickJob
+
+    channel 不为空时，每 status_interval 秒（且只在有变化或有任务运行时）
+    把所有任务的 JobStatus 列表以键 'jobs' 发布到 channel。
+    """
+
+    def __init__(self, channel=None, status_interval=0.1):
+        self.channel = channel
+        self.status_interval = status_interval
+        self.jobs = {}
+        self.dirty = False
+        # 所有点击动作串行执行：注入设备只有一个，也避免后端的线程安全问题
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='click')
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run_loop, name='click-jobs', daemon=True)
+        self.thread.start()
+        if channel is not None:
+            asyncio.run_coroutine_threadsafe(self._report_status(), self.loop)
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, job):
+        """提交任务并立即开始（线程安全），返回 job"""
+        job.engine = self
+        if self.channel is None:
+            # 没有发布状态时由这里清理已结束的任务
+            for old in [j for j in self.jobs.values() if j.state in FINISHED]:
+                del self.jobs[old.id]
+        self.jobs[job.id] = job
+
+        def start():
+            job.task = self.loop.create_task(job.run(self))
+
+        self.loop.call_soon_threadsafe(start)
+        return job
+
+    def active_jobs(self):
+        return [job for job in list(self.jobs.values()) if job.state not in FINISHED]
+
+    def pause_all(self):
+        for job in self.active_jobs():
+            job.pause()
+
+    def resume_all(self):
+        for job in self.active_jobs():
+            job.resume()
+
+    def cancel_all(self):
+        for job in self.active_jobs():
+            job.cancel()
+
+    def wait(self, job, timeout=None):
+        """阻塞等待任务结束（不要在事件循环线程中调用），返回 ScheduleReport"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while job.state not in FINISHED:
+            if deadline is not None and time.monotonic() > deadline:
+                return None
+            time.sleep(0.005)
+        return job.report
+
+    def statuses(self):
+        return [job.status() for job in list(self.jobs.values())]
+
+    async def _report_status(self):
+        while True:
+            await asyncio.sleep(self.status_interval)
+            running = any(job.state == RUNNING for job in list(self.jobs.values()))
+            if self.dirty or running:
+                self.dirty = False
+                statuses = self.statuses()
+                self.channel.publish('jobs', statuses)
+                # 结束的任务只汇报一次
+                for status in statuses:
+                    if status.state in FINISHED:
+                        self.jobs.pop(status.id, None)
+
+    def shutdown(self, timeout=1.0):
+        """取消所有任务并停止事件循环"""
+        if not self.loop.is_running():
+            return
+
+        def stop():
+            for task in asyncio.all_tasks(self.loop):
+                task.cancel()
+            self.loop.call_soon(self.loop.stop)
+
+        self.loop.call_soon_threadsafe(stop)
+        self.thread.join(timeout)
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def main():
+    """同时运行三个不同节拍的空任务，中途暂停/继续一个、取消一个"""
+    engine = JobEngine()
+    jobs = [engine.submit(ClickJob.uniform(f"{rate} CPS", rate * 2, 2.0, lambda: None,
+                                           blocking=blocking))
+            for rate, blocking in ((20, True), (200, True), (500, False))]
+    time.sleep(0.5)
+    jobs[0].pause()
+    time.sleep(0.5)
+    jobs[0].resume()
+    jobs[1].cancel()
+    for job in jobs:
+        report = engine.wait(job)
+        print(f"{job.name:<8} {job.state:<9} {report.summary()}")
+    engine.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,300 @@
+"""鼠标键盘宏的录制与回放
+
+录制时用 pynput 监听鼠标移动、按键、滚轮和键盘事件，以 perf_counter_ns
+单调时间戳写入紧凑的二进制文件；回放时边读边执行，通过 ClickScheduler
+按原始节拍（可加速）调用 pyautogui，几个小时的录像也不需要整体载入内存。
+
+文件格式（小端）：
+    头部  '<4sB'     魔数 b'JMAC'、版本
+    记录  '<IBBhh'   与上一条记录的间隔（微秒）、事件类型、参数、x、y
+                     按键事件后紧跟 参数 个字节的键名（UTF-8）
+间隔超过 uint32 上限（约 71 分钟）时插入只推进时间的 WAIT 记录。
+
+    python -m legacy_projects.click_macro record macro.jmac    # 按 Esc 结束录制
+    python -m legacy_projects.click_macro play macro.jmac --speed 2
+    python -m legacy_projects.click_macro info macro.jmac
+"""
+import argparse
+import struct
+import sys
+import threading
+import time
+
+try:
+    import pyautogui
+except ImportError:  # 回放时需要
+    pyautogui = None
+
+try:
+    from pynput import keyboard, mouse
+except ImportError:  # 录制时需要
+    keyboard = mouse = None
+
+try:
+    from legacy_projects.click_scheduler import ClickScheduler
+except ImportError:
+    # 作为普通脚本运行时的路径处理
+    from click_scheduler import ClickScheduler
+
+MAGIC = b'JMAC'
+VERSION = 1
+HEADER = struct.Struct('<4sB')
+RECORD = struct.Struct('<IBBhh')
+MAX_DELTA_US = 0xFFFFFFFF
+
+# 事件类型
+WAIT, MOVE, MOUSE_DOWN, MOUSE_UP, SCROLL, KEY_DOWN, KEY_UP = range(7)
+EVENT_NAMES = ('wait', 'move', 'mouse_down', 'mouse_up', 'scroll', 'key_down', 'key_up')
+# 鼠标按键编号
+BUTTONS = ('left', 'right', 'middle')
+
+# pynput 键名与 pyautogui 键名不同的部分
+_PYAUTOGUI_KEYS = {
+    'alt_l': 'altleft', 'alt_r': 'altright', 'alt_gr': 'altright',
+    'ctrl_l': 'ctrlleft', 'ctrl_r': 'ctrlright',
+    'shift_l': 'shiftleft', 'shift_r': 'shiftright',
+    'cmd': 'win', 'cmd_l': 'winleft', 'cmd_r': 'winright',
+    'caps_lock': 'capslock', 'num_lock': 'numlock', 'scroll_lock': 'scrolllock',
+    'page_up': 'pageup', 'page_down': 'pagedown', 'print_screen': 'printscreen',
+    'media_play_pause': 'playpause', 'media_next': 'nexttrack',
+    'media_previous': 'prevtrack', 'media_volume_up': 'volumeup',
+    'media_volume_down': 'volumedown', 'media_volume_mute': 'volumemute',
+}
+
+
+class MacroError(Exception):
+    """宏文件损坏或缺少依赖"""
+
+
+def _clamp16(value):
+    return max(-32768, min(32767, int(value)))
+
+
+class MacroWriter:
+    """按时间顺序追加事件的写入器（线程安全，close() 之后的 write() 直接忽略）"""
+
+    def __init__(self, path):
+        self.file = open(path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION))
+        self.lock = threading.Lock()
+        self.last_us = None  # 已写入的时间戳（整微秒），增量按整微秒相减，舍入不会累积
+        self.count = 0
+        self.closed = False
+
+    def write(self, op, x=0, y=0, arg=0, name=None, now_ns=None):
+        """写入一个事件，now_ns 默认为当前 perf_counter_ns；已关闭时返回 False"""
+        now = time.perf_counter_ns() if now_ns is None else now_ns
+        data = name.encode('utf-8')[:255] if name is not None else b''
+        if data:
+            arg = len(data)
+        with self.lock:
+            if self.closed:
+                return False
+            now_us = now // 1000
+            last_us = now_us if self.last_us is None else self.last_us
+            delta_us = max(0, now_us - last_us)
+            self.last_us = last_us + delta_us
+            while delta_us > MAX_DELTA_US:
+                self.file.write(RECORD.pack(MAX_DELTA_US, WAIT, 0, 0, 0))
+                delta_us -= MAX_DELTA_US
+            self.file.write(RECORD.pack(delta_us, op, arg, _clamp16(x), _clamp16(y)) + data)
+            self.count += 1
+        return True
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+            self.file.close()
+
+
+def iter_macro(path, speed=1.0):
+    """逐条读取宏文件，产生 (相对起点的纳秒, (类型, 参数, x, y, 键名))
+
+    使用缓冲读取，只保留当前记录，不会把整个文件读进内存。
+    """
+    unpack = RECORD.unpack
+    size = RECORD.size
+    with open(path, 'rb') as f:
+        header = f.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise MacroError("宏文件过短")
+        magic, version = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise MacroError("不是宏文件")
+        if version != VERSION:
+            raise MacroError(f"不支持的宏文件版本: {version}")
+        read = f.read
+        elapsed_us = 0
+        while True:
+            data = read(size)
+            if len(data) < size:
+                return
+            delta_us, op, arg, x, y = unpack(data)
+            elapsed_us += delta_us
+            name = None
+            if op in (KEY_DOWN, KEY_UP):
+                name = read(arg).decode('utf-8', errors='replace')
+            if op != WAIT:
+                yield int(elapsed_us * 1000 / speed), (op, arg, x, y, name)
+
+
+def macro_info(path):
+    """流式统计宏文件：各类事件数量和总时长（秒）"""
+    counts = [0] * len(EVENT_NAMES)
+    last = 0
+    for offset, event in iter_macro(path):
+        counts[event[0]] += 1
+        last = offset
+    return dict(zip(EVENT_NAMES, counts)), last / 1e9
+
+
+def _key_name(key):
+    """pynput 的按键对象 -> pyautogui 键名"""
+    char = getattr(key, 'char', None)
+    if char:
+        return char
+    name = getattr(key, 'name', None) or str(key)
+    return _PYAUTOGUI_KEYS.get(name, name)
+
+
+class MacroRecorder:
+    """用 pynput 录制鼠标和键盘事件，按 stop_key 或调用 stop() 结束
+
+    move_interval_ms 大于 0 时，间隔更短的鼠标移动会被合并，文件更小。
+    """
+
+    def __init__(self, path, move_interval_ms=0, stop_key='esc'):
+        if mouse is None or keyboard is None:
+            raise MacroError("录制需要安装 pynput")
+        self.writer = MacroWriter(path)
+        self.move_interval_ns = int(move_interval_ms * 1e6)
+        self.stop_key = stop_key
+        self.last_move_ns = 0
+        self.done = threading.Event()
+        self.mouse_listener = mouse.Listener(on_move=self._on_move, on_click=self._on_click,
+                                             on_scroll=self._on_scroll)
+        self.keyboard_listener = keyboard.Listener(on_press=self._on_press,
+                                                   on_release=self._on_release)
+
+    def start(self):
+        self.mouse_listener.start()
+        self.keyboard_listener.start()
+        return self
+
+    def wait(self, timeout=None):
+        """阻塞到录制结束，返回录制的事件数"""
+        self.done.wait(timeout)
+        return self.writer.count
+
+    def stop(self):
+        if self.done.is_set():
+            return
+        self.done.set()
+        self.mouse_listener.stop()
+        self.keyboard_listener.stop()
+        self.writer.close()
+
+    # 各回调在监听线程中执行，stop() 之后可能还有事件在途，写入器关闭后会忽略它们
+    def _on_move(self, x, y):
+        if self.done.is_set():
+            return
+        now = time.perf_counter_ns()
+        if now - self.last_move_ns < self.move_interval_ns:
+            return
+        self.last_move_ns = now
+        self.writer.write(MOVE, x, y, now_ns=now)
+
+    def _on_click(self, x, y, button, pressed):
+        if self.done.is_set():
+            return
+        name = getattr(button, 'name', 'left')
+        index = BUTTONS.index(name) if name in BUTTONS else 0
+        self.writer.write(MOUSE_DOWN if pressed else MOUSE_UP, x, y, index)
+
+    def _on_scroll(self, x, y, dx, dy):
+        if self.done.is_set():
+            return
+        # 参数存放垂直滚动格数（有符号，按 uint8 保存）
+        self.writer.write(SCROLL, x, y, int(dy) & 0xFF)
+
+    def _on_press(self, key):
+        if self.done.is_set():
+            return False
+        name = _key_name(key)
+        if name == self.stop_key:
+            self.stop()
+            return False
+        self.writer.write(KEY_DOWN, name=name)
+
+    def _on_release(self, key):
+        if not self.done.is_set():
+            self.writer.write(KEY_UP, name=_key_name(key))
+
+
+class PyAutoGuiPlayer:
+    """把宏事件转成 pyautogui 调用"""
+
+    def __init__(self):
+        if pyautogui is None:
+            raise MacroError("回放需要安装 pyautogui")
+        # 节拍由调度器控制，去掉每次调用后默认的停顿
+        pyautogui.PAUSE = 0
+        self.handlers = (
+            None,
+            lambda a, x, y, n: pyautogui.moveTo(x, y),
+            lambda a, x, y, n: pyautogui.mouseDown(x, y, button=BUTTONS[a]),
+            lambda a, x, y, n: pyautogui.mouseUp(x, y, button=BUTTONS[a]),
+            lambda a, x, y, n: pyautogui.scroll(a - 256 if a > 127 else a, x, y),
+            lambda a, x, y, n: pyautogui.keyDown(n),
+            lambda a, x, y, n: pyautogui.keyUp(n),
+        )
+
+    def __call__(self, event):
+        op, arg, x, y, name = event
+        self.handlers[op](arg, x, y, name)
+
+
+def play_macro(path, speed=1.0, player=None, stop=None, spin_ms=2.0, tolerance_ms=5.0):
+    """按 speed 倍速回放宏文件，返回 ScheduleReport
+
+    按下和松开必须成对执行，因此落后时总是立即补发（CATCH_UP）。
+    """
+    if speed <= 0:
+        raise ValueError("speed 必须大于 0")
+    player = player or PyAutoGuiPlayer()
+    scheduler = ClickScheduler(0, 0, spin_ms=spin_ms, tolerance_ms=tolerance_ms)
+    return scheduler.run_events(iter_macro(path, speed), player, stop)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="录制和回放鼠标键盘宏")
+    sub = parser.add_subparsers(dest='command', required=True)
+    record = sub.add_parser('record', help="录制，按 Esc 结束")
+    record.add_argument('path')
+    record.add_argument('--move-interval', type=float, default=0,
+                        help="鼠标移动的最小记录间隔（毫秒）")
+    play = sub.add_parser('play', help="回放")
+    play.add_argument('path')
+    play.add_argument('--speed', type=float, default=1.0, help="回放倍速，如 2 或 10")
+    info = sub.add_parser('info', help="统计事件数量和时长")
+    info.add_argument('path')
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == 'record':
+            recorder = MacroRecorder(args.path, args.move_interval).start()
+            print("正在录制，按 Esc 结束...")
+            print(f"已录制 {recorder.wait()} 个事件")
+        elif args.command == 'play':
+            print(play_macro(args.path, args.speed).summary())
+        else:
+            counts, seconds = macro_info(args.path)
+            print(f"时长 {seconds:.3f}s  " + '  '.join(f"{k} {v}" for k, v in counts.items()))
+    except (OSError, MacroError) as e:
+        print(f"错误: {e}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
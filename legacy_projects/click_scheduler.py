@@ -0,0 +1,161 @@
+"""点击节拍调度
+
+两个连点器共用的调度器：第 i 次点击的截止时间固定为 起点 + i * 间隔
+（perf_counter_ns 整数纳秒，不会累积误差），等待时先粗略 sleep，离截止时间
+不到 spin_ns 时再忙等，精度可达亚毫秒。
+
+点击动作本身耗时过长导致落后时有两种策略：
+    CATCH_UP  落后的点击立即补发，点击总数不变
+    SKIP      已经错过的时刻直接跳过，保持节拍，点击总数可能变少
+
+每次运行结束返回 ScheduleReport：实际 CPS、延迟抖动百分位和错过的截止时间数。
+
+    python -m legacy_projects.click_scheduler     # 用空动作和慢动作测量两种策略
+"""
+import random
+import time
+from array import array
+
+try:
+    from legacy_projects.perf_stats import percentile
+except ImportError:
+    # 作为普通脚本运行时的路径处理
+    from perf_stats import percentile
+
+CATCH_UP = 'catch_up'
+SKIP = 'skip'
+
+
+class ScheduleReport:
+    """一次运行的统计（延迟 = 实际点击时刻 - 截止时间）"""
+
+    def __init__(self, planned, lateness_ns, skipped, missed, elapsed_ns, stopped=False):
+        self.planned = planned
+        self.lateness_ns = lateness_ns
+        self.clicks = len(lateness_ns)
+        self.skipped = skipped
+        self.missed = missed
+        self.elapsed_ns = elapsed_ns
+        self.stopped = stopped
+
+    @property
+    def cps(self):
+        return self.clicks * 1e9 / self.elapsed_ns if self.elapsed_ns > 0 else 0.0
+
+    def jitter_us(self, pct):
+        """延迟的百分位数（微秒）"""
+        return percentile(self.lateness_ns, pct) / 1000.0
+
+    @property
+    def max_jitter_us(self):
+        return max(self.lateness_ns, default=0) / 1000.0
+
+    def summary(self):
+        return (f"{self.clicks}/{self.planned} 次 {self.elapsed_ns / 1e9:.3f}s "
+                f"{self.cps:.1f} CPS  抖动 p50 {self.jitter_us(50):.0f}us "
+                f"p99 {self.jitter_us(99):.0f}us max {self.max_jitter_us:.0f}us  "
+                f"错过 {self.missed}  跳过 {self.skipped}")
+
+
+class ClickScheduler:
+    """按固定节拍执行 count 次动作，总时长 duration 秒
+
+    tolerance_ms：晚于截止时间超过该值的点击记为错过；SKIP 策略下，
+    开始等待前就已超过该值的时刻会被跳过。
+    """
+
+    def __init__(self, count, duration, policy=CATCH_UP, spin_ms=2.0, tolerance_ms=None):
+        if policy not in (CATCH_UP, SKIP):
+            raise ValueError(f"未知的调度策略: {policy}")
+        self.count = max(0, int(count))
+        self.interval_ns = int(duration * 1e9 / count) if count > 0 else 0
+        self.policy = policy
+        self.spin_ns = int(spin_ms * 1e6)
+        if tolerance_ms is None:
+            # 默认允许晚半个间隔，但至少 1 ms
+            tolerance_ns = max(self.interval_ns // 2, 1_000_000)
+        else:
+            tolerance_ns = int(tolerance_ms * 1e6)
+        self.tolerance_ns = tolerance_ns
+
+    def wait_until(self, deadline_ns):
+        """先 sleep 到截止时间前 spin_ns，再忙等到截止时间，返回当前时间"""
+        clock = time.perf_counter_ns
+        remaining = deadline_ns - clock()
+        if remaining > self.spin_ns:
+            time.sleep((remaining - self.spin_ns) / 1e9)
+        now = clock()
+        while now < deadline_ns:
+            now = clock()
+        return now
+
+    def run(self, action, stop=None):
+        """执行调度，stop 为可选的 threading.Event，置位后提前结束"""
+        interval = self.interval_ns
+        if interval > 0:
+            offsets = range(0, self.count * interval, interval)
+        else:
+            offsets = [0] * self.count
+        return self.run_offsets(offsets, lambda i: action(), stop)
+
+    def run_offsets(self, offsets_ns, action, stop=None):
+        """在相对起点的时刻 offsets_ns[i]（递增）执行 action(i)"""
+        return self.run_events(zip(offsets_ns, range(len(offsets_ns))), action, stop,
+                               len(offsets_ns))
+
+    def run_events(self, events, action, stop=None, planned=None):
+        """依次取出 (相对起点的时刻, 事件)，到点后执行 action(事件)
+
+        events 可以是生成器，逐个读取，不需要预先全部载入内存；
+        planned 为计划的事件总数，不传时为实际取出的数量。
+        """
+        clock = time.perf_counter_ns
+        tolerance = self.tolerance_ns
+        skip = self.policy == SKIP
+        # 每个事件的延迟（纳秒），用紧凑数组保存，长时间回放也只占 8 字节/事件
+        lateness = array('q')
+        record = lateness.append
+        skipped = missed = seen = 0
+        stopped = False
+        start = clock()
+        for offset, event in events:
+            if stop is not None and stop.is_set():
+                stopped = True
+                break
+            seen += 1
+            deadline = start + offset
+            if clock() < deadline:
+                now = self.wait_until(deadline)
+            else:
+                now = clock()
+                if skip and now - deadline > tolerance:
+                    skipped += 1
+                    missed += 1
+                    continue
+            late = now - deadline
+            if late > tolerance:
+                missed += 1
+            record(late)
+            action(event)
+        return ScheduleReport(seen if planned is None else planned, lateness, skipped, missed,
+                              clock() - start, stopped)
+
+
+def main():
+    rng = random.Random(0)
+
+    def stalling():
+        # 大约每 50 次点击卡顿 20 ms，模拟偶尔很慢的注入
+        if rng.random() < 0.02:
+            time.sleep(0.02)
+
+    cases = (('noop', lambda: None), ('stalling', stalling))
+    for count, duration in ((100, 1.0), (1000, 1.0)):
+        for name, action in cases:
+            for policy in (CATCH_UP, SKIP):
+                report = ClickScheduler(count, duration, policy).run(action)
+                print(f"{count:>5}/{duration}s {name:<9} {policy:<9} {report.summary()}")
+
+
+if __name__ == '__main__':
+    main()
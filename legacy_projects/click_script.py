@@ -0,0 +1,298 @@
+"""多点点击脚本
+
+脚本按行书写，# 之后为注释，时长可写 200ms / 1.5s，不带单位时按毫秒计：
+
+    gap 50ms                  之后每个动作结束后自动等待 50 ms
+    tap 500 1000              单击
+    tap 500 1000 300ms        按住 300 ms 后松开
+    hold 200 800 1s           长按
+    swipe 100 1500 900 1500 250ms
+    wait 2s
+    loop 100                  循环，可以嵌套
+        tap 300 600
+        tap 700 600
+    end
+
+compile_script 把脚本预先展开成按时间排序的扁平时间线（TAP / DOWN / MOVE /
+UP 四种事件，时间、坐标存放在 array 中），执行时只按下标取事件并调用后端的
+对应方法，热循环里没有解析和分支。后端可以是 pyautogui（桌面），也可以是
+android_input 中的任意注入器。
+
+    python -m legacy_projects.click_script 脚本文件 [--backend dry|pyautogui|android]
+"""
+import argparse
+import sys
+import time
+from array import array
+
+try:
+    import pyautogui
+except ImportError:  # 只在桌面上使用 pyautogui 后端时需要
+    pyautogui = None
+
+try:
+    from legacy_projects.click_scheduler import ClickScheduler
+except ImportError:
+    # 作为普通脚本运行时的路径处理
+    from click_scheduler import ClickScheduler
+
+# 事件类型（同时也是后端方法表的下标）
+TAP, DOWN, MOVE, UP = range(4)
+OP_NAMES = ('tap', 'down', 'move', 'up')
+
+# 滑动时每隔多久发送一次 MOVE
+MOVE_STEP_NS = 10_000_000
+
+
+class ScriptError(ValueError):
+    """脚本语法错误"""
+
+    def __init__(self, lineno, message):
+        super().__init__(f"第 {lineno} 行: {message}")
+        self.lineno = lineno
+
+
+class Timeline:
+    """编译后的事件时间线，times_ns 为相对起点的时刻（递增）"""
+
+    def __init__(self, times_ns, ops, xs, ys, duration_ns):
+        self.times_ns = times_ns
+        self.ops = ops
+        self.xs = xs
+        self.ys = ys
+        self.duration_ns = duration_ns
+
+    def __len__(self):
+        return len(self.times_ns)
+
+    def counts(self):
+        """各类事件的数量"""
+        return {name: self.ops.count(op) for op, name in enumerate(OP_NAMES)}
+
+    def run(self, backend, stop=None, spin_ms=2.0, tolerance_ms=2.0):
+        """按时间线驱动 backend（需提供 tap/down/move/up(x, y)），返回 ScheduleReport
+
+        时间线中的按下和松开必须成对执行，因此落后时总是立即补发（CATCH_UP）。
+        """
+        handlers = (backend.tap, backend.down, backend.move, backend.up)
+        ops, xs, ys = self.ops, self.xs, self.ys
+        scheduler = ClickScheduler(len(self), self.duration_ns / 1e9, spin_ms=spin_ms,
+                                   tolerance_ms=tolerance_ms)
+        return scheduler.run_offsets(self.times_ns,
+                                     lambda i: handlers[ops[i]](xs[i], ys[i]), stop)
+
+
+def parse_duration(text, lineno):
+    """'200ms' / '1.5s' / '200' -> 纳秒"""
+    try:
+        if text.endswith('ms'):
+            value = float(text[:-2]) * 1e6
+        elif text.endswith('s'):
+            value = float(text[:-1]) * 1e9
+        else:
+            value = float(text) * 1e6
+    except ValueError:
+        raise ScriptError(lineno, f"无效的时长: {text}") from None
+    if value < 0:
+        raise ScriptError(lineno, f"时长不能为负: {text}")
+    return int(value)
+
+
+def _ints(args, count, lineno, command):
+    if len(args) < count:
+        raise ScriptError(lineno, f"{command} 需要 {count} 个坐标")
+    try:
+        return [int(float(a)) for a in args[:count]]
+    except ValueError:
+        raise ScriptError(lineno, f"无效的坐标: {' '.join(args[:count])}") from None
+
+
+class _Block:
+    """编译中的一段事件（时间相对于段首）"""
+
+    def __init__(self):
+        self.times = []
+        self.ops = []
+        self.xs = []
+        self.ys = []
+        self.cursor = 0
+
+    def emit(self, op, x, y, offset=0):
+        self.times.append(self.cursor + offset)
+        self.ops.append(op)
+        self.xs.append(x)
+        self.ys.append(y)
+
+    def repeat(self, body, count):
+        """把 body 首尾相接重复 count 次追加到当前位置"""
+        period = body.cursor
+        for k in range(count):
+            base = self.cursor + k * period
+            self.times.extend([t + base for t in body.times])
+        self.ops.extend(body.ops * count)
+        self.xs.extend(body.xs * count)
+        self.ys.extend(body.ys * count)
+        self.cursor += period * count
+
+
+def _tokenize(text):
+    for lineno, line in enumerate(text.splitlines(), 1):
+        words = line.split('#', 1)[0].split()
+        if words:
+            yield lineno, words[0].lower(), words[1:]
+
+
+def _compile_block(lines, block, state, depth):
+    for lineno, command, args in lines:
+        if command == 'end':
+            if depth == 0:
+                raise ScriptError(lineno, "多余的 end")
+            return
+        if command == 'loop':
+            if len(args) != 1 or not args[0].isdigit():
+                raise ScriptError(lineno, "loop 需要一个非负整数次数")
+            body = _Block()
+            _compile_block(lines, body, state, depth + 1)
+            block.repeat(body, int(args[0]))
+            continue
+        if command == 'wait':
+            if len(args) != 1:
+                raise ScriptError(lineno, "wait 需要一个时长")
+            block.cursor += parse_duration(args[0], lineno)
+            continue
+        if command == 'gap':
+            if len(args) != 1:
+                raise ScriptError(lineno, "gap 需要一个时长")
+            state['gap'] = parse_duration(args[0], lineno)
+            continue
+        if command in ('tap', 'hold'):
+            x, y = _ints(args, 2, lineno, command)
+            if len(args) > 3:
+                raise ScriptError(lineno, f"{command} 参数过多")
+            if command == 'hold' and len(args) != 3:
+                raise ScriptError(lineno, "hold 需要时长")
+            hold = parse_duration(args[2], lineno) if len(args) == 3 else 0
+            if hold:
+                block.emit(DOWN, x, y)
+                block.emit(UP, x, y, hold)
+                block.cursor += hold
+            else:
+                block.emit(TAP, x, y)
+        elif command == 'swipe':
+            x1, y1, x2, y2 = _ints(args, 4, lineno, command)
+            if len(args) != 5:
+                raise ScriptError(lineno, "swipe 需要起点、终点和时长")
+            duration = parse_duration(args[4], lineno)
+            steps = max(1, duration // MOVE_STEP_NS)
+            block.emit(DOWN, x1, y1)
+            for step in range(1, steps + 1):
+                f = step / steps
+                block.emit(MOVE, round(x1 + (x2 - x1) * f), round(y1 + (y2 - y1) * f),
+                           duration * step // steps)
+            block.emit(UP, x2, y2, duration)
+            block.cursor += duration
+        else:
+            raise ScriptError(lineno, f"未知命令: {command}")
+        block.cursor += state['gap']
+    if depth > 0:
+        raise ScriptError(state['lines'], "loop 缺少 end")
+
+
+def compile_script(text):
+    """把脚本编译成 Timeline"""
+    block = _Block()
+    state = {'gap': 0, 'lines': len(text.splitlines())}
+    _compile_block(iter(_tokenize(text)), block, state, 0)
+    return Timeline(array('q', block.times), array('B', block.ops),
+                    array('i', block.xs), array('i', block.ys), block.cursor)
+
+
+def load_script(path):
+    with open(path, encoding='utf-8') as f:
+        return compile_script(f.read())
+
+
+class PyAutoGuiBackend:
+    """桌面鼠标后端"""
+
+    name = 'pyautogui'
+
+    def __init__(self):
+        if pyautogui is None:
+            raise RuntimeError("需要安装 pyautogui")
+        # 节拍由时间线控制，去掉每次调用后默认的停顿
+        pyautogui.PAUSE = 0
+        self.tap = lambda x, y: pyautogui.click(x, y)
+        self.down = lambda x, y: pyautogui.mouseDown(x, y)
+        self.move = lambda x, y: pyautogui.moveTo(x, y)
+        self.up = lambda x, y: pyautogui.mouseUp(x, y)
+
+    def close(self):
+        pass
+
+
+class DryRunBackend:
+    """不产生任何输入，只统计事件数，用于测量调度精度"""
+
+    name = 'dry'
+
+    def __init__(self):
+        self.events = [0, 0, 0, 0]
+
+    def tap(self, x, y):
+        self.events[TAP] += 1
+
+    def down(self, x, y):
+        self.events[DOWN] += 1
+
+    def move(self, x, y):
+        self.events[MOVE] += 1
+
+    def up(self, x, y):
+        self.events[UP] += 1
+
+    def close(self):
+        pass
+
+
+def create_backend(name):
+    """'dry' / 'pyautogui' / 'android'"""
+    if name == 'pyautogui':
+        return PyAutoGuiBackend()
+    if name == 'android':
+        try:
+            from legacy_projects.android_input import create_injector
+        except ImportError:
+            from android_input import create_injector
+        return create_injector()
+    return DryRunBackend()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="编译并执行点击脚本")
+    parser.add_argument('script')
+    parser.add_argument('--backend', default='dry', choices=('dry', 'pyautogui', 'android'))
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        timeline = load_script(args.script)
+    except (OSError, ScriptError) as e:
+        print(f"无法加载脚本: {e}")
+        return 1
+    compile_ms = (time.perf_counter() - start) * 1000
+    counts = ', '.join(f"{name} {n}" for name, n in timeline.counts().items())
+    print(f"编译 {len(timeline)} 个事件（{counts}），时长 {timeline.duration_ns / 1e9:.3f}s，"
+          f"用时 {compile_ms:.1f} ms")
+
+    backend = create_backend(args.backend)
+    try:
+        report = timeline.run(backend)
+    finally:
+        backend.close()
+    print(report.summary())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,163 @@
+"""跳一跳自动游玩
+
+AutoPlayer 用 predict_jump 的轨迹模型枚举所有可达的蓄力值，选出落点最稳的
+一档，再通过 on_space_press / on_space_release 按下和松开空格，因此可以
+直接驱动无界面的 JumpEngine，也可以驱动 Tk 界面的 JumpGame。
+
+play_many 在 ProcessPoolExecutor 中并行跑大量带种子的对局，统计每个难度的
+胜率和每秒完成的局数：
+
+    python -m legacy_projects.jump_autoplay --games 2000 --difficulty 1 2 3
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from legacy_projects.jump_engine import GameState, JumpEngine
+except ImportError:
+    # 作为普通脚本运行时的路径处理
+    from jump_engine import GameState, JumpEngine
+
+
+def choose_charge(engine):
+    """选择下一跳的蓄力值，没有安全落点时返回 None
+
+    优先落到最近的未踩过的平台；能落到同一平台的蓄力值是一段连续区间，
+    取区间中间的一档，离平台两端最远。都够不着时退而落到最远的已踩平台。
+    """
+    charges = {}
+    for charge in range(0, engine.max_charge_power + 1, engine.charge_rate):
+        platform = engine.predict_jump(charge).platform
+        if platform is not None:
+            charges.setdefault(platform, []).append(charge)
+    if not charges:
+        return None
+    fresh = [p for p in charges if not p.landed_on]
+    if fresh:
+        target = min(fresh, key=lambda p: p.x)
+    else:
+        target = max(charges, key=lambda p: p.x)
+    window = charges[target]
+    return window[len(window) // 2]
+
+
+class AutoPlayer:
+    """每帧调用 act()，通过空格键钩子操作游戏"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.target = None
+
+    def act(self):
+        engine = self.engine
+        if engine.state != GameState.RUNNING or engine.is_jumping:
+            return
+        if not engine.charging:
+            self.target = choose_charge(engine)
+            if self.target is None:
+                return
+            engine.on_space_press()
+        # 蓄力值在下一次 tick 时才增加，因此达到目标后立即松开
+        if engine.charge_power >= self.target:
+            engine.on_space_release()
+
+
+def play_game(seed, difficulty=1, width=40, height=12, win_score=100, max_frames=50000):
+    """用 AutoPlayer 玩一局，返回 (种子, 是否获胜, 得分, 帧数)"""
+    engine = JumpEngine(width, height, difficulty, seed=seed, preview=False,
+                        win_score=win_score)
+    player = AutoPlayer(engine)
+    act = player.act
+    tick = engine.tick
+    while engine.state == GameState.RUNNING and engine.frame_count < max_frames:
+        act()
+        tick()
+    return seed, engine.state == GameState.WIN, engine.score, engine.frame_count
+
+
+def _play_chunk(args):
+    """在工作进程中连续玩一批种子，减少进程间往返"""
+    seeds, difficulty, width, height, win_score, max_frames = args
+    return [play_game(seed, difficulty, width, height, win_score, max_frames)
+            for seed in seeds]
+
+
+class BatchResult:
+    """一个难度下的批量对局统计"""
+
+    def __init__(self, difficulty, results, seconds):
+        self.difficulty = difficulty
+        self.results = results
+        self.seconds = seconds
+
+    @property
+    def games(self):
+        return len(self.results)
+
+    @property
+    def wins(self):
+        return sum(1 for _, won, _, _ in self.results if won)
+
+    @property
+    def win_rate(self):
+        return self.wins / self.games if self.results else 0.0
+
+    @property
+    def games_per_second(self):
+        return self.games / self.seconds if self.seconds > 0 else float('inf')
+
+    @property
+    def mean_score(self):
+        return sum(score for _, _, score, _ in self.results) / self.games if self.results else 0.0
+
+    @property
+    def frames(self):
+        return sum(frames for _, _, _, frames in self.results)
+
+
+def play_many(games=1000, difficulty=1, width=40, height=12, win_score=100,
+              max_frames=50000, workers=None, first_seed=0, executor=None, chunk=None):
+    """并行玩 games 局（种子 first_seed 起连续编号），返回 BatchResult"""
+    workers = workers or os.cpu_count() or 1
+    chunk = chunk or max(1, min(50, games // (workers * 4)))
+    seeds = range(first_seed, first_seed + games)
+    jobs = [(seeds[i:i + chunk], difficulty, width, height, win_score, max_frames)
+            for i in range(0, games, chunk)]
+    start = time.perf_counter()
+    if executor is None:
+        with ProcessPoolExecutor(workers) as pool:
+            batches = list(pool.map(_play_chunk, jobs))
+    else:
+        batches = list(executor.map(_play_chunk, jobs))
+    seconds = time.perf_counter() - start
+    return BatchResult(difficulty, [r for batch in batches for r in batch], seconds)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="跳一跳自动游玩与吞吐测试")
+    parser.add_argument('--games', type=int, default=1000, help="每个难度的局数")
+    parser.add_argument('--difficulty', type=int, nargs='+', default=[1, 2, 3])
+    parser.add_argument('--workers', type=int, default=None, help="进程数，默认为 CPU 核数")
+    parser.add_argument('--win-score', type=int, default=100, help="获胜所需得分")
+    parser.add_argument('--max-frames', type=int, default=50000, help="单局帧数上限")
+    parser.add_argument('--width', type=int, default=40)
+    parser.add_argument('--height', type=int, default=12)
+    args = parser.parse_args(argv)
+
+    workers = args.workers or os.cpu_count() or 1
+    print(f"{'difficulty':>10} {'games':>6} {'win rate':>9} {'mean score':>11} "
+          f"{'games/s':>8} {'frames/s':>9}")
+    with ProcessPoolExecutor(workers) as pool:
+        for difficulty in args.difficulty:
+            result = play_many(args.games, difficulty, args.width, args.height,
+                               args.win_score, args.max_frames, workers, executor=pool)
+            print(f"{difficulty:>10} {result.games:>6} {result.win_rate:>8.1%} "
+                  f"{result.mean_score:>11.1f} {result.games_per_second:>8.1f} "
+                  f"{result.frames / result.seconds:>9.0f}")
+    return 0
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,347 @@
+"""跳一跳的批量向量化环境：同时推进成千上万局游戏
+
+BatchJumpEnv 把 N 局游戏的玩家状态（player_x、player_y、jump_velocity、
+jump_velocity_x、charge_power、score ……）各存成一个长度为 N 的 NumPy 数组，
+每一步用数组运算套用 JumpEngine 的蓄力、_update_physics、_check_collision、
+镜头和地形生成规则，结束的对局自动重开。
+
+地形：平台按 x 递增生成，相邻平台的判定范围（平台 [x-1, x+length) 加上
+障碍物 [x+length, x+length+4)）互不重叠，因此每局只需记住玩家当前所在的
+平台编号（cursor，只会向前走），碰撞和脚下检测都只看这一个平台，每步的
+开销与平台数量无关。每局的平台存放在长度为 K 的环形数组中，K 按镜头前方
+两屏地形所需的平台数选取，覆盖掉的平台一定已经在玩家身后。
+
+平台的随机分布与 JumpEngine 相同，但使用 NumPy 的随机数生成器，同一个
+seed 得到的地形与 JumpEngine 不同；不计算轨迹预测和粒子特效。
+
+接口与 gymnasium 的向量环境一致：
+
+    env = BatchJumpEnv(4096, seed=0)
+    obs, info = env.reset()
+    obs, reward, terminated, truncated, info = env.step(actions)  # NOOP/PRESS/RELEASE
+
+    python -m legacy_projects.jump_batch --envs 4096 65536
+"""
+import argparse
+import sys
+import time
+
+try:
+    import numpy as np
+except ImportError:  # 批量环境需要 NumPy
+    np = None
+
+try:
+    from legacy_projects.jump_engine import PRESS, RELEASE
+except ImportError:
+    # 作为普通脚本运行时的路径处理
+    from jump_engine import PRESS, RELEASE
+
+# 与 JumpEngine 相同的物理参数
+GRAVITY = 0.3
+MAX_FALL_SPEED = 1.5
+MAX_CHARGE = 100
+CHARGE_RATE = 2
+OBSTACLE_CHANCE = 0.3
+OBSTACLE_WIDTH = 2
+
+# 没有障碍物的平台把障碍物的 y 设为该值，判定永远不会命中
+NO_OBSTACLE = -1 << 20
+
+# 观测向量各列的含义
+OBSERVATION = ('player_y', 'jump_velocity', 'jump_velocity_x', 'charge', 'is_jumping',
+               'charging', 'next_dx', 'next_dy', 'next_length', 'next_obstacle')
+
+
+class BatchJumpEnv:
+    """N 局跳一跳游戏的向量化环境"""
+
+    def __init__(self, n, width=40, height=12, difficulty=1, seed=None, win_score=None,
+                 max_steps=None):
+        """max_steps 不为空时，一局超过该帧数即截断（truncated）并重开"""
+        if np is None:
+            raise ImportError("BatchJumpEnv 需要安装 NumPy")
+        self.n = n
+        self.width = width
+        self.height = height
+        self.difficulty = difficulty
+        self.win_score = win_score
+        self.max_steps = max_steps
+        self.camera_lead = width // 4
+        self.platform_spacing = max(5, 10 - difficulty * 2)
+        self.platform_width = max(4, 9 - difficulty)
+        self.rng = np.random.default_rng(seed)
+
+        # 环形数组的容量：镜头前方 2 屏内最多的平台数，加上玩家所在和身后的余量，
+        # 取 2 的幂以便用按位与求槽位
+        min_stride = self.platform_spacing + self.platform_width + 1
+        k = -(-(width * 2 + 1) // min_stride) + 3
+        self.k = 1 << (k - 1).bit_length()
+        self._base = np.arange(n, dtype=np.int64) * self.k
+        size = n * self.k
+
+        # 每个平台的判定参数（展平的 N*K 数组）：左端 x、右端 x+length、y、
+        # 障碍物的 y（没有时为 NO_OBSTACLE）和是否已踩过
+        self.plat_x = np.zeros(size, np.int64)
+        self.plat_end = np.zeros(size, np.int64)
+        self.plat_y = np.zeros(size, np.int64)
+        self.obs_y = np.full(size, NO_OBSTACLE, np.int64)
+        self.landed = np.zeros(size, bool)
+        # 玩家所在平台的编号、已生成的平台数和地形最右端
+        self.cursor = np.zeros(n, np.int64)
+        self.count = np.zeros(n, np.int64)
+        self.world_tail = np.zeros(n, np.int64)
+
+        self.player_x = np.zeros(n)
+        self.player_y = np.zeros(n)
+        self.jump_velocity = np.zeros(n)
+        self.jump_velocity_x = np.zeros(n)
+        self.charge_power = np.zeros(n)
+        self.camera_offset = np.zeros(n)
+        self.is_jumping = np.zeros(n, bool)
+        self.charging = np.zeros(n, bool)
+        self.score = np.zeros(n, np.int64)
+        self.frame_count = np.zeros(n, np.int64)
+
+        self.observation = np.zeros((n, len(OBSERVATION)), np.float32)
+        self.episodes = 0
+        self.steps = 0
+
+    # ------------------------------------------------------------ 地形
+
+    def _draw(self, count):
+        """依次生成 count 个平台的长度、y 和是否带障碍物"""
+        rng = self.rng
+        lengths = rng.integers(self.platform_width, self.platform_width + 4, count)
+        ys = rng.integers(self.height - 5, self.height - 1, count)
+        return lengths, ys, rng.random(count) < OBSTACLE_CHANCE
+
+    def _append(self, rows, x, y, length, obstacle):
+        """在 rows 这些局的地形末尾追加平台"""
+        slot = self._base[rows] + (self.count[rows] & (self.k - 1))
+        self.plat_x[slot] = x
+        self.plat_end[slot] = x + length
+        self.plat_y[slot] = y
+        self.obs_y[slot] = np.where(obstacle, y - 1, NO_OBSTACLE)
+        self.landed[slot] = False
+        self.count[rows] += 1
+
+    def _extend_world(self, rows=None):
+        """保证镜头右侧至少还有一屏地形（与 JumpEngine._extend_world 相同）"""
+        limit = self.camera_offset + self.width * 2
+        while True:
+            if rows is None:
+                need = np.flatnonzero(self.world_tail < limit)
+            else:
+                need = rows[self.world_tail[rows] < limit[rows]]
+            if not need.size:
+                return
+            lengths, ys, obstacle = self._draw(need.size)
+            x = self.world_tail[need]
+            self._append(need, x, ys, lengths, obstacle)
+            self.world_tail[need] = x + self.platform_spacing + lengths + 1
+
+    def _reset_rows(self, rows):
+        """把 rows 这些局恢复到开局状态并重新生成地形"""
+        self.player_x[rows] = 5
+        self.player_y[rows] = self.height - 3
+        self.jump_velocity[rows] = 0
+        self.jump_velocity_x[rows] = 0
+        self.charge_power[rows] = 0
+        self.camera_offset[rows] = 0
+        self.is_jumping[rows] = False
+        self.charging[rows] = False
+        self.score[rows] = 0
+        self.frame_count[rows] = 0
+        self.cursor[rows] = 0
+        self.count[rows] = 0
+        # 起始平台，第二个平台从 x=10 开始
+        self._append(rows, 0, self.height - 2, 8, False)
+        self.world_tail[rows] = 10
+        self._extend_world(rows)
+
+    # ------------------------------------------------------------ 观测
+
+    def observe(self):
+        """每局的观测向量（N x len(OBSERVATION)），next_* 描述玩家前方的下一个平台"""
+        obs = self.observation
+        obs[:, 0] = self.player_y
+        obs[:, 1] = self.jump_velocity
+        obs[:, 2] = self.jump_velocity_x
+        obs[:, 3] = self.charge_power
+        obs[:, 3] /= MAX_CHARGE
+        obs[:, 4] = self.is_jumping
+        obs[:, 5] = self.charging
+        slot = self._base + ((self.cursor + 1) & (self.k - 1))
+        x = self.plat_x.take(slot)
+        obs[:, 6] = x - self.player_x
+        obs[:, 7] = self.plat_y.take(slot) - self.player_y
+        obs[:, 8] = self.plat_end.take(slot) - x
+        obs[:, 9] = self.obs_y.take(slot) != NO_OBSTACLE
+        return obs
+
+    # ------------------------------------------------------------ 接口
+
+    def reset(self, seed=None):
+        """重开全部对局，返回 (观测, info)"""
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        self._reset_rows(np.arange(self.n))
+        return self.observe(), {}
+
+    def step(self, actions):
+        """所有局同时执行一个动作并推进一帧
+
+        actions 为长度 N 的数组（NOOP / PRESS / RELEASE），返回
+        (观测, 奖励, terminated, truncated, info)。奖励为本帧新踩到的平台数；
+        terminated 表示游戏结束或达到 win_score，truncated 表示超过 max_steps，
+        这两种对局都已自动重开，info 中的 score / length / won 记录它们的结果。
+        """
+        actions = np.asarray(actions)
+        jumping = self.is_jumping
+        charging = self.charging
+        charge = self.charge_power
+        vy = self.jump_velocity
+        vx = self.jump_velocity_x
+        x = self.player_x
+        y = self.player_y
+
+        # 按下：未蓄力且不在空中时开始蓄力
+        press = (actions == PRESS) & ~jumping & ~charging
+        charge[press] = 0
+        charging |= press
+        # 松开：按蓄力值起跳（jump 的力度公式）
+        release = (actions == RELEASE) & charging
+        charging &= ~release
+        launch = release & ~jumping
+        power = 1 + charge[launch] / MAX_CHARGE * 1.5
+        vy[launch] = -power
+        vx[launch] = 0.6 * power
+        jumping |= launch
+        charge[release] = 0
+
+        # 蓄力
+        charge += CHARGE_RATE * charging
+        np.minimum(charge, MAX_CHARGE, out=charge)
+
+        # 物理：空中的局受重力移动；站着的局速度为 0，位置不变
+        standing = ~jumping
+        vy += GRAVITY * jumping
+        y += vy
+        x += vx
+        np.maximum(x, self.camera_offset, out=x)
+        np.minimum(vy, MAX_FALL_SPEED, out=vy)
+
+        # 推进到玩家所在的平台（每帧最多移动 1.5 列，最多越过一个平台）
+        px = x.astype(np.int64)
+        mask = self.k - 1
+        ahead = self._base + ((self.cursor + 1) & mask)
+        self.cursor += self.plat_x.take(ahead) - 1 <= px
+        slot = self._base + (self.cursor & mask)
+        plat_x = self.plat_x.take(slot)
+        plat_end = self.plat_end.take(slot)
+        plat_y = self.plat_y.take(slot)
+
+        # 脚下没有平台就下落
+        ground = ((y + 1).astype(np.int64) == plat_y) & (plat_x <= x) & (x < plat_end)
+        fall = standing & ~ground & (y < self.height - 1)
+        jumping |= fall
+        vy[fall] = 0.5
+
+        # 碰撞：着陆、撞到障碍物、掉出画面
+        py = y.astype(np.int64)
+        land = (np.abs(py - plat_y) <= 1) & (px < plat_end) & (vy >= 0)
+        jumping &= ~land
+        vy[land] = 0
+        vx[land] = 0
+        np.copyto(y, plat_y - 1, where=land)
+        landed = self.landed.take(slot)
+        reward = land & ~landed
+        self.landed[slot] = landed | land
+        self.score += reward
+        # 障碍物位于 x+length+1，判定范围 [x-1, x+width+1)
+        hit = (np.abs(py - self.obs_y.take(slot)) <= 1) & (px >= plat_end) & (
+            px < plat_end + OBSTACLE_WIDTH + 2)
+        terminated = ~land & (hit | (py >= self.height - 1))
+        won = None
+        if self.win_score is not None:
+            won = self.score >= self.win_score
+            terminated |= won
+
+        # 镜头和地形
+        np.maximum(self.camera_offset, x - self.camera_lead, out=self.camera_offset)
+        self._extend_world()
+
+        self.frame_count += 1
+        self.steps += self.n
+        if self.max_steps is not None:
+            truncated = ~terminated & (self.frame_count >= self.max_steps)
+        else:
+            truncated = np.zeros(self.n, bool)
+        info = {}
+        done = np.flatnonzero(terminated | truncated)
+        if done.size:
+            info = {'score': self.score[done], 'length': self.frame_count[done],
+                    'won': won[done] if won is not None else np.zeros(done.size, bool),
+                    'index': done}
+            self.episodes += done.size
+            self._reset_rows(done)
+        return self.observe(), reward.astype(np.float32), terminated, truncated, info
+
+
+def charge_policy(env, targets, rng):
+    """简单的随机策略：站稳后按下，蓄力到各局随机的目标值后松开"""
+    actions = np.zeros(env.n, np.int8)
+    idle = ~env.is_jumping & ~env.charging
+    actions[idle] = PRESS
+    ready = env.charging & (env.charge_power >= targets)
+    actions[ready] = RELEASE
+    targets[ready] = rng.integers(0, MAX_CHARGE // CHARGE_RATE + 1, ready.sum()) * CHARGE_RATE
+    return actions
+
+
+def bench(envs=(256, 4096, 65536), total=2000000, seed=0):
+    """不同批量大小下每秒推进的游戏帧数（随机蓄力策略，含观测计算）
+
+    每种批量共推进约 total 帧；env 列只计 step 的耗时，total 列包含策略。
+    """
+    print(f"{'envs':>7} {'steps':>6} {'episodes':>9} {'mean score':>11} "
+          f"{'env steps/s':>12} {'total/s':>12}")
+    for n in envs:
+        env = BatchJumpEnv(n, seed=seed)
+        env.reset()
+        rng = np.random.default_rng(seed)
+        targets = rng.integers(0, MAX_CHARGE // CHARGE_RATE + 1, n) * CHARGE_RATE
+        count = max(50, total // n)
+        scores = []
+        stepping = 0.0
+        clock = time.perf_counter
+        start = clock()
+        for _ in range(count):
+            actions = charge_policy(env, targets, rng)
+            begin = clock()
+            _, _, _, _, info = env.step(actions)
+            stepping += clock() - begin
+            if info:
+                scores.append(info['score'])
+        elapsed = clock() - start
+        mean = np.concatenate(scores).mean() if scores else 0.0
+        print(f"{n:>7} {count:>6} {env.episodes:>9} {mean:>11.2f} "
+              f"{n * count / stepping:>12.0f} {n * count / elapsed:>12.0f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="跳一跳批量环境的推进速度")
+    parser.add_argument('--envs', type=int, nargs='+', default=[256, 4096, 65536])
+    parser.add_argument('--total', type=int, default=2000000, help="每种批量推进的总帧数")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    if np is None:
+        print("需要安装 NumPy")
+        return 1
+    bench(args.envs, args.total, args.seed)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,477 @@
+"""跳一跳游戏性能基准
+
+用法: python -m legacy_projects.jump_bench [名称 ...]
+不带参数时运行全部基准。
+"""
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+try:
+    from legacy_projects.spatial_index import ColumnIndex
+    from legacy_projects.perf_stats import FrameTimer
+    from legacy_projects.jump_render import CanvasRenderer, ImmediateRenderer
+    from legacy_projects.jump_engine import (
+        GameState, JumpEngine, Obstacle, Platform, NOOP, PRESS, RELEASE)
+    from legacy_projects.particles import Particle, create_particle_pool
+    from legacy_projects.jump_replay import InputRecorder, Recording, replay
+    from legacy_projects.jump_terminal import TerminalGame
+    from legacy_projects import jump_batch, jump_video
+except ImportError:
+    from spatial_index import ColumnIndex
+    from perf_stats import FrameTimer
+    from jump_render import CanvasRenderer, ImmediateRenderer
+    from jump_engine import GameState, JumpEngine, Obstacle, Platform, NOOP, PRESS, RELEASE
+    from particles import Particle, create_particle_pool
+    from jump_replay import InputRecorder, Recording, replay
+    from jump_terminal import TerminalGame
+    import jump_batch
+    import jump_video
+
+
+def _build_board(width, height, seed=0):
+    """按 _init_platforms 的规则生成 width * 3 列的平台和障碍物"""
+    rng = random.Random(seed)
+    platform_width = 8
+    spacing = 8
+    platforms = [Platform(0, height - 2, 8)]
+    obstacles = []
+    x = 10
+    while x < width * 3:
+        length = rng.randint(platform_width, platform_width + 3)
+        y = rng.randint(height - 5, height - 2)
+        platforms.append(Platform(x, y, length))
+        if rng.random() < 0.3:
+            obstacles.append(Obstacle(x + length + 1, y - 1, 2))
+        x += spacing + length + 1
+    return platforms, obstacles
+
+
+def _frame_probes(width, height, rng):
+    """一帧内的查询：碰撞检测、脚下探测和 80 步轨迹预测"""
+    px = rng.uniform(0, width * 3)
+    py = rng.randint(height - 6, height - 2)
+    probes = [(px, py), (px, py + 1)]
+    vx = 0.6 * 2.5
+    for i in range(80):
+        probes.append((px + vx * (i + 1), py))
+    return probes
+
+
+def _hit(platform, x, y):
+    return (platform.y - 1 <= y <= platform.y + 1
+            and platform.x - 1 <= x < platform.x + platform.length)
+
+
+def bench_index(widths=(60, 250, 1000, 4000, 16000), frames=200):
+    """比较线性扫描与列索引的单帧查询耗时"""
+    height = 15
+    print(f"{'width':>8} {'platforms':>10} {'linear ms':>10} {'index ms':>10} {'speedup':>8}")
+    for width in widths:
+        platforms, obstacles = _build_board(width, height)
+        index = ColumnIndex()
+        for p in platforms:
+            index.add(p, p.x - 1, p.x + p.length)
+        rng = random.Random(1)
+        workload = [_frame_probes(width, height, rng) for _ in range(frames)]
+
+        start = time.perf_counter()
+        for probes in workload:
+            for x, y in probes:
+                for p in platforms:
+                    if _hit(p, x, y):
+                        break
+        linear = (time.perf_counter() - start) / frames * 1000
+
+        start = time.perf_counter()
+        for probes in workload:
+            for x, y in probes:
+                for p in index.at(x):
+                    if _hit(p, x, y):
+                        break
+        indexed = (time.perf_counter() - start) / frames * 1000
+
+        print(f"{width:>8} {len(platforms):>10} {linear:>10.3f} {indexed:>10.3f} "
+              f"{linear / indexed:>7.1f}x")
+
+
+def _render_scene(width, height, frame, board, particles):
+    """构造一帧渲染所需的游戏状态（与 JumpGame 的属性同名）"""
+    platforms, obstacles = board
+    if frame % 10 == 0:
+        particles.burst('land', 5 + frame % 30, height - 3)
+    particles.update()
+    charge = frame % 100
+    points = [(5 + i * 0.9, height - 3 - 1.5 * i + 0.15 * i * i) for i in range(charge // 4)]
+    return SimpleNamespace(
+        width=width, height=height, platforms=platforms, obstacles=obstacles,
+        player_x=5 + (frame % 7) * 0.5, player_y=float(height - 3),
+        charging=charge > 0, charge_power=charge, max_charge_power=100,
+        trajectory_points=points, particles=particles, camera_offset=0)
+
+
+def bench_render(widths=(40, 120, 400), frames=200):
+    """比较立即模式与保留模式渲染的单帧耗时（需要图形界面）"""
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception as e:
+        print(f"跳过：无法创建 Tk 窗口 ({e})")
+        return
+    height = 15
+    cell_size = 30
+    print(f"{'width':>8} {'immediate ms':>13} {'retained ms':>12} {'speedup':>8}")
+    try:
+        for width in widths:
+            board = _build_board(width // 3 + 1, height)
+            results = []
+            for renderer_cls in (ImmediateRenderer, CanvasRenderer):
+                canvas = tk.Canvas(root, width=width * cell_size, height=height * cell_size)
+                renderer = renderer_cls(canvas, cell_size)
+                particles = create_particle_pool(seed=0)
+                timer = FrameTimer(window=frames)
+                for i in range(frames):
+                    scene = _render_scene(width, height, i, board, particles)
+                    timer.start()
+                    renderer.draw(scene)
+                    root.update_idletasks()
+                    timer.stop()
+                canvas.destroy()
+                results.append(timer.mean_ms)
+            print(f"{width:>8} {results[0]:>13.3f} {results[1]:>12.3f} "
+                  f"{results[0] / results[1]:>7.1f}x")
+    finally:
+        root.destroy()
+
+
+def bench_engine(frames=200000, seed=0):
+    """无界面引擎的推进速度（随机蓄力策略，结束后自动重开）"""
+    rng = random.Random(seed)
+    print(f"{'preview':>8} {'frames':>8} {'games':>6} {'frames/s':>10} {'frames/min':>12}")
+    for preview in (False, True):
+        engine = JumpEngine(width=40, height=12, difficulty=1, seed=seed, preview=preview)
+        games = 0
+        hold = 0
+        start = time.perf_counter()
+        for _ in range(frames):
+            if engine.charging:
+                hold -= 1
+                action = RELEASE if hold <= 0 else NOOP
+            elif not engine.is_jumping:
+                hold = rng.randint(1, 50)
+                action = PRESS
+            else:
+                action = NOOP
+            if engine.step(action) != GameState.RUNNING:
+                games += 1
+                engine.reset()
+        elapsed = time.perf_counter() - start
+        print(f"{str(preview):>8} {frames:>8} {games:>6} {frames / elapsed:>10.0f} "
+              f"{frames / elapsed * 60:>12.0f}")
+
+
+def bench_trajectory(rounds=200):
+    """蓄力时轨迹预测的单帧耗时：首次蓄力（缓存未命中）与满蓄力后（命中）"""
+    engine = JumpEngine(width=40, height=12, difficulty=1, seed=0)
+    levels = list(range(0, engine.max_charge_power + 1, engine.charge_rate))
+    cold = FrameTimer(window=rounds * len(levels))
+    warm = FrameTimer(window=rounds * len(levels))
+    for _ in range(rounds):
+        # 清空轨迹缓存，模拟一次全新的蓄力过程（跳跃曲线与位置无关，保留）
+        engine._trajectory_cache.clear()
+        for charge in levels:
+            cold.start()
+            engine._calculate_trajectory(charge)
+            cold.stop()
+        # 满蓄力后按住不放：输入不变，每帧都命中缓存
+        for _ in levels:
+            warm.start()
+            engine._calculate_trajectory(engine.max_charge_power)
+            warm.stop()
+    print(f"{'case':>6} {'mean us':>9} {'p99 us':>9}")
+    for name, timer in (('cold', cold), ('warm', warm)):
+        print(f"{name:>6} {timer.mean_ms * 1000:>9.2f} {timer.p99_ms * 1000:>9.2f}")
+
+
+def bench_particles(count=10000, frames=100):
+    """10k 粒子：逐个 Particle.update 与批量粒子池的单帧耗时"""
+    try:
+        from legacy_projects.particles import ParticlePool, SlotParticlePool, np
+    except ImportError:
+        from particles import ParticlePool, SlotParticlePool, np
+    lifetime = frames * 2  # 测量期间没有粒子死亡，保证每帧的工作量相同
+
+    rng = random.Random(0)
+    objects = [Particle(0.0, 0.0, lifetime=lifetime, rng=rng) for _ in range(count)]
+    timer = FrameTimer(window=frames)
+    for _ in range(frames):
+        timer.start()
+        objects = [p for p in objects if p.update()]
+        timer.stop()
+    results = [('Particle objects', timer.mean_ms)]
+
+    pools = [('SlotParticlePool', SlotParticlePool)]
+    if np is not None:
+        pools.append(('ParticlePool (numpy)', ParticlePool))
+    for name, pool_cls in pools:
+        pool = pool_cls(capacity=count, seed=0)
+        pool.emit(0.0, 0.0, count, (-0.5, 0.5), (-1.0, -0.5), lifetime)
+        timer = FrameTimer(window=frames)
+        for _ in range(frames):
+            timer.start()
+            pool.update()
+            timer.stop()
+        results.append((name, timer.mean_ms))
+
+    if np is None:
+        print("未安装 NumPy，只比较纯 Python 实现")
+    baseline = results[0][1]
+    print(f"{'implementation':>22} {'ms/frame':>9} {'speedup':>8}")
+    for name, ms in results:
+        print(f"{name:>22} {ms:>9.3f} {baseline / ms:>7.1f}x")
+
+
+def bench_entities(count=100000, passes=5):
+    """10 万个平台：dict 与 __slots__ Platform 的内存占用和属性读取耗时"""
+    import tracemalloc
+
+    def build_dicts():
+        return [{'x': i, 'y': 10, 'length': 8, 'type': 'normal', 'landed_on': False}
+                for i in range(count)]
+
+    def build_slots():
+        return [Platform(i, 10, 8) for i in range(count)]
+
+    def read_dicts(items):
+        total = 0
+        for p in items:
+            if p['y'] - 1 <= 10 <= p['y'] + 1 and p['x'] - 1 <= 5 < p['x'] + p['length']:
+                total += 1
+        return total
+
+    def read_slots(items):
+        total = 0
+        for p in items:
+            if p.y - 1 <= 10 <= p.y + 1 and p.x - 1 <= 5 < p.x + p.length:
+                total += 1
+        return total
+
+    print(f"{'layout':>8} {'bytes/entity':>13} {'scan ms':>9}")
+    for name, build, read in (('dict', build_dicts, read_dicts),
+                              ('slots', build_slots, read_slots)):
+        tracemalloc.start()
+        items = build()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        start = time.perf_counter()
+        for _ in range(passes):
+            read(items)
+        elapsed = (time.perf_counter() - start) / passes * 1000
+        print(f"{name:>8} {size / count:>13.1f} {elapsed:>9.2f}")
+
+
+def _greedy_charge(engine):
+    """选择能落到前方新平台上的最小蓄力值，没有则返回 None"""
+    for charge in range(0, engine.max_charge_power + 1, engine.charge_rate):
+        landing = engine.predict_jump(charge).platform
+        if landing is not None and not landing.landed_on:
+            return charge
+    return None
+
+
+def _greedy_jump(engine):
+    """按 _greedy_charge 跳一次并等到落地，游戏结束时重开"""
+    target = _greedy_charge(engine)
+    if target is not None:
+        engine.step(PRESS)
+        while engine.charge_power < target:
+            engine.step()
+        engine.step(RELEASE)
+    engine.step()
+    while engine.is_jumping and engine.state == GameState.RUNNING:
+        engine.step()
+    if engine.state != GameState.RUNNING:
+        engine.reset()
+
+
+def bench_world(checkpoints=(1000, 10000, 100000), seed=0):
+    """一直向右跳：行进距离增长时实体数量、索引大小和内存保持不变"""
+    import tracemalloc
+
+    engine = JumpEngine(width=40, height=12, difficulty=1, seed=seed, preview=False)
+    engine._jump_profile(0)  # 让跳跃曲线缓存先于内存统计建立
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    print(f"{'distance':>9} {'platforms':>10} {'chunks':>7} {'columns':>8} "
+          f"{'KiB':>8} {'ticks/s':>9}")
+    start = time.perf_counter()
+    ticks = 0
+    for checkpoint in checkpoints:
+        while engine.player_x < checkpoint:
+            target = None if engine.is_jumping else _greedy_charge(engine)
+            if target is not None:
+                engine.step(PRESS)
+                while engine.charge_power < target:
+                    engine.step()
+                    ticks += 1
+                engine.step(RELEASE)
+            else:
+                engine.step()
+            ticks += 1
+            if engine.state != GameState.RUNNING:
+                engine.reset()
+                print("（游戏结束，重新开始）")
+        memory = (tracemalloc.get_traced_memory()[0] - baseline) / 1024
+        print(f"{checkpoint:>9} {len(engine.platforms):>10} {len(engine.chunks):>7} "
+              f"{len(engine.platform_index.columns):>8} {memory:>8.1f} "
+              f"{ticks / (time.perf_counter() - start):>9.0f}")
+    tracemalloc.stop()
+
+
+def bench_replay(games=20, max_frames=20000):
+    """录制贪心策略的多局游戏，再以最高速度回放并校验最终状态摘要"""
+    print(f"{'seed':>5} {'score':>6} {'frames':>7} {'events':>7} {'bytes':>6} "
+          f"{'frames/s':>9} {'match':>6}")
+    mismatches = 0
+    for seed in range(games):
+        engine = JumpEngine(width=40, height=12, difficulty=1 + seed % 3, seed=seed)
+        recorder = InputRecorder(engine)
+        while engine.state == GameState.RUNNING and engine.frame_count < max_frames:
+            target = None if engine.is_jumping else _greedy_charge(engine)
+            if target is None:
+                engine.step()
+                continue
+            engine.step(PRESS)
+            while engine.charge_power < target:
+                engine.step()
+            engine.step(RELEASE)
+        data = recorder.finish().to_bytes()
+        result = replay(Recording.from_bytes(data))
+        mismatches += not result.ok
+        print(f"{seed:>5} {result.score:>6} {result.frames:>7} {recorder.event_count:>7} "
+              f"{len(data):>6} {result.frames_per_second:>9.0f} {str(result.ok):>6}")
+    print(f"不一致: {mismatches}/{games}")
+
+
+def bench_terminal(sizes=((80, 24), (200, 50)), frames=600, fps=60):
+    """终端渲染：差量输出与每帧整屏重画的耗时和每帧字节数（自动游玩，输出丢弃）"""
+    print(f"{'size':>8} {'mode':>6} {'ms/frame':>9} {'p99 ms':>7} {'B/frame':>8} "
+          f"{'max B':>7} {'KB/s@' + str(fps):>9}")
+    with open(os.devnull, 'wb') as sink:
+        for cols, rows in sizes:
+            for full in (False, True):
+                game = TerminalGame(40, 12, 1, seed=0, fps=fps, autoplay=True, out=sink,
+                                    size=(cols, rows))
+                timer = FrameTimer(window=frames)
+                sizes_b = []
+                accumulator = 0.0
+                for _ in range(frames):
+                    timer.start()
+                    accumulator += 1.0 / fps
+                    while accumulator >= game.tick_interval:
+                        game.autoplayer.act()
+                        if game.step() != GameState.RUNNING:
+                            game.reset()
+                        accumulator -= game.tick_interval
+                    if full:
+                        game.screen.invalidate()
+                    sizes_b.append(game.draw(accumulator / game.tick_interval))
+                    timer.stop()
+                mean_b = sum(sizes_b) / len(sizes_b)
+                print(f"{cols:>4}x{rows:<3} {'full' if full else 'diff':>6} "
+                      f"{timer.mean_ms:>9.3f} {timer.p99_ms:>7.3f} {mean_b:>8.0f} "
+                      f"{max(sizes_b):>7} {mean_b * fps / 1024:>9.1f}")
+
+
+def bench_batch(envs=(256, 4096, 65536), total=2000000):
+    """批量向量化环境（BatchJumpEnv）每秒推进的游戏帧数"""
+    if jump_batch.np is None:
+        print("需要安装 NumPy")
+        return
+    jump_batch.bench(envs, total)
+
+
+def bench_snapshot(widths=(40, 120, 400), rounds=20000):
+    """状态快照：每秒保存/恢复次数和每个快照的字节数，与 copy.deepcopy 对比
+
+    快速恢复为布局未变（回到同一帧）的情况，重建为在两个布局不同的快照之间
+    来回切换，每次都要重建实体和索引。
+    """
+    import copy
+
+    print(f"{'width':>6} {'entities':>9} {'bytes':>6} {'snap/s':>9} {'fast/s':>9} "
+          f"{'rebuild/s':>10} {'deepcopy/s':>11}")
+    for width in widths:
+        engine = JumpEngine(width=width, height=12, difficulty=1, seed=0, preview=False)
+        # 先玩一段，让镜头前后的地形都生成出来
+        while engine.player_x < width * 3:
+            _greedy_jump(engine)
+        first = engine.snapshot()
+        version = engine.platform_index.version
+        while engine.platform_index.version == version:
+            _greedy_jump(engine)
+        second = engine.snapshot()
+        entities = len(engine.platforms) + len(engine.obstacles)
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            engine.snapshot()
+        snap_rate = rounds / (time.perf_counter() - start)
+        engine.restore(first)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            engine.restore(first)
+        fast_rate = rounds / (time.perf_counter() - start)
+        start = time.perf_counter()
+        for i in range(rounds // 4):
+            engine.restore(second if i & 1 else first)
+        rebuild_rate = rounds // 4 / (time.perf_counter() - start)
+        copies = max(20, rounds // 200)
+        start = time.perf_counter()
+        for _ in range(copies):
+            copy.deepcopy(engine)
+        copy_rate = copies / (time.perf_counter() - start)
+        print(f"{width:>6} {entities:>9} {len(first):>6} {snap_rate:>9.0f} {fast_rate:>9.0f} "
+              f"{rebuild_rate:>10.0f} {copy_rate:>11.0f}")
+
+
+def bench_video(frames=600):
+    """离屏渲染（FrameRenderer）每帧的绘制耗时、写原始帧和编码 PNG 的帧率"""
+    if jump_video.np is None:
+        print("需要安装 NumPy")
+        return
+    jump_video.bench(frames=frames)
+
+
+BENCHMARKS = {
+    'index': bench_index,
+    'render': bench_render,
+    'engine': bench_engine,
+    'trajectory': bench_trajectory,
+    'particles': bench_particles,
+    'entities': bench_entities,
+    'world': bench_world,
+    'replay': bench_replay,
+    'terminal': bench_terminal,
+    'batch': bench_batch,
+    'snapshot': bench_snapshot,
+    'video': bench_video,
+}
+
+
+def main(argv=None):
+    names = (argv if argv is not None else sys.argv[1:]) or list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            print(f"未知基准: {name}，可选: {', '.join(BENCHMARKS)}")
+            return 1
+        print(f"== {name} ==")
+        BENCHMARKS[name]()
+        print()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
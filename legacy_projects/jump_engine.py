@@ -0,0 +1,762 @@
+"""跳一跳游戏的无界面模拟核心
+
+JumpEngine 只包含游戏规则和状态，不依赖 tkinter，可以在无显示器的
+环境中以最高速度逐帧推进；Tk 前端 JumpGame 继承它并负责绘制和输入。
+
+    engine = JumpEngine(width=40, height=12, difficulty=1, seed=42)
+    engine.step(PRESS)
+    for _ in range(20):
+        engine.step()
+    engine.step(RELEASE)
+"""
+import hashlib
+import random
+import struct
+from array import array
+from enum import Enum
+from collections import deque, namedtuple
+
+try:
+    from legacy_projects.spatial_index import ColumnIndex
+    from legacy_projects.particles import create_particle_pool
+    from legacy_projects.jump_reach import load_table
+except ImportError:
+    # 作为普通脚本运行时的路径处理
+    from spatial_index import ColumnIndex
+    from particles import create_particle_pool
+    from jump_reach import load_table
+
+
+class GameState(Enum):
+    """游戏状态枚举"""
+    RUNNING = 1
+    GAME_OVER = 2
+    PAUSED = 3
+    WIN = 4
+
+
+class Platform:
+    """平台"""
+    __slots__ = ('x', 'y', 'length', 'type', 'landed_on')
+
+    def __init__(self, x, y, length, type_='normal', landed_on=False):
+        self.x = x
+        self.y = y
+        self.length = length
+        self.type = type_
+        self.landed_on = landed_on  # 是否已经被踩过（用于加分）
+
+    def __repr__(self):
+        return f"Platform(x={self.x}, y={self.y}, length={self.length})"
+
+
+class Obstacle:
+    """障碍物"""
+    __slots__ = ('x', 'y', 'width')
+
+    def __init__(self, x, y, width=2):
+        self.x = x
+        self.y = y
+        self.width = width
+
+    def __repr__(self):
+        return f"Obstacle(x={self.x}, y={self.y}, width={self.width})"
+
+
+class WorldChunk:
+    """一段地形：在 [start, end) 列内生成的平台和障碍物"""
+    __slots__ = ('start', 'end', 'platforms', 'obstacles')
+
+    def __init__(self, start):
+        self.start = start
+        self.end = start
+        self.platforms = []
+        self.obstacles = []
+
+
+# step() 接受的动作
+NOOP = 0
+PRESS = 1
+RELEASE = 2
+
+# 轨迹预测最多模拟的帧数
+TRAJECTORY_STEPS = 80
+
+# 每个地形块的宽度（列）；镜头左侧超过 EVICT_MARGIN 列的地形块会被回收
+CHUNK_WIDTH = 32
+EVICT_MARGIN = 4
+
+# 修复够不着的平台时，平台间空出的列数的下限（留出障碍物的碰撞范围）和上限的余量
+MIN_GAP = 4
+MAX_GAP_EXTRA = 8
+
+# 状态快照：小端的头部（含种子和宽、高、难度，恢复时必须与引擎一致）之后
+# 依次是布局（平台 x/y/length/type、障碍物 x/y/width、地形块 start/end/
+# 平台数/障碍物数，均为 int32）、随机数生成器的内部状态（625 个 uint32）、
+# 每个平台是否踩过和输入缓冲（各 1 字节）；int32/uint32 缓冲区直接使用
+# array 的本机字节序
+SNAPSHOT_MAGIC = b'JSNP'
+SNAPSHOT_VERSION = 2
+SNAPSHOT_HEADER = struct.Struct('<4sBQHHB12dqq4iB6?3HBB?d')
+# 种子在快照和录像中都存为 uint64
+MAX_SEED = (1 << 64) - 1
+RNG_WORDS = 625
+PLATFORM_TYPES = ('normal',)
+
+# 跳跃预测结果：轨迹点、落点平台（未落到平台上为 None）、经过的帧数和终点坐标
+Trajectory = namedtuple('Trajectory', 'points platform frames x y')
+
+
+def check_seed(seed):
+    """检查种子能否存入快照和录像（0 到 MAX_SEED 之间的整数），返回种子本身"""
+    if not isinstance(seed, int) or not 0 <= seed <= MAX_SEED:
+        raise ValueError(f"种子必须是 0 到 2**64-1 之间的整数: {seed!r}")
+    return seed
+
+
+class JumpEngine:
+    """跳一跳游戏规则与状态（无界面）"""
+
+    def __init__(self, width=60, height=15, difficulty=1, seed=None, preview=True,
+                 win_score=None, min_window=1):
+        """初始化游戏
+
+        seed 相同的两局游戏在相同输入下完全一致，不传时随机选取一个并记录在
+        self.seed 中；preview=False 时不计算蓄力轨迹预测，适合只关心结果的批量模拟。
+        win_score 不为空时，得分达到该值即进入 GameState.WIN。
+        min_window 为每一跳至少要有的有效蓄力档位数（见 jump_reach），生成地形
+        时不满足的平台会调整间隔；为 0 时不做检查。
+        seed 必须是 0 到 MAX_SEED 之间的整数。
+        """
+        self.width = width
+        self.height = height
+        self.difficulty = difficulty
+        if seed is None:
+            seed = random.randrange(1 << 32)
+        self.seed = check_seed(seed)
+        self.rng = random.Random(seed)
+        self.preview = preview
+        
+        # 玩家状态
+        self.player_x = 5
+        self.player_y = float(height - 3)
+        # 上一帧物理更新前的位置，供渲染插值
+        self.prev_player_x = self.player_x
+        self.prev_player_y = self.player_y
+        self.is_jumping = False
+        self.jump_velocity = 0
+        self.jump_velocity_x = 0  # 水平速度
+        # 调低重力，让抛物线更圆、更慢
+        self.gravity = 0.3
+        self.jump_power = -3.5
+        self.max_fall_speed = 1.5
+
+        # 游戏对象（按 x 递增排列，回收时从左端弹出）
+        self.platforms = deque()
+        self.obstacles = deque()
+        # 已生成的地形块（环形缓冲：右侧追加，左侧回收）和地形的最右端
+        self.chunks = deque()
+        self.world_tail = 0
+        self.powerups = []
+        # 着陆、死亡、道具的粒子特效（批量更新的粒子池）
+        self.particles = create_particle_pool(seed=seed)
+        # 按列分桶的索引，碰撞检测和轨迹预测只查询 x 所在列
+        self.platform_index = ColumnIndex()
+        self.obstacle_index = ColumnIndex()
+        self.score = 0
+        self.high_score = 0
+        self.win_score = win_score
+        self.combo = 0
+        self.max_combo = 0
+        self.state = GameState.RUNNING
+
+        # 特效和状态
+        self.shield_active = False
+        self.shield_time = 0
+        self.speed_boost = False
+        self.speed_time = 0
+        # 镜头左边缘的世界坐标，只向右移动；玩家保持在画面左侧 camera_lead 列处
+        self.camera_offset = 0
+        self.prev_camera_offset = 0
+        self.camera_lead = width // 4
+        self.shake_intensity = 0
+
+        # 游戏配置
+        self.platform_spacing = max(5, 10 - difficulty * 2)
+        self.platform_width = max(4, 9 - difficulty)
+        self.game_speed = 1 + difficulty * 0.3
+        self.frame_count = 0
+
+        # 输入缓冲：界面事件先排队，每帧开始时取出一个，保证输入总是落在帧边界上
+        self.input_buffer = deque(maxlen=5)
+        self.jump_pressed = False
+        # 输入录制器（jump_replay.InputRecorder），记录每次生效的按下/松开
+        self.recorder = None
+
+        # 蓄力系统
+        self.charging = False
+        self.charge_power = 0
+        self.max_charge_power = 100
+        # 调低蓄力速度，让进度条和抛物线生成更平滑
+        self.charge_rate = 2  # 每帧增加的蓄力值
+        self.trajectory_points = []  # 轨迹预测点（使用浮点坐标）
+        # 蓄力值 -> (水平速度, 每帧垂直位移)，与起跳位置无关，只需计算一次
+        self._jump_profiles = {}
+        # (蓄力值, 玩家位置, 布局版本) -> Trajectory
+        self._trajectory_cache = {}
+        # 蓄力可达性表，生成地形时保证每个平台都能跳上去
+        self.min_window = min_window
+        self.reach = (load_table(self.gravity, self.max_fall_speed, self.max_charge_power,
+                                 self.charge_rate) if min_window else None)
+
+        # 分阶段耗时统计（perf_stats.StageProfiler），为 None 时不计时
+        self.profiler = None
+        # 上一次打包/恢复的地形数据：(列索引版本号, 布局和随机数状态的字节,
+        # 随机数状态的版本, gauss_next)
+        self._snapshot_world = None
+
+        # 初始化
+        self._init_platforms()
+        self.running = True
+
+    def on_space_press(self, event=None):
+        """空格键按下 - 开始蓄力"""
+        # 只在未蓄力且未在空中时才开始蓄力，避免重复重置
+        if (not self.is_jumping 
+                and self.state == GameState.RUNNING 
+                and not self.charging):
+            self.charging = True
+            self.charge_power = 0
+            if self.recorder is not None:
+                self.recorder.record(self.frame_count, PRESS)
+    
+    def on_space_release(self, event=None):
+        """空格键释放 - 执行跳跃"""
+        if self.charging:
+            if self.recorder is not None:
+                self.recorder.record(self.frame_count, RELEASE)
+            self.charging = False
+            self.jump(self.charge_power)
+            self.charge_power = 0
+            self.trajectory_points = []
+    
+    def _add_platform(self, platform):
+        """添加平台并登记到索引（着陆判定范围为 [x-1, x+length)）"""
+        self.platforms.append(platform)
+        self.platform_index.add(platform, platform.x - 1,
+                                platform.x + platform.length)
+
+    def _add_obstacle(self, obs):
+        """添加障碍物并登记到索引（碰撞范围为 [x-1, x+width+1)）"""
+        self.obstacles.append(obs)
+        self.obstacle_index.add(obs, obs.x - 1, obs.x + obs.width + 1)
+
+    def _init_platforms(self):
+        """初始化游戏平台：起始平台加上镜头前方的地形"""
+        # 创建初始平台，确保玩家能站上去
+        chunk = WorldChunk(0)
+        self._add_platform(Platform(0, self.height - 2, 8))
+        chunk.platforms.append(self.platforms[-1])
+        chunk.end = self.world_tail = 10  # 从第二个平台开始
+        self.chunks.append(chunk)
+        self._extend_world()
+
+    def _generate_chunk(self):
+        """从 world_tail 开始生成一个地形块"""
+        chunk = WorldChunk(self.world_tail)
+        x = self.world_tail
+        limit = chunk.start + CHUNK_WIDTH
+        while x < limit:
+            platform_length = self.rng.randint(self.platform_width, self.platform_width + 3)
+            y = self.rng.randint(self.height - 5, self.height - 2)
+            if self.reach is not None:
+                x = self._reachable_x(x, y, platform_length)
+            platform = Platform(x, y, platform_length)
+            self._add_platform(platform)
+            chunk.platforms.append(platform)
+            
+            # 随机添加障碍物
+            if self.rng.random() < 0.3:
+                obs = Obstacle(x + platform_length + 1, y - 1, 2)
+                self._add_obstacle(obs)
+                chunk.obstacles.append(obs)
+            
+            x += self.platform_spacing + platform_length + 1
+        chunk.end = self.world_tail = x
+        self.chunks.append(chunk)
+
+    def _reachable_x(self, x, y, length):
+        """查可达性表确认能从上一个平台跳到 (x, y)，否则就近调整间隔
+
+        上一个平台上的任意站立位置都要有至少 min_window 档蓄力能落上去，
+        任何间隔都达不到时取窗口最宽的一个。调整只改变 x，不消耗随机数，
+        同一个种子生成的地形仍然确定。
+        """
+        prev = self.platforms[-1]
+        end = prev.x + prev.length
+        obstacle = bool(self.obstacles) and self.obstacles[-1].x == end + 1
+        bottom = y == self.height - 2
+        dy = y - prev.y
+        gap = x - end - 1
+        width = self.reach.jump_width
+        best = width(prev.length, gap, dy, length, obstacle, bottom)
+        if best >= self.min_window:
+            return x
+        best_gap = gap
+        for candidate in sorted(range(MIN_GAP, gap + MAX_GAP_EXTRA + 1),
+                                key=lambda g: (abs(g - gap), g)):
+            current = width(prev.length, candidate, dy, length, obstacle, bottom)
+            if current >= self.min_window:
+                return end + candidate + 1
+            if current > best:
+                best, best_gap = current, candidate
+        # 达不到 min_window 时取窗口最宽的间隔
+        return end + best_gap + 1
+
+    def _extend_world(self):
+        """保证镜头右侧至少还有一屏地形"""
+        while self.world_tail < self.camera_offset + self.width * 2:
+            self._generate_chunk()
+
+    def _evict_chunks(self):
+        """回收完全位于镜头左侧的地形块，每个实体 O(1) 出队"""
+        chunks = self.chunks
+        limit = self.camera_offset - EVICT_MARGIN
+        while len(chunks) > 1 and chunks[0].end <= limit:
+            chunk = chunks.popleft()
+            for platform in chunk.platforms:
+                self.platforms.popleft()
+                self.platform_index.remove(platform)
+            for obs in chunk.obstacles:
+                self.obstacles.popleft()
+                self.obstacle_index.remove(obs)
+    
+    def _check_collision(self):
+        """检查碰撞"""
+        player_y = int(self.player_y)
+        player_x = int(self.player_x)
+        
+        # 检查与平台的碰撞（着陆）- 使用更宽松的条件
+        for platform in self.platform_index.at(player_x):
+            # 玩家的脚接近平台顶部且在平台范围内
+            if (player_y >= platform.y - 1 and 
+                player_y <= platform.y + 1 and
+                platform.x - 1 <= player_x < platform.x + platform.length and
+                self.jump_velocity >= 0):  # 向下或静止
+                # 着陆在平台上（站立时每帧也会走到这里，只在落地瞬间发射特效）
+                if self.is_jumping:
+                    self.spawn_effect('land', self.player_x + 0.5, platform.y)
+                self.is_jumping = False
+                self.jump_velocity = 0
+                self.jump_velocity_x = 0
+                self.player_y = platform.y - 1
+                
+                # 只有第一次踩到该平台才加分
+                if not platform.landed_on:
+                    platform.landed_on = True
+                    self.score += 1
+                    if self.win_score is not None and self.score >= self.win_score:
+                        self.win()
+                return True
+        
+        # 检查与障碍物的碰撞
+        for obs in self.obstacle_index.at(player_x):
+            if (player_y >= obs.y - 1 and 
+                player_y <= obs.y + 1 and 
+                obs.x - 1 <= player_x < obs.x + obs.width + 1):
+                self.game_over()
+                return False
+        
+        # 掉下去了
+        if player_y >= self.height - 1:
+            self.game_over()
+            return False
+        
+        return True
+    
+    def _update_physics(self):
+        """更新物理"""
+        if self.is_jumping:
+            # 垂直速度受重力缓慢变化
+            self.jump_velocity += self.gravity
+            self.player_y += self.jump_velocity
+
+            # 水平移动（与垂直一样，每帧小步运动）
+            self.player_x += self.jump_velocity_x
+            # 不能退到镜头左边缘之外
+            if self.player_x < self.camera_offset:
+                self.player_x = self.camera_offset
+
+            # 限制最大下落速度，避免掉落过快
+            if self.jump_velocity > self.max_fall_speed:
+                self.jump_velocity = self.max_fall_speed
+        else:
+            # 检查脚下是否有平台
+            has_ground = False
+            next_y = int(self.player_y + 1)
+            
+            for platform in self.platform_index.at(self.player_x):
+                if (next_y == platform.y and 
+                    platform.x <= self.player_x < platform.x + platform.length):
+                    has_ground = True
+                    break
+            
+            # 没有平台就下落
+            if not has_ground and self.player_y < self.height - 1:
+                self.is_jumping = True
+                self.jump_velocity = 0.5
+    
+    def _jump_profile(self, charge):
+        """某一蓄力值对应的水平速度和逐帧垂直位移（与 jump/_update_physics 一致）"""
+        profile = self._jump_profiles.get(charge)
+        if profile is None:
+            power_multiplier = 1 + (charge / self.max_charge_power) * 1.5
+            velocity_y = -1.0 * power_multiplier
+            steps = []
+            for i in range(TRAJECTORY_STEPS):
+                velocity_y += self.gravity
+                steps.append(velocity_y)
+                if velocity_y > self.max_fall_speed:
+                    velocity_y = self.max_fall_speed
+            profile = self._jump_profiles[charge] = (0.6 * power_multiplier, tuple(steps))
+        return profile
+
+    def predict_jump(self, charge):
+        """预测以 charge 蓄力从当前位置起跳的结果
+
+        逐帧位移取自预先计算好的跳跃曲线，落点通过列索引判断；结果按
+        (蓄力值, 玩家位置, 平台/障碍物布局版本) 缓存，输入不变时直接返回。
+        """
+        key = (charge, self.player_x, self.player_y,
+               self.platform_index.version, self.obstacle_index.version)
+        cached = self._trajectory_cache.get(key)
+        if cached is not None:
+            return cached
+
+        velocity_x, steps = self._jump_profile(charge)
+        platform_columns = self.platform_index.columns
+        obstacle_columns = self.obstacle_index.columns
+        bottom = self.height - 1
+        sim_x = self.player_x
+        sim_y = self.player_y
+        points = []
+        append = points.append
+        landing = None
+        frames = 0
+        for velocity_y in steps:
+            frames += 1
+            sim_y += velocity_y
+            sim_x += velocity_x
+            # 使用浮点坐标记录轨迹点，使线条更顺滑（画面外的部分贴着顶部）
+            append((sim_x, sim_y if sim_y > 0 else 0))
+
+            row = int(sim_y)
+            col = int(sim_x)
+            # 与 _check_collision 相同的顺序：先平台（下落时），再障碍物，最后掉落
+            if velocity_y >= 0:
+                for platform in platform_columns.get(col, ()):
+                    if (platform.y - 1 <= row <= platform.y + 1 and
+                            platform.x - 1 <= col < platform.x + platform.length):
+                        landing = platform
+                        break
+                if landing is not None:
+                    append((col, row))
+                    break
+                if row >= bottom:
+                    break
+            obstacles = obstacle_columns.get(col)
+            if obstacles is not None and any(
+                    obs.y - 1 <= row <= obs.y + 1 for obs in obstacles):
+                break
+
+        result = Trajectory(points, landing, frames, sim_x, sim_y)
+        if len(self._trajectory_cache) >= 512:
+            self._trajectory_cache.clear()
+        self._trajectory_cache[key] = result
+        return result
+
+    def _calculate_trajectory(self, charge_power):
+        """计算跳跃轨迹（结果带缓存，见 predict_jump）"""
+        self.trajectory_points = self.predict_jump(charge_power).points
+    
+    def _update_camera(self):
+        """镜头跟随玩家向右滚动"""
+        target = self.player_x - self.camera_lead
+        if target > self.camera_offset:
+            self.camera_offset = target
+
+    def _cleanup_platforms(self):
+        """回收镜头后方的地形块，并在前方按需生成新的地形块"""
+        self._evict_chunks()
+        self._extend_world()
+    
+    def jump(self, charge=0):
+        """跳跃"""
+        if not self.is_jumping and self.state == GameState.RUNNING:
+            self.is_jumping = True
+            # 根据蓄力值计算跳跃力度（整体偏慢）
+            power_multiplier = 1 + (charge / self.max_charge_power) * 1.5
+            # 垂直向上速度（减小幅度）
+            self.jump_velocity = -1.0 * power_multiplier
+            # 水平向右速度（更小，便于观察抛物线）
+            self.jump_velocity_x = 0.6 * power_multiplier
+    
+    def spawn_effect(self, kind, x, y):
+        """在 (x, y) 处发射一组粒子特效（'land' / 'death' / 'powerup'）"""
+        self.particles.burst(kind, x, y)
+
+    def game_over(self):
+        """游戏结束"""
+        self.state = GameState.GAME_OVER
+        self.running = False
+        self.spawn_effect('death', self.player_x + 0.5, self.player_y + 0.5)
+
+    def win(self):
+        """达到目标得分"""
+        self.state = GameState.WIN
+        self.running = False
+
+    def reset(self, seed=None):
+        """重新开始一局
+
+        不传 seed 时由当前随机数生成器派生新种子，因此从同一个初始种子出发的
+        连续多局仍然可以复现，并且每一局都有自己的 self.seed。
+        seed 的要求与 __init__ 相同，不合法时引擎状态保持不变。
+        """
+        if seed is None:
+            seed = self.rng.getrandbits(32)
+        self.seed = check_seed(seed)
+        self.rng.seed(seed)
+        self.player_x = 5
+        self.player_y = float(self.height - 3)
+        self.prev_player_x = self.player_x
+        self.prev_player_y = self.player_y
+        self.is_jumping = False
+        self.jump_velocity = 0
+        self.jump_velocity_x = 0
+        self.score = 0
+        self.combo = 0
+        self.frame_count = 0
+        self.state = GameState.RUNNING
+        self.platforms.clear()
+        self.obstacles.clear()
+        self.chunks.clear()
+        self.world_tail = 0
+        self.camera_offset = 0
+        self.prev_camera_offset = 0
+        self.platform_index.clear()
+        self.obstacle_index.clear()
+        self.charging = False
+        self.charge_power = 0
+        self.trajectory_points = []
+        self.particles.clear()
+        self.input_buffer.clear()
+        self._init_platforms()
+        self.running = True
+
+    def tick(self):
+        """推进一帧：蓄力、物理、碰撞、平台生成、粒子特效"""
+        if not (self.running and self.state == GameState.RUNNING):
+            return
+        # 更新蓄力
+        if self.charging:
+            self.charge_power += self.charge_rate
+            if self.charge_power > self.max_charge_power:
+                self.charge_power = self.max_charge_power
+
+            # 实时计算轨迹
+            if self.preview:
+                self._calculate_trajectory(self.charge_power)
+
+        self.prev_player_x = self.player_x
+        self.prev_player_y = self.player_y
+        self.prev_camera_offset = self.camera_offset
+        profiler = self.profiler
+        if profiler is None:
+            self._update_physics()
+            self._check_collision()
+            self._update_camera()
+            self._cleanup_platforms()
+            if self.particles:
+                self.particles.update()
+        else:
+            # 更新物理
+            with profiler.stage('physics'):
+                self._update_physics()
+
+            # 检查碰撞
+            with profiler.stage('collision'):
+                self._check_collision()
+
+            # 镜头滚动，回收和生成地形
+            with profiler.stage('cleanup'):
+                self._update_camera()
+                self._cleanup_platforms()
+
+            # 粒子特效
+            with profiler.stage('particles'):
+                if self.particles:
+                    self.particles.update()
+        self.frame_count += 1
+
+    def interpolated_player(self, alpha):
+        """按 alpha（0~1）在上一帧与当前帧之间插值玩家位置"""
+        return (self.prev_player_x + (self.player_x - self.prev_player_x) * alpha,
+                self.prev_player_y + (self.player_y - self.prev_player_y) * alpha)
+
+    def interpolated_camera(self, alpha):
+        """按 alpha（0~1）插值镜头位置"""
+        return self.prev_camera_offset + (self.camera_offset - self.prev_camera_offset) * alpha
+
+    def state_hash(self):
+        """游戏状态的摘要（16 字节十六进制），用于校验回放结果"""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(struct.pack(
+            '<ddddddiiiB?B', self.player_x, self.player_y, self.jump_velocity,
+            self.jump_velocity_x, self.camera_offset, self.charge_power,
+            self.score, self.frame_count, self.world_tail, self.state.value,
+            self.is_jumping, self.charging))
+        entities = array('d')
+        for p in self.platforms:
+            entities.extend((p.x, p.y, p.length, p.landed_on))
+        for o in self.obstacles:
+            entities.extend((o.x, o.y, o.width))
+        digest.update(entities.tobytes())
+        digest.update(array('I', self.rng.getstate()[1]).tobytes())
+        return digest.hexdigest()
+
+    def _pack_layout(self):
+        """把平台、障碍物和地形块打包成连续的 int32 缓冲区"""
+        types = PLATFORM_TYPES
+        layout = array('i')
+        for p in self.platforms:
+            layout.extend((p.x, p.y, p.length, types.index(p.type)))
+        for o in self.obstacles:
+            layout.extend((o.x, o.y, o.width))
+        for chunk in self.chunks:
+            layout.extend((chunk.start, chunk.end, len(chunk.platforms), len(chunk.obstacles)))
+        return layout.tobytes()
+
+    def _unpack_layout(self, data, platform_count, obstacle_count, chunk_count):
+        """用打包的布局重建平台、障碍物、地形块和列索引"""
+        layout = array('i')
+        layout.frombytes(data)
+        self.platforms.clear()
+        self.obstacles.clear()
+        self.chunks.clear()
+        self.platform_index.clear()
+        self.obstacle_index.clear()
+        pos = 0
+        for _ in range(platform_count):
+            x, y, length, type_ = layout[pos:pos + 4]
+            self._add_platform(Platform(x, y, length, PLATFORM_TYPES[type_]))
+            pos += 4
+        for _ in range(obstacle_count):
+            self._add_obstacle(Obstacle(*layout[pos:pos + 3]))
+            pos += 3
+        platforms = iter(self.platforms)
+        obstacles = iter(self.obstacles)
+        for _ in range(chunk_count):
+            start, end, n_platforms, n_obstacles = layout[pos:pos + 4]
+            chunk = WorldChunk(start)
+            chunk.end = end
+            chunk.platforms = [next(platforms) for _ in range(n_platforms)]
+            chunk.obstacles = [next(obstacles) for _ in range(n_obstacles)]
+            self.chunks.append(chunk)
+            pos += 4
+
+    def snapshot(self):
+        """把完整的游戏状态打包成 bytes，用 restore() 恢复
+
+        实体按字段放在连续的 int32 缓冲区中，不复制任何 Python 对象。随机数只在
+        生成地形和重开时使用，两者都会改变列索引的版本号，因此布局和随机数状态
+        （合称地形数据）按版本号缓存，地形没有变化时直接复用上次打包的结果。
+        粒子特效和轨迹预测只影响画面，不在快照中。
+        """
+        key = (self.platform_index.version, self.obstacle_index.version)
+        cached = self._snapshot_world
+        if cached is None or cached[0] != key:
+            rng_version, rng_state, gauss_next = self.rng.getstate()
+            cached = self._snapshot_world = (
+                key, self._pack_layout() + array('I', rng_state).tobytes(),
+                rng_version, gauss_next)
+        _, world, rng_version, gauss_next = cached
+        header = SNAPSHOT_HEADER.pack(
+            SNAPSHOT_MAGIC, SNAPSHOT_VERSION, self.seed, self.width, self.height,
+            self.difficulty, self.player_x, self.player_y, self.prev_player_x, self.prev_player_y,
+            self.jump_velocity, self.jump_velocity_x, self.camera_offset,
+            self.prev_camera_offset, self.charge_power, self.shake_intensity,
+            self.shield_time, self.speed_time,
+            self.frame_count, self.world_tail, self.score, self.high_score, self.combo,
+            self.max_combo, self.state.value,
+            self.is_jumping, self.charging, self.running, self.jump_pressed,
+            self.shield_active, self.speed_boost,
+            len(self.platforms), len(self.obstacles), len(self.chunks),
+            len(self.input_buffer), rng_version, gauss_next is not None,
+            gauss_next or 0.0)
+        return b''.join((header, world, bytes([p.landed_on for p in self.platforms]),
+                         bytes(self.input_buffer)))
+
+    def restore(self, data):
+        """恢复 snapshot() 保存的状态
+
+        地形数据与当前的相同（例如前瞻搜索中反复回到同一帧）时只恢复平台的
+        踩过标记，不重建实体、索引和随机数状态。快照的宽、高、难度与本引擎
+        不同时抛出 ValueError，状态保持不变。
+        """
+        if len(data) < SNAPSHOT_HEADER.size:
+            raise ValueError("状态快照过短")
+        fields = SNAPSHOT_HEADER.unpack_from(data)
+        if fields[0] != SNAPSHOT_MAGIC or fields[1] != SNAPSHOT_VERSION:
+            raise ValueError("不是跳一跳状态快照或版本不兼容")
+        if fields[3:6] != (self.width, self.height, self.difficulty):
+            raise ValueError(f"快照的宽、高、难度为 {fields[3:6]}，与引擎的 "
+                             f"{(self.width, self.height, self.difficulty)} 不一致")
+        (self.seed, self.player_x, self.player_y, self.prev_player_x, self.prev_player_y,
+         self.jump_velocity, self.jump_velocity_x, self.camera_offset,
+         self.prev_camera_offset, self.charge_power, self.shake_intensity,
+         self.shield_time, self.speed_time,
+         self.frame_count, self.world_tail, self.score, self.high_score, self.combo,
+         self.max_combo, state,
+         self.is_jumping, self.charging, self.running, self.jump_pressed,
+         self.shield_active, self.speed_boost,
+         platform_count, obstacle_count, chunk_count, input_count, rng_version, has_gauss,
+         gauss_next) = fields[2:3] + fields[6:]
+        self.state = GameState(state)
+
+        pos = SNAPSHOT_HEADER.size
+        layout_end = pos + (platform_count * 4 + obstacle_count * 3 + chunk_count * 4) * 4
+        end = layout_end + RNG_WORDS * 4
+        world = data[pos:end]
+        cached = self._snapshot_world
+        key = (self.platform_index.version, self.obstacle_index.version)
+        if cached is None or cached[0] != key or cached[1] != world:
+            self._unpack_layout(data[pos:layout_end], platform_count, obstacle_count,
+                                chunk_count)
+            rng_state = array('I')
+            rng_state.frombytes(data[layout_end:end])
+            gauss_next = gauss_next if has_gauss else None
+            self.rng.setstate((rng_version, tuple(rng_state), gauss_next))
+            key = (self.platform_index.version, self.obstacle_index.version)
+            self._snapshot_world = (key, bytes(world), rng_version, gauss_next)
+        for platform, landed in zip(self.platforms, data[end:end + platform_count]):
+            platform.landed_on = landed != 0
+        end += platform_count
+        self.input_buffer.clear()
+        self.input_buffer.extend(data[end:end + input_count])
+        self.trajectory_points = []
+        self.particles.clear()
+
+    def step(self, action=NOOP):
+        """执行一个动作（NOOP / PRESS / RELEASE）并推进一帧，返回游戏状态
+
+        action 为 NOOP 时从 input_buffer 中取出一个排队的输入。
+        """
+        if action == NOOP and self.input_buffer:
+            action = self.input_buffer.popleft()
+        if action == PRESS:
+            self.on_space_press()
+        elif action == RELEASE:
+            self.on_space_release()
+        self.tick()
+        return self.state
@@ -0,0 +1,389 @@
+"""跳一跳的可达性表：从站立位置起跳，哪些蓄力值能落到下一个平台上
+
+起跳轨迹只取决于蓄力值（jump 的力度公式、重力和最大下落速度），与起跳
+位置无关，因此可以预先把每一档蓄力的轨迹算好，再按目标的相对位置查表：
+
+    * dx：目标列相对起跳列的偏移，dy：目标平台相对起跳平台的高度差
+      （向下为正）；
+    * 表中每一项是一个蓄力档位的位掩码（第 i 位对应 charges[i]），
+      几个条件的掩码按位与就是有效的蓄力窗口，查询为 O(1)；
+    * 玩家站在平台上的小数坐标未知，表按最坏情况计算：窗口内的蓄力值
+      对任意小数坐标都能落到目标上，且不会落回起跳平台、不会撞上起跳
+      平台末端的障碍物。
+
+窗口内的档位数（window_width）可以作为一跳的难度：窗口越窄，蓄力需要越准。
+
+表只需计算一次，按物理参数缓存到磁盘（默认 ~/.cache/legacy_projects）：
+
+    python -m legacy_projects.jump_reach              # 打印蓄力窗口表
+    python -m legacy_projects.jump_reach --check      # 与 predict_jump 逐档对照
+"""
+import argparse
+import hashlib
+import os
+import struct
+import sys
+import time
+from array import array
+
+MAGIC = b'JRCH'
+VERSION = 1
+HEADER = struct.Struct('<4sB16sHhhH')
+
+# 表覆盖的范围：目标列偏移 [0, MAX_DX)，高度差 [-MAX_DY, MAX_DY]
+MAX_DX = 64
+MAX_DY = 8
+# 障碍物的碰撞范围宽 4 列（宽度 2，左右各扩 1 列）
+OBSTACLE_SPAN = 4
+# 轨迹最多模拟的帧数（足够落到 MAX_DY 以下）
+MAX_FRAMES = 200
+# JumpEngine 的默认物理参数：重力、最大下落速度、最大蓄力、每帧蓄力
+PHYSICS = (0.3, 1.5, 100, 2)
+# 浮点累加误差的余量：列号恰好落在整数边界附近时按更保守的一侧计算
+EPSILON = 1e-9
+
+
+def cache_dir():
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'legacy_projects')
+
+
+def cache_path(params):
+    """某组物理参数对应的缓存文件"""
+    return os.path.join(cache_dir(), f"jump_reach-{ReachTable.key(params).hex()[:12]}.bin")
+
+
+def _trajectory(charge, gravity, max_fall_speed, max_charge):
+    """某一蓄力值起跳后逐帧的 (x, y, 垂直速度)，与 jump/_update_physics 的运算顺序一致"""
+    power_multiplier = 1 + (charge / max_charge) * 1.5
+    velocity_y = -1.0 * power_multiplier
+    velocity_x = 0.6 * power_multiplier
+    x = y = 0.0
+    frames = []
+    for _ in range(MAX_FRAMES):
+        velocity_y += gravity
+        y += velocity_y
+        x += velocity_x
+        frames.append((x, y, velocity_y))
+        if velocity_y > max_fall_speed:
+            velocity_y = max_fall_speed
+        if y >= MAX_DY + 3:
+            break
+    return frames
+
+
+def _floor(value):
+    return int(value // 1)
+
+
+class ReachTable:
+    """蓄力窗口表，用 build() 计算，一般通过 load_table() 取得
+
+    坐标约定：起跳列为 0（玩家 x 的整数部分），起跳平台的 y 为 0，玩家站在
+    y=-1 的行上。目标平台的着陆范围为 [x-1, x+length) 列、[y-1, y+1] 行。
+    """
+
+    def __init__(self, params, land_from, land_until, reland, obstacle):
+        self.params = params
+        gravity, max_fall_speed, max_charge, charge_rate = params
+        self.charges = tuple(range(charge_rate, max_charge + 1, charge_rate))
+        # (dy, bottom) -> 长度 MAX_DX 的掩码列表
+        self.land_from = land_from
+        self.land_until = land_until
+        # E -> 掩码，E 为起跳平台末端（x+length）相对起跳列的偏移
+        self.reland = reland
+        self.obstacle = obstacle
+        # jump_width 的结果，生成地形时用到的参数组合很少
+        self._widths = {}
+
+    @staticmethod
+    def key(params):
+        return hashlib.blake2b(repr(tuple(params)).encode(), digest_size=16).digest()
+
+    @classmethod
+    def build(cls, gravity=0.3, max_fall_speed=1.5, max_charge=100, charge_rate=2):
+        params = (gravity, max_fall_speed, max_charge, charge_rate)
+        land_from = {}
+        land_until = {}
+        for dy in range(-MAX_DY, MAX_DY + 1):
+            for bottom in (False, True):
+                land_from[dy, bottom] = [0] * MAX_DX
+                land_until[dy, bottom] = [0] * MAX_DX
+        reland = [0] * (MAX_DX + 1)
+        obstacle = [0] * (MAX_DX + 1)
+
+        charges = range(charge_rate, max_charge + 1, charge_rate)
+        for bit, charge in enumerate(charges):
+            flag = 1 << bit
+            frames = _trajectory(charge, gravity, max_fall_speed, max_charge)
+            # 玩家所在行 = -1 + y；列 = 小数坐标 f + x，f 取 [0, 1) 中的最坏值
+            descending = [(x, _floor(y - 1)) for x, y, vy in frames if vy >= 0]
+            for dy in range(-MAX_DY, MAX_DY + 1):
+                for bottom in (False, True):
+                    # 底部平台的下一行就是掉出画面的行，只有 [y-1, y] 两行可以着陆
+                    top, low = dy - 1, dy if bottom else dy + 1
+                    band = []
+                    for x, row in descending:
+                        if row > low:
+                            break
+                        if row >= top:
+                            band.append(x)
+                    if not band:
+                        continue
+                    # 对任意 f 都能落到 [a, b] 上：最早的着陆列（f 趋近 1）不超过 b，
+                    # 最晚的着陆列（f=0）不小于 a
+                    first = _floor(band[0] + 1 - EPSILON)
+                    last = _floor(band[-1] - EPSILON)
+                    for a in range(0, min(last + 1, MAX_DX)):
+                        land_from[dy, bottom][a] |= flag
+                    for b in range(max(first, 0), MAX_DX):
+                        land_until[dy, bottom][b] |= flag
+            # 落回起跳平台：某个 f 下第一次下落到起跳平台的行时仍在平台范围内
+            for x, row in descending:
+                if -1 <= row <= 1:
+                    for end in range(_floor(x - EPSILON) + 1, MAX_DX + 1):
+                        reland[end] |= flag
+                    break
+            # 障碍物位于 y=-1 行，碰撞行为 [-2, 0]，上升和下降时都会撞上
+            for x, y, _ in frames:
+                row = _floor(y - 1)
+                if row > 0:
+                    break
+                if row >= -2:
+                    for column in (_floor(x - EPSILON), _floor(x + 1 - EPSILON)):
+                        for end in range(max(column - OBSTACLE_SPAN + 1, 0),
+                                         min(column, MAX_DX) + 1):
+                            obstacle[end] |= flag
+        return cls(params, land_from, land_until, reland, obstacle)
+
+    # ------------------------------------------------------------ 查询
+
+    def window(self, dx, dy, length, end, obstacle=False, bottom=False):
+        """能落到目标平台上的蓄力档位掩码
+
+        dx 为目标平台左端 x 相对起跳列的偏移，dy 为高度差，length 为目标
+        平台长度；end 为起跳平台末端（x+length）相对起跳列的偏移，obstacle
+        表示起跳平台末端有障碍物；bottom 表示目标平台位于最底部一行。
+        """
+        if not -MAX_DY <= dy <= MAX_DY:
+            return 0
+        a = max(dx - 1, 0)
+        b = dx + length - 1
+        if a >= MAX_DX:
+            return 0
+        mask = self.land_from[dy, bottom][a] & self.land_until[dy, bottom][min(b, MAX_DX - 1)]
+        mask &= ~self.reland[min(end, MAX_DX)]
+        if obstacle:
+            mask &= ~self.obstacle[min(end, MAX_DX)]
+        return mask
+
+    def jump_width(self, length, gap, dy, next_length, obstacle=False, bottom=False):
+        """从长度为 length 的平台上任意位置起跳，落到下一个平台的最窄窗口（档位数）
+
+        下一个平台的 x 比起跳平台的末端（x+length）远 gap+1 列，其余参数同
+        window。结果按参数记忆，生成地形时每个平台只需一次字典查找。
+        """
+        key = (length, gap, dy, next_length, obstacle, bottom)
+        width = self._widths.get(key)
+        if width is None:
+            next_x = length + gap + 1
+            # 可以站立的列为 [x-1, x+length)
+            width = min(self.window_width(self.window(next_x - start, dy, next_length,
+                                                      length - start, obstacle, bottom))
+                        for start in range(-1, length))
+            self._widths[key] = width
+        return width
+
+    def lookup(self, dx, dy, bottom=False):
+        """落到 (dx, dy) 这一格（单列目标，不考虑起跳平台和障碍物）的蓄力范围，
+        够不着时返回 None"""
+        if not (-MAX_DY <= dy <= MAX_DY and 0 <= dx < MAX_DX):
+            return None
+        return self.charge_range(self.land_from[dy, bottom][dx] & self.land_until[dy, bottom][dx])
+
+    def charge_range(self, mask):
+        """掩码中最小和最大的蓄力值，空掩码返回 None"""
+        if not mask:
+            return None
+        return (self.charges[(mask & -mask).bit_length() - 1],
+                self.charges[mask.bit_length() - 1])
+
+    @staticmethod
+    def window_width(mask):
+        """窗口内的蓄力档位数"""
+        return bin(mask).count('1')
+
+    # ------------------------------------------------------------ 缓存
+
+    def _arrays(self):
+        data = array('Q')
+        for dy in range(-MAX_DY, MAX_DY + 1):
+            for bottom in (False, True):
+                data.extend(self.land_from[dy, bottom])
+                data.extend(self.land_until[dy, bottom])
+        data.extend(self.reland)
+        data.extend(self.obstacle)
+        return data
+
+    def to_bytes(self):
+        return (HEADER.pack(MAGIC, VERSION, self.key(self.params), MAX_DX, -MAX_DY, MAX_DY,
+                            len(self.charges))
+                + self._arrays().tobytes())
+
+    @classmethod
+    def from_bytes(cls, data, params):
+        """从缓存数据恢复；参数或格式不符时返回 None"""
+        if len(data) < HEADER.size:
+            return None
+        magic, version, key, max_dx, low, high, levels = HEADER.unpack_from(data)
+        params = tuple(params)
+        gravity, max_fall_speed, max_charge, charge_rate = params
+        if (magic != MAGIC or version != VERSION or key != cls.key(params)
+                or (max_dx, low, high) != (MAX_DX, -MAX_DY, MAX_DY)
+                or levels != len(range(charge_rate, max_charge + 1, charge_rate))):
+            return None
+        values = array('Q')
+        values.frombytes(data[HEADER.size:])
+        rows = (2 * MAX_DY + 1) * 2
+        if len(values) != rows * 2 * MAX_DX + 2 * (MAX_DX + 1):
+            return None
+        land_from = {}
+        land_until = {}
+        pos = 0
+        for dy in range(-MAX_DY, MAX_DY + 1):
+            for bottom in (False, True):
+                land_from[dy, bottom] = values[pos:pos + MAX_DX].tolist()
+                land_until[dy, bottom] = values[pos + MAX_DX:pos + 2 * MAX_DX].tolist()
+                pos += 2 * MAX_DX
+        reland = values[pos:pos + MAX_DX + 1].tolist()
+        obstacle = values[pos + MAX_DX + 1:].tolist()
+        return cls(params, land_from, land_until, reland, obstacle)
+
+
+# 进程内共享的表，按物理参数区分
+_tables = {}
+
+
+def load_table(gravity=0.3, max_fall_speed=1.5, max_charge=100, charge_rate=2, path=None):
+    """取得可达性表：先查进程内缓存，再读磁盘缓存，都没有时计算并写回磁盘"""
+    params = (gravity, max_fall_speed, max_charge, charge_rate)
+    table = _tables.get(params)
+    if table is not None:
+        return table
+    if path is None:
+        path = cache_path(params)
+    try:
+        with open(path, 'rb') as f:
+            table = ReachTable.from_bytes(f.read(), params)
+    except OSError:
+        table = None
+    if table is None:
+        table = ReachTable.build(*params)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # 先写临时文件再改名，避免多个进程同时写出半个文件
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, 'wb') as f:
+                f.write(table.to_bytes())
+            os.replace(tmp, path)
+        except OSError:
+            pass  # 缓存目录不可写时每次重新计算
+    _tables[params] = table
+    return table
+
+
+# ---------------------------------------------------------------- 命令行
+
+def print_table(table, dys=range(-3, 4), dxs=range(4, 29)):
+    """打印每个 (dx, dy) 的蓄力范围"""
+    print("dy\\dx " + " ".join(f"{dx:>7}" for dx in dxs))
+    for dy in dys:
+        cells = []
+        for dx in dxs:
+            window = table.lookup(dx, dy)
+            cells.append(f"{window[0]:>3}-{window[1]:<3}" if window else f"{'-':>7}")
+        print(f"{dy:>6} " + " ".join(cells))
+
+
+def difficulty_report(table, height=12, levels=range(1, 7)):
+    """按 JumpEngine 的地形参数枚举所有相邻平台组合，统计最窄窗口的分布"""
+    print(f"{'difficulty':>10} {'spacing':>8} {'width':>6} {'layouts':>8} {'unsolvable':>11} "
+          f"{'min':>4} {'median':>7} {'max':>4}")
+    for difficulty in levels:
+        spacing = max(5, 10 - difficulty * 2)
+        platform_width = max(4, 9 - difficulty)
+        lengths = range(platform_width, platform_width + 4)
+        rows = range(height - 5, height - 1)
+        widths = sorted(
+            table.jump_width(length, spacing, y - prev_y, next_length, obstacle,
+                             y == height - 2)
+            for length in lengths for next_length in lengths
+            for prev_y in rows for y in rows for obstacle in (False, True))
+        print(f"{difficulty:>10} {spacing:>8} {platform_width:>6} {len(widths):>8} "
+              f"{widths.count(0):>11} {widths[0]:>4} {widths[len(widths) // 2]:>7} "
+              f"{widths[-1]:>4}")
+
+
+def check(table, seeds=40, fractions=(0.0, 0.25, 0.5, 0.75, 0.999)):
+    """在真实地形上与 predict_jump 逐档对照：窗口内的蓄力值必须落到下一个平台上"""
+    try:
+        from legacy_projects.jump_engine import JumpEngine
+    except ImportError:
+        from jump_engine import JumpEngine
+
+    checked = wrong = landed = covered = 0
+    for seed in range(seeds):
+        engine = JumpEngine(width=40, height=12, difficulty=1 + seed % 4, seed=seed,
+                            preview=False)
+        platforms = list(engine.platforms)
+        obstacles = {obs.x for obs in engine.obstacles}
+        for prev, platform in zip(platforms, platforms[1:]):
+            end = prev.x + prev.length
+            for start in range(prev.x - 1, end):
+                mask = table.window(platform.x - start, platform.y - prev.y, platform.length,
+                                    end - start, end + 1 in obstacles,
+                                    platform.y == engine.height - 2)
+                for fraction in fractions:
+                    engine.player_x = start + fraction
+                    engine.player_y = float(prev.y - 1)
+                    for bit, charge in enumerate(table.charges):
+                        lands = engine.predict_jump(charge).platform is platform
+                        inside = mask >> bit & 1
+                        checked += 1
+                        wrong += inside and not lands
+                        landed += lands
+                        covered += inside and lands
+    print(f"对照 {checked} 次：窗口内未落到目标 {wrong} 次；实际能落到目标的 {landed} 次中"
+          f"窗口覆盖 {covered / max(landed, 1):.1%}")
+    return wrong == 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="跳一跳的蓄力可达性表")
+    parser.add_argument('--check', action='store_true', help="与 predict_jump 逐档对照")
+    parser.add_argument('--difficulty', action='store_true', help="按难度统计最窄蓄力窗口")
+    parser.add_argument('--rebuild', action='store_true', help="忽略磁盘缓存重新计算")
+    args = parser.parse_args(argv)
+
+    path = cache_path(PHYSICS)
+    if args.rebuild and os.path.exists(path):
+        os.remove(path)
+    start = time.perf_counter()
+    table = load_table()
+    load_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    ReachTable.build()
+    build_ms = (time.perf_counter() - start) * 1000
+    print(f"计算 {build_ms:.1f}ms，load_table {load_ms:.1f}ms（缓存目录 {cache_dir()}）\n")
+
+    if args.check:
+        return 0 if check(table) else 1
+    if args.difficulty:
+        difficulty_report(table)
+    else:
+        print_table(table)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,295 @@
+"""跳一跳游戏的 Tk 画布渲染器
+
+ImmediateRenderer 每帧删除后重建全部图元（原始实现，用于对比）；
+CanvasRenderer 为保留模式：图元只创建一次，之后只对变化的图元调用
+coords / itemconfig，滚出视野的图元回收到对象池中复用。
+"""
+try:
+    from legacy_projects.particles import COLORS as PARTICLE_COLORS
+except ImportError:
+    from particles import COLORS as PARTICLE_COLORS
+
+PLATFORM_STYLE = dict(fill='#8B4513', outline='#654321', width=2)
+OBSTACLE_STYLE = dict(fill='#FF0000', outline='#8B0000', width=2)
+TRAJECTORY_STYLE = dict(fill='#FFFF00', width=2, dash=(5, 3))
+MARKER_STYLE = dict(outline='#FF00FF', width=3, dash=(3, 3))
+PLAYER_STYLE = dict(fill='#FFD700', outline='#FFA500', width=3)
+BAR_X, BAR_Y, BAR_WIDTH, BAR_HEIGHT = 10, 10, 200, 25
+# 粒子边长（像素）和每帧最多绘制的粒子数，超出部分只参与模拟
+PARTICLE_SIZE = 6
+MAX_DRAWN_PARTICLES = 500
+
+# 图层从下到上的顺序
+LAYERS = ('platform', 'obstacle', 'trajectory', 'player', 'particle', 'hud')
+
+
+def charge_color(progress):
+    """根据蓄力程度选择颜色"""
+    if progress < 0.33:
+        return '#00FF00'  # 绿色
+    elif progress < 0.66:
+        return '#FFFF00'  # 黄色
+    return '#FF0000'  # 红色
+
+
+class ImmediateRenderer:
+    """立即模式渲染：每帧清空画布并重建所有图元"""
+
+    def __init__(self, canvas, cell_size):
+        self.canvas = canvas
+        self.cell_size = cell_size
+
+    def draw(self, game, player_pos=None, camera=None):
+        """player_pos / camera 为插值后的玩家和镜头位置，缺省时使用 game 当前值"""
+        canvas = self.canvas
+        cs = self.cell_size
+        half = cs // 2
+        cam = game.camera_offset if camera is None else camera
+        right = cam + game.width
+        # 只清除本渲染器创建的图元，保留前端自己的 HUD（如性能面板）
+        canvas.delete('immediate')
+
+        for platform in game.platforms:
+            if platform.x + platform.length > cam and platform.x < right:
+                canvas.create_rectangle(
+                    (platform.x - cam) * cs, platform.y * cs,
+                    (platform.x + platform.length - cam) * cs, (platform.y + 1) * cs,
+                    **PLATFORM_STYLE, tags=('immediate',))
+
+        for obs in game.obstacles:
+            if obs.x + obs.width > cam and obs.x < right:
+                canvas.create_rectangle(
+                    (obs.x - cam) * cs, obs.y * cs,
+                    (obs.x + obs.width - cam) * cs, (obs.y + 1) * cs,
+                    **OBSTACLE_STYLE, tags=('immediate',))
+
+        points = game.trajectory_points
+        if game.charging and points:
+            for i in range(len(points) - 1):
+                x1, y1 = points[i]
+                x2, y2 = points[i + 1]
+                canvas.create_line((x1 - cam) * cs + half, y1 * cs + half,
+                                   (x2 - cam) * cs + half, y2 * cs + half,
+                                   **TRAJECTORY_STYLE, tags=('immediate',))
+            last_x, last_y = points[-1]
+            last_x -= cam
+            canvas.create_oval(last_x * cs + 5, last_y * cs + 5,
+                               (last_x + 1) * cs - 5, (last_y + 1) * cs - 5,
+                               **MARKER_STYLE, tags=('immediate',))
+
+        px, py = player_pos or (game.player_x, game.player_y)
+        px -= cam
+        if 0 <= px < game.width and 0 <= int(py) < game.height:
+            canvas.create_oval(px * cs + 5, py * cs + 5, (px + 1) * cs - 5, (py + 1) * cs - 5,
+                               **PLAYER_STYLE, tags=('immediate',))
+
+        rects = game.particles.rects(cs, PARTICLE_SIZE, MAX_DRAWN_PARTICLES, cam)
+        for kind, coords_list in rects.items():
+            color = PARTICLE_COLORS[kind]
+            for coords in coords_list:
+                canvas.create_rectangle(*coords, fill=color, outline='', tags=('immediate',))
+
+        if game.charging:
+            canvas.create_rectangle(BAR_X, BAR_Y, BAR_X + BAR_WIDTH, BAR_Y + BAR_HEIGHT,
+                                    fill='#333333', outline='#FFFFFF', width=2, tags=('immediate',))
+            progress = min(game.charge_power / game.max_charge_power, 1.0)
+            fill_width = int(BAR_WIDTH * progress)
+            if fill_width > 0:
+                canvas.create_rectangle(BAR_X, BAR_Y, BAR_X + fill_width, BAR_Y + BAR_HEIGHT,
+                                        fill=charge_color(progress), outline='', tags=('immediate',))
+            canvas.create_text(BAR_X + BAR_WIDTH // 2, BAR_Y + BAR_HEIGHT // 2,
+                               text=f"蓄力: {int(progress * 100)}%",
+                               fill='#FFFFFF', font=('Arial', 12, 'bold'), tags=('immediate',))
+
+
+class _ItemPool:
+    """同类画布图元的对象池，释放的图元只是隐藏起来，下次直接复用"""
+
+    def __init__(self, canvas, create, tag):
+        self.canvas = canvas
+        self._create = create
+        self.tag = tag
+        self._free = []
+        self.created = 0
+
+    def acquire(self):
+        """取出一个图元，返回 (item, 是否为新建)"""
+        if self._free:
+            item = self._free.pop()
+            self.canvas.itemconfigure(item, state='normal')
+            return item, False
+        self.created += 1
+        return self._create(tags=(self.tag,)), True
+
+    def release(self, item):
+        self.canvas.itemconfigure(item, state='hidden')
+        self._free.append(item)
+
+
+class CanvasRenderer:
+    """保留模式渲染：只更新状态发生变化的图元"""
+
+    def __init__(self, canvas, cell_size):
+        self.canvas = canvas
+        self.cell_size = cell_size
+        hidden = (0, 0, 0, 0)
+        self._pools = {
+            'platform': _ItemPool(canvas, lambda **kw: canvas.create_rectangle(
+                *hidden, **PLATFORM_STYLE, **kw), 'platform'),
+            'obstacle': _ItemPool(canvas, lambda **kw: canvas.create_rectangle(
+                *hidden, **OBSTACLE_STYLE, **kw), 'obstacle'),
+            'trajectory': _ItemPool(canvas, lambda **kw: canvas.create_line(
+                *hidden, **TRAJECTORY_STYLE, **kw), 'trajectory'),
+        }
+        for kind, color in PARTICLE_COLORS.items():
+            self._pools['particle:' + kind] = _ItemPool(
+                canvas, lambda color=color, **kw: canvas.create_rectangle(
+                    *hidden, fill=color, outline='', **kw), 'particle')
+        # 实体 id -> [实体, 图元, 上次坐标]
+        self._entity_items = {'platform': {}, 'obstacle': {}}
+        # 粒子种类 -> 正在使用的图元
+        self._particle_items = {kind: [] for kind in PARTICLE_COLORS}
+        self._segments = []  # [图元, 上次坐标]
+        self._restack = False
+
+        self._marker = canvas.create_oval(*hidden, state='hidden', tags=('trajectory',),
+                                          **MARKER_STYLE)
+        self._player = canvas.create_oval(*hidden, state='hidden', tags=('player',),
+                                          **PLAYER_STYLE)
+        self._bar_bg = canvas.create_rectangle(
+            BAR_X, BAR_Y, BAR_X + BAR_WIDTH, BAR_Y + BAR_HEIGHT, state='hidden',
+            tags=('hud',), fill='#333333', outline='#FFFFFF', width=2)
+        self._bar_fill = canvas.create_rectangle(*hidden, state='hidden', tags=('hud',),
+                                                 outline='')
+        self._bar_text = canvas.create_text(
+            BAR_X + BAR_WIDTH // 2, BAR_Y + BAR_HEIGHT // 2, state='hidden', tags=('hud',),
+            fill='#FFFFFF', font=('Arial', 12, 'bold'))
+        # 图元 -> 上次设置的属性，避免重复调用 coords / itemconfig
+        self._last = {}
+
+    def _set_coords(self, item, coords):
+        if self._last.get(item) != coords:
+            self._last[item] = coords
+            self.canvas.coords(item, *coords)
+
+    def _set_config(self, item, **options):
+        key = (item, 'config')
+        if self._last.get(key) != options:
+            self._last[key] = options
+            self.canvas.itemconfigure(item, **options)
+
+    def _sync_entities(self, kind, entities, visible, rect):
+        pool = self._pools[kind]
+        items = self._entity_items[kind]
+        seen = set()
+        for entity in entities:
+            if not visible(entity):
+                continue
+            key = id(entity)
+            seen.add(key)
+            entry = items.get(key)
+            if entry is None or entry[0] is not entity:
+                if entry is not None:
+                    pool.release(entry[1])
+                item, created = pool.acquire()
+                self._restack |= created
+                entry = items[key] = [entity, item, None]
+            coords = rect(entity)
+            if entry[2] != coords:
+                entry[2] = coords
+                self.canvas.coords(entry[1], *coords)
+        # 滚出视野或已删除的实体，图元回收到池中
+        for key in [k for k in items if k not in seen]:
+            pool.release(items.pop(key)[1])
+
+    def _sync_trajectory(self, points, cam):
+        cs = self.cell_size
+        half = cs // 2
+        pool = self._pools['trajectory']
+        segments = self._segments
+        needed = max(0, len(points) - 1)
+        while len(segments) < needed:
+            item, created = pool.acquire()
+            self._restack |= created
+            segments.append([item, None])
+        while len(segments) > needed:
+            pool.release(segments.pop()[0])
+        for i in range(needed):
+            x1, y1 = points[i]
+            x2, y2 = points[i + 1]
+            coords = ((x1 - cam) * cs + half, y1 * cs + half,
+                      (x2 - cam) * cs + half, y2 * cs + half)
+            segment = segments[i]
+            if segment[1] != coords:
+                segment[1] = coords
+                self.canvas.coords(segment[0], *coords)
+
+    def _sync_particles(self, particles, cam):
+        """粒子每帧都在移动，这里批量取出屏幕坐标后只按数量增减图元"""
+        rects = particles.rects(self.cell_size, PARTICLE_SIZE, MAX_DRAWN_PARTICLES, cam)
+        coords_fn = self.canvas.coords
+        for kind, items in self._particle_items.items():
+            coords_list = rects.get(kind, ())
+            pool = self._pools['particle:' + kind]
+            while len(items) < len(coords_list):
+                item, created = pool.acquire()
+                self._restack |= created
+                items.append(item)
+            while len(items) > len(coords_list):
+                pool.release(items.pop())
+            for item, coords in zip(items, coords_list):
+                coords_fn(item, *coords)
+
+    def draw(self, game, player_pos=None, camera=None):
+        """player_pos / camera 为插值后的玩家和镜头位置，缺省时使用 game 当前值"""
+        cs = self.cell_size
+        width = game.width
+        cam = game.camera_offset if camera is None else camera
+        right = cam + width
+        # 镜头移动时可见实体的坐标都会变化，不动时 _sync_entities 会跳过未变化的图元
+        self._sync_entities(
+            'platform', game.platforms, lambda p: p.x + p.length > cam and p.x < right,
+            lambda p: ((p.x - cam) * cs, p.y * cs, (p.x + p.length - cam) * cs, (p.y + 1) * cs))
+        self._sync_entities(
+            'obstacle', game.obstacles, lambda o: o.x + o.width > cam and o.x < right,
+            lambda o: ((o.x - cam) * cs, o.y * cs, (o.x + o.width - cam) * cs, (o.y + 1) * cs))
+
+        points = game.trajectory_points if game.charging else ()
+        self._sync_trajectory(points, cam)
+        if points:
+            last_x, last_y = points[-1]
+            last_x -= cam
+            self._set_coords(self._marker, (last_x * cs + 5, last_y * cs + 5,
+                                            (last_x + 1) * cs - 5, (last_y + 1) * cs - 5))
+        self._set_config(self._marker, state='normal' if points else 'hidden')
+
+        px, py = player_pos or (game.player_x, game.player_y)
+        px -= cam
+        if 0 <= px < width and 0 <= int(py) < game.height:
+            self._set_coords(self._player, (px * cs + 5, py * cs + 5,
+                                            (px + 1) * cs - 5, (py + 1) * cs - 5))
+            self._set_config(self._player, state='normal')
+        else:
+            self._set_config(self._player, state='hidden')
+
+        self._sync_particles(game.particles, cam)
+
+        if game.charging:
+            progress = min(game.charge_power / game.max_charge_power, 1.0)
+            fill_width = int(BAR_WIDTH * progress)
+            self._set_config(self._bar_bg, state='normal')
+            self._set_coords(self._bar_fill, (BAR_X, BAR_Y, BAR_X + fill_width, BAR_Y + BAR_HEIGHT))
+            self._set_config(self._bar_fill, state='normal' if fill_width > 0 else 'hidden',
+                             fill=charge_color(progress))
+            self._set_config(self._bar_text, state='normal',
+                             text=f"蓄力: {int(progress * 100)}%")
+        else:
+            self._set_config(self._bar_bg, state='hidden')
+            self._set_config(self._bar_fill, state='hidden')
+            self._set_config(self._bar_text, state='hidden')
+
+        if self._restack:
+            # 新建的图元位于最上层，按原有绘制顺序重新排列图层
+            for tag in LAYERS:
+                self.canvas.tag_raise(tag)
+            self._restack = False
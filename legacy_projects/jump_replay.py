@@ -0,0 +1,184 @@
+"""跳一跳游戏的输入录制与回放
+
+录像文件只保存种子、棋盘参数和输入事件，回放时在无界面引擎中以最高速度
+重新模拟，并用最终状态摘要校验结果是否一致。
+
+文件格式（小端）：
+    头部  '<4sBQHHB'  魔数 b'JRPL'、版本、种子、宽、高、难度
+    事件  变长整数（varint），值为 (与上一事件的帧差 << 1) | 是否为松开
+    尾部  '<IQ16s'    事件数、结束帧号、最终状态摘要
+
+用法:
+    python -m legacy_projects.jump_replay 录像文件 [...]
+"""
+import struct
+import sys
+import time
+
+try:
+    from legacy_projects.jump_engine import GameState, JumpEngine, PRESS, RELEASE
+except ImportError:
+    from jump_engine import GameState, JumpEngine, PRESS, RELEASE
+
+MAGIC = b'JRPL'
+VERSION = 1
+HEADER = struct.Struct('<4sBQHHB')
+FOOTER = struct.Struct('<IQ16s')
+
+
+class ReplayError(Exception):
+    """录像文件损坏或版本不兼容"""
+
+
+def _encode_varint(value, out):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+class Recording:
+    """一局游戏的录像：初始参数、按帧排列的输入事件和最终状态摘要"""
+
+    def __init__(self, seed, width, height, difficulty, events=b'', event_count=0,
+                 final_frame=0, final_hash=''):
+        self.seed = seed
+        self.width = width
+        self.height = height
+        self.difficulty = difficulty
+        self.events = bytes(events)  # varint 编码的事件流
+        self.event_count = event_count
+        self.final_frame = final_frame
+        self.final_hash = final_hash
+
+    def iter_events(self):
+        """依次产生 (帧号, PRESS / RELEASE)"""
+        frame = 0
+        value = shift = 0
+        for byte in self.events:
+            value |= (byte & 0x7F) << shift
+            if byte & 0x80:
+                shift += 7
+                continue
+            frame += value >> 1
+            yield frame, RELEASE if value & 1 else PRESS
+            value = shift = 0
+
+    def to_bytes(self):
+        return (HEADER.pack(MAGIC, VERSION, self.seed, self.width, self.height, self.difficulty)
+                + self.events
+                + FOOTER.pack(self.event_count, self.final_frame,
+                              bytes.fromhex(self.final_hash)))
+
+    @classmethod
+    def from_bytes(cls, data):
+        if len(data) < HEADER.size + FOOTER.size:
+            raise ReplayError("录像文件过短")
+        magic, version, seed, width, height, difficulty = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ReplayError("不是跳一跳录像文件")
+        if version != VERSION:
+            raise ReplayError(f"不支持的录像版本: {version}")
+        event_count, final_frame, digest = FOOTER.unpack_from(data, len(data) - FOOTER.size)
+        return cls(seed, width, height, difficulty, data[HEADER.size:len(data) - FOOTER.size],
+                   event_count, final_frame, digest.hex())
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+
+class InputRecorder:
+    """挂到 engine.recorder 上，记录每次生效的按下/松开"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.start(engine)
+
+    def start(self, engine):
+        """从 engine 当前（刚开始的）一局开始录制"""
+        self.seed = engine.seed
+        self.events = bytearray()
+        self.event_count = 0
+        self.last_frame = 0
+        engine.recorder = self
+
+    def record(self, frame, action):
+        _encode_varint(((frame - self.last_frame) << 1) | (action == RELEASE), self.events)
+        self.last_frame = frame
+        self.event_count += 1
+
+    def finish(self):
+        """结束录制，返回包含最终状态摘要的 Recording"""
+        engine = self.engine
+        return Recording(self.seed, engine.width, engine.height, engine.difficulty,
+                         self.events, self.event_count, engine.frame_count, engine.state_hash())
+
+
+class ReplayResult:
+    """回放结果"""
+
+    def __init__(self, ok, frames, seconds, state_hash, score):
+        self.ok = ok
+        self.frames = frames
+        self.seconds = seconds
+        self.state_hash = state_hash
+        self.score = score
+
+    @property
+    def frames_per_second(self):
+        return self.frames / self.seconds if self.seconds > 0 else float('inf')
+
+
+def replay(recording):
+    """在无界面引擎中以最高速度重放录像，返回 ReplayResult"""
+    engine = JumpEngine(recording.width, recording.height, recording.difficulty,
+                        seed=recording.seed, preview=False)
+    step = engine.tick
+    final_frame = recording.final_frame
+    start = time.perf_counter()
+    for frame, action in recording.iter_events():
+        while engine.frame_count < frame and engine.state == GameState.RUNNING:
+            step()
+        if action == PRESS:
+            engine.on_space_press()
+        else:
+            engine.on_space_release()
+    while engine.frame_count < final_frame and engine.state == GameState.RUNNING:
+        step()
+    seconds = time.perf_counter() - start
+    state_hash = engine.state_hash()
+    return ReplayResult(state_hash == recording.final_hash, engine.frame_count, seconds,
+                        state_hash, engine.score)
+
+
+def main(argv=None):
+    paths = argv if argv is not None else sys.argv[1:]
+    if not paths:
+        print(__doc__)
+        return 2
+    failed = 0
+    for path in paths:
+        try:
+            recording = Recording.load(path)
+        except (OSError, ReplayError) as e:
+            print(f"{path}: 无法读取 ({e})")
+            failed += 1
+            continue
+        result = replay(recording)
+        status = "一致" if result.ok else "不一致"
+        print(f"{path}: {status}  种子 {recording.seed}  得分 {result.score}  "
+              f"{result.frames} 帧  {result.frames_per_second:.0f} 帧/秒")
+        if not result.ok:
+            print(f"  期望 {recording.final_hash}\n  实际 {result.state_hash}")
+            failed += 1
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,450 @@
+"""跳一跳的终端（文本）模式，适合在 SSH 会话中游玩
+
+TerminalScreen 维护前后两个字符缓冲区：每帧先在后缓冲区中画出整个画面，
+再逐格与前缓冲区（终端上已经显示的内容）比较，只为变化的格子输出 ANSI 光标
+移动和颜色，整帧拼成一个字符串后一次写出。画面不变的行只做一次切片比较。
+
+KeyReader 把终端切换到 cbreak 模式，非阻塞地读取单个按键（Windows 使用
+msvcrt）。终端收不到按键松开事件，因此空格键切换蓄力：按一次开始蓄力，
+再按一次起跳。
+
+    python -m legacy_projects.jump_terminal [--difficulty 2] [--autoplay]
+
+按键：空格 蓄力/起跳，a 自动游玩，q 退出；一局结束后 r 再玩一局。
+"""
+import argparse
+import os
+import re
+import sys
+import time
+import unicodedata
+from functools import lru_cache
+
+try:
+    import termios
+    import tty
+    import select
+except ImportError:  # Windows
+    termios = None
+
+try:
+    import msvcrt
+except ImportError:  # 非 Windows
+    msvcrt = None
+
+try:
+    from legacy_projects.jump_engine import GameState, JumpEngine, PRESS, RELEASE
+    from legacy_projects.jump_autoplay import AutoPlayer
+    from legacy_projects.perf_stats import FrameTimer
+except ImportError:
+    # 作为普通脚本运行时的路径处理
+    from jump_engine import GameState, JumpEngine, PRESS, RELEASE
+    from jump_autoplay import AutoPlayer
+    from perf_stats import FrameTimer
+
+
+class Colors:
+    """终端颜色"""
+    RESET = '\033[0m'
+    BOLD = '\033[1m'
+    RED = '\033[91m'
+    GREEN = '\033[92m'
+    YELLOW = '\033[93m'
+    BLUE = '\033[94m'
+    MAGENTA = '\033[95m'
+    CYAN = '\033[96m'
+    WHITE = '\033[97m'
+    BG_RED = '\033[41m'
+    BG_GREEN = '\033[42m'
+    BG_YELLOW = '\033[43m'
+    BG_BLUE = '\033[44m'
+
+
+# 备用屏幕、隐藏光标 / 恢复
+ENTER_SCREEN = '\033[?1049h\033[?25l\033[2J'
+EXIT_SCREEN = '\033[0m\033[?25h\033[?1049l'
+
+# 宽字符（如中文）之后的占位格，输出时跳过
+WIDE_PAD = ''
+
+PARTICLE_STYLES = {'land': Colors.YELLOW, 'death': Colors.RED, 'powerup': Colors.MAGENTA}
+
+
+@lru_cache(maxsize=4096)
+def char_width(char):
+    return 2 if unicodedata.east_asian_width(char) in ('W', 'F') else 1
+
+
+class TerminalScreen:
+    """双缓冲的字符画面，flush 只输出与上一帧不同的格子"""
+
+    def __init__(self, cols, rows, out=None):
+        self.out = out if out is not None else sys.stdout.buffer
+        self.bytes_written = 0
+        self.last_bytes = 0
+        self.resize(cols, rows)
+
+    def resize(self, cols, rows):
+        self.cols = cols
+        self.rows = rows
+        size = cols * rows
+        self.chars = [' '] * size
+        self.styles = [''] * size
+        self.invalidate()
+
+    def invalidate(self):
+        """下一帧整屏重画（如终端尺寸变化后）"""
+        size = self.cols * self.rows
+        self.front_chars = [None] * size
+        self.front_styles = [None] * size
+
+    def clear(self):
+        size = self.cols * self.rows
+        self.chars = [' '] * size
+        self.styles = [''] * size
+
+    def fill(self, x1, y1, x2, y2, char, style=''):
+        """填充 [x1, x2) x [y1, y2) 的矩形（超出画面的部分被裁掉）"""
+        x1, x2 = max(0, x1), min(self.cols, x2)
+        y1, y2 = max(0, y1), min(self.rows, y2)
+        if x1 >= x2:
+            return
+        chars, styles = self.chars, self.styles
+        n = x2 - x1
+        row_chars, row_styles = [char] * n, [style] * n
+        for y in range(y1, y2):
+            start = y * self.cols + x1
+            chars[start:start + n] = row_chars
+            styles[start:start + n] = row_styles
+
+    def put(self, x, y, char, style=''):
+        if 0 <= x < self.cols and 0 <= y < self.rows:
+            i = y * self.cols + x
+            self.chars[i] = char
+            self.styles[i] = style
+
+    def text(self, x, y, text, style=''):
+        """写一行文字，宽字符占两格，超出行尾的部分被截掉"""
+        if not 0 <= y < self.rows:
+            return
+        base = y * self.cols
+        for char in text:
+            width = char_width(char)
+            if x + width > self.cols:
+                break
+            if x >= 0:
+                self.chars[base + x] = char
+                self.styles[base + x] = style
+                if width == 2:
+                    self.chars[base + x + 1] = WIDE_PAD
+                    self.styles[base + x + 1] = style
+            x += width
+
+    def render(self):
+        """返回把终端从前缓冲区更新到后缓冲区所需的 ANSI 字符串，并交换缓冲区"""
+        cols = self.cols
+        chars, styles = self.chars, self.styles
+        front_chars, front_styles = self.front_chars, self.front_styles
+        parts = []
+        cursor = -1
+        style = None
+        for y in range(self.rows):
+            start = y * cols
+            end = start + cols
+            if chars[start:end] == front_chars[start:end] and \
+                    styles[start:end] == front_styles[start:end]:
+                continue
+            for i in range(start, end):
+                char = chars[i]
+                if char == front_chars[i] and styles[i] == front_styles[i]:
+                    continue
+                if char == WIDE_PAD:
+                    continue
+                if cursor != i:
+                    parts.append(f'\033[{y + 1};{i - start + 1}H')
+                if styles[i] != style:
+                    style = styles[i]
+                    parts.append(Colors.RESET + style)
+                parts.append(char)
+                cursor = i + char_width(char)
+                # 光标停在行尾之后时，下一个格子需要重新定位
+                if cursor >= end:
+                    cursor = -1
+        if style:
+            parts.append(Colors.RESET)
+        self.front_chars = chars[:]
+        self.front_styles = styles[:]
+        return ''.join(parts)
+
+    def flush(self):
+        """输出变化的部分（一次 write），返回写出的字节数"""
+        data = self.render().encode('utf-8')
+        if data:
+            self.out.write(data)
+            self.out.flush()
+        self.last_bytes = len(data)
+        self.bytes_written += len(data)
+        return len(data)
+
+
+class KeyReader:
+    """非阻塞读取单个按键的上下文管理器"""
+
+    # 方向键、功能键等转义序列，读到时整体丢弃
+    ESCAPE = re.compile(r'\x1b(\[[0-9;?]*[ -/]*[@-~]|O.|.)?')
+
+    def __init__(self, stream=None):
+        self.stream = stream if stream is not None else sys.stdin
+        self.saved = None
+
+    def __enter__(self):
+        if termios is not None and self.stream.isatty():
+            fd = self.stream.fileno()
+            self.saved = termios.tcgetattr(fd)
+            # cbreak：不回显、按键立即可读，Ctrl-C 仍然有效
+            tty.setcbreak(fd)
+        return self
+
+    def __exit__(self, *exc):
+        if self.saved is not None:
+            termios.tcsetattr(self.stream.fileno(), termios.TCSADRAIN, self.saved)
+            self.saved = None
+
+    def read(self):
+        """返回自上次以来按下的键（字符串，可能为空）"""
+        if msvcrt is not None:
+            keys = []
+            while msvcrt.kbhit():
+                key = msvcrt.getwch()
+                if key in ('\x00', '\xe0'):
+                    msvcrt.getwch()  # 功能键的第二个字节
+                else:
+                    keys.append(key)
+            return ''.join(keys)
+        fd = self.stream.fileno()
+        data = b''
+        while select.select([fd], [], [], 0)[0]:
+            chunk = os.read(fd, 1024)
+            if not chunk:
+                break
+            data += chunk
+        return self.ESCAPE.sub('', data.decode('utf-8', errors='ignore'))
+
+
+def charge_style(progress):
+    """根据蓄力程度选择颜色（与 Tk 版的蓄力条一致）"""
+    if progress < 0.33:
+        return Colors.GREEN
+    elif progress < 0.66:
+        return Colors.YELLOW
+    return Colors.RED
+
+
+class TerminalGame(JumpEngine):
+    """跳一跳的终端前端：固定步长推进物理，按 fps 绘制
+
+    世界中的每个格子放大为 sx x sy 个字符，放大倍数由终端尺寸决定；
+    第一行是状态栏，最后一行是按键提示。
+    """
+
+    def __init__(self, width=50, height=12, difficulty=1, seed=None, tick_ms=70, fps=60,
+                 max_catchup=5, autoplay=False, out=None, size=None):
+        super().__init__(width, height, difficulty, seed=seed)
+        self.tick_interval = tick_ms / 1000.0
+        self.frame_interval = 1.0 / fps
+        self.max_catchup = max_catchup
+        self.autoplayer = AutoPlayer(self) if autoplay else None
+        self.draw_timer = FrameTimer()
+        self.interval_timer = FrameTimer()
+        self.fixed_size = size
+        cols, rows = size or self._terminal_size()
+        self.screen = TerminalScreen(cols, rows, out)
+        self._layout()
+
+    @staticmethod
+    def _terminal_size():
+        try:
+            size = os.get_terminal_size()
+        except OSError:
+            return 80, 24
+        # 部分伪终端报告的尺寸为 0
+        return size.columns or 80, size.lines or 24
+
+    def _layout(self):
+        screen = self.screen
+        self.sx = max(1, screen.cols // self.width)
+        self.sy = max(1, (screen.rows - 2) // self.height)
+        # 世界画面在终端中居中
+        self.ox = (screen.cols - self.sx * self.width) // 2
+        self.oy = 1 + max(0, (screen.rows - 2 - self.sy * self.height) // 2)
+
+    def _check_resize(self):
+        if self.fixed_size is not None:
+            return
+        cols, rows = self._terminal_size()
+        if (cols, rows) != (self.screen.cols, self.screen.rows):
+            self.screen.resize(cols, rows)
+            self._layout()
+
+    def _cell_rect(self, x, y, w, cam):
+        """世界坐标的矩形 -> 屏幕字符矩形"""
+        left = self.ox + round((x - cam) * self.sx)
+        top = self.oy + round(y * self.sy)
+        return left, top, left + max(1, round(w * self.sx)), top + self.sy
+
+    def draw(self, alpha=1.0, message=None):
+        """在后缓冲区画出当前画面并输出差异"""
+        self.draw_timer.start()
+        screen = self.screen
+        screen.clear()
+        cam = self.interpolated_camera(alpha)
+        right = cam + self.width
+        sx, sy = self.sx, self.sy
+
+        for p in self.platforms:
+            if p.x + p.length > cam and p.x < right:
+                style = Colors.GREEN if p.landed_on else Colors.YELLOW
+                screen.fill(*self._cell_rect(p.x, p.y, p.length, cam), '=', style)
+        for o in self.obstacles:
+            if o.x + o.width > cam and o.x < right:
+                screen.fill(*self._cell_rect(o.x, o.y, o.width, cam), '#', Colors.RED)
+
+        points = self.trajectory_points if self.charging else ()
+        for x, y in points:
+            left, top, _, _ = self._cell_rect(x + 0.5, y + 0.5, 0, cam)
+            screen.put(left, top, '.', Colors.WHITE)
+        if points:
+            x, y = points[-1]
+            screen.fill(*self._cell_rect(x, y, 1, cam), 'x', Colors.MAGENTA)
+
+        for kind, rects in self.particles.rects(1.0, 0.0, 400, cam).items():
+            style = PARTICLE_STYLES.get(kind, Colors.WHITE)
+            for x, y, _, _ in rects:
+                screen.put(self.ox + int(x * sx), self.oy + int(y * sy), '*', style)
+
+        px, py = self.interpolated_player(alpha)
+        if 0 <= px - cam < self.width and 0 <= int(py) < self.height:
+            screen.fill(*self._cell_rect(px, py, 1, cam), '@', Colors.BOLD + Colors.CYAN)
+
+        self._draw_hud(message)
+        self.draw_timer.stop()
+        return screen.flush()
+
+    def _draw_hud(self, message):
+        screen = self.screen
+        interval = self.interval_timer.mean_ms
+        fps = 1000.0 / interval if interval > 0 else 0.0
+        status = f" 得分: {self.score}  难度: {self.difficulty}"
+        if self.autoplayer is not None:
+            status += "  [自动]"
+        screen.text(0, 0, status, Colors.BOLD + Colors.WHITE)
+        if self.charging:
+            progress = min(self.charge_power / self.max_charge_power, 1.0)
+            filled = int(progress * 20)
+            bar = f"蓄力 [{'#' * filled}{'.' * (20 - filled)}] {int(progress * 100):3d}%"
+            screen.text(sum(map(char_width, status)) + 2, 0, bar, charge_style(progress))
+        perf = (f"FPS {fps:5.1f}  绘制 {self.draw_timer.mean_ms:5.2f}ms  "
+                f"{screen.last_bytes:6d}B/帧 ")
+        screen.text(screen.cols - sum(map(char_width, perf)), 0, perf, Colors.BLUE)
+        hint = message or " 空格 蓄力/起跳   a 自动游玩   q 退出"
+        screen.text(0, screen.rows - 1, hint, Colors.CYAN if message is None else Colors.BOLD)
+
+    def handle_key(self, key):
+        """处理一个按键，返回 False 表示退出"""
+        if key in ('q', 'Q', '\x03'):
+            return False
+        if key == ' ':
+            # 终端没有松开事件：按一次开始蓄力，再按一次起跳
+            charging = self.input_buffer[-1] == PRESS if self.input_buffer else self.charging
+            self.input_buffer.append(RELEASE if charging else PRESS)
+        elif key in ('a', 'A'):
+            self.autoplayer = None if self.autoplayer is not None else AutoPlayer(self)
+        return True
+
+    def run(self, keys=None):
+        """运行到玩家退出，返回最高得分"""
+        out = self.screen.out
+        out.write(ENTER_SCREEN.encode())
+        try:
+            with (keys or KeyReader()) as reader:
+                while self._play(reader):
+                    self.high_score = max(self.high_score, self.score)
+                    self.reset()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            out.write(EXIT_SCREEN.encode())
+            out.flush()
+        self.high_score = max(self.high_score, self.score)
+        return self.high_score
+
+    def _play(self, reader):
+        """玩一局，返回 True 表示重新开始"""
+        self.screen.invalidate()
+        accumulator = self.tick_interval
+        # 第一帧按一个完整的帧间隔计算，FPS 不会出现异常大的值
+        last = time.perf_counter() - self.frame_interval
+        next_frame = last
+        last_resize_check = last
+        while True:
+            now = time.perf_counter()
+            elapsed = now - last
+            last = now
+            self.interval_timer.add(elapsed)
+            accumulator += elapsed
+            if now - last_resize_check > 0.5:
+                last_resize_check = now
+                self._check_resize()
+            for key in reader.read():
+                if not self.handle_key(key):
+                    return False
+
+            # 卡顿太久时只补跑 max_catchup 帧
+            accumulator = min(accumulator, self.tick_interval * self.max_catchup)
+            while accumulator >= self.tick_interval:
+                if self.autoplayer is not None:
+                    self.autoplayer.act()
+                self.step()
+                accumulator -= self.tick_interval
+                if self.state != GameState.RUNNING:
+                    return self._game_over(reader)
+            self.draw(accumulator / self.tick_interval)
+
+            next_frame += self.frame_interval
+            delay = next_frame - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                # 输出太慢（如网络拥塞）时不追赶，直接从现在开始计时
+                next_frame = time.perf_counter()
+
+    def _game_over(self, reader):
+        title = "恭喜过关" if self.state == GameState.WIN else "游戏结束"
+        self.draw(message=f" {title}！得分: {self.score}    r 再玩一局   q 退出")
+        while True:
+            for key in reader.read():
+                if key in ('r', 'R'):
+                    return True
+                if key in ('q', 'Q', '\x03'):
+                    return False
+            time.sleep(0.05)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="跳一跳终端模式")
+    parser.add_argument('--difficulty', type=int, default=1, choices=(1, 2, 3))
+    parser.add_argument('--width', type=int, default=50, help="世界宽度（格）")
+    parser.add_argument('--height', type=int, default=12, help="世界高度（格）")
+    parser.add_argument('--fps', type=int, default=60)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--autoplay', action='store_true')
+    args = parser.parse_args(argv)
+    game = TerminalGame(args.width, args.height, args.difficulty, seed=args.seed,
+                        fps=args.fps, autoplay=args.autoplay)
+    score = game.run()
+    print(f"✨ 最终得分: {score}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
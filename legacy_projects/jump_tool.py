@@ -1,14 +1,30 @@
 import tkinter as tk
 from tkinter import messagebox
-import time
 import threading
 import pyautogui
 
+try:
+    from legacy_projects.click_jobs import ClickJob, JobEngine
+    from legacy_projects.progress import ProgressChannel, RingLog, format_eta
+    from legacy_projects.click_script import PyAutoGuiBackend, ScriptError, load_script
+    from legacy_projects.click_macro import MacroError, MacroRecorder, PyAutoGuiPlayer, iter_macro
+except ImportError:
+    # 作为普通脚本运行时的路径处理
+    from click_jobs import ClickJob, JobEngine
+    from progress import ProgressChannel, RingLog, format_eta
+    from click_script import PyAutoGuiBackend, ScriptError, load_script
+    from click_macro import MacroError, MacroRecorder, PyAutoGuiPlayer, iter_macro
+
+# 点击开始前的倒计时（秒），留出切换窗口的时间
+START_DELAY = 3
+STATE_TEXT = {'pending': '等待', 'running': '运行中', 'paused': '已暂停', 'done': '完成',
+              'cancelled': '已停止', 'failed': '出错'}
+
 class AutoClickerApp:
     def __init__(self, root):
         self.root = root
         self.root.title("自动点击器 (Auto Clicker)")
-        self.root.geometry("300x250")
+        self.root.geometry("360x470")
         
         # Number of clicks
         self.lbl_clicks = tk.Label(root, text="点击次数 (Clicks):")
@@ -24,74 +40,152 @@ class AutoClickerApp:
         self.entry_duration.pack(pady=5)
         self.entry_duration.insert(0, "5")
         
-        # Start Button
-        self.btn_start = tk.Button(root, text="开始 (Start)", command=self.start_clicking_thread, bg="#4CAF50", fg="white")
-        self.btn_start.pack(pady=20)
+        # Script file (optional, overrides clicks/duration)
+        self.lbl_script = tk.Label(root, text="脚本文件 (Script, 可选):")
+        self.lbl_script.pack(pady=5)
+        self.entry_script = tk.Entry(root)
+        self.entry_script.pack(pady=5)
+        
+        # Start / Pause / Stop
+        self.frame_buttons = tk.Frame(root)
+        self.frame_buttons.pack(pady=10)
+        self.btn_start = tk.Button(self.frame_buttons, text="开始 (Start)", command=self.start_clicking, bg="#4CAF50", fg="white")
+        self.btn_start.grid(row=0, column=0, padx=3)
+        self.btn_pause = tk.Button(self.frame_buttons, text="暂停/继续", command=self.toggle_pause)
+        self.btn_pause.grid(row=0, column=1, padx=3)
+        self.btn_stop = tk.Button(self.frame_buttons, text="停止 (Stop)", command=self.stop_all)
+        self.btn_stop.grid(row=0, column=2, padx=3)
+        
+        # Macro record / replay
+        self.frame_macro = tk.Frame(root)
+        self.frame_macro.pack(pady=5)
+        tk.Label(self.frame_macro, text="宏文件 (Macro):").grid(row=0, column=0)
+        self.entry_macro = tk.Entry(self.frame_macro, width=14)
+        self.entry_macro.grid(row=0, column=1)
+        self.entry_macro.insert(0, "macro.jmac")
+        tk.Label(self.frame_macro, text="倍速 (Speed):").grid(row=1, column=0)
+        self.entry_speed = tk.Entry(self.frame_macro, width=14)
+        self.entry_speed.grid(row=1, column=1)
+        self.entry_speed.insert(0, "1")
+        self.btn_record = tk.Button(self.frame_macro, text="录制 (Record)", command=self.start_recording)
+        self.btn_record.grid(row=2, column=0, pady=5)
+        self.btn_replay = tk.Button(self.frame_macro, text="回放 (Replay)", command=self.start_replay)
+        self.btn_replay.grid(row=2, column=1, pady=5)
         
         # Status Label
-        self.lbl_status = tk.Label(root, text="准备就绪 (Ready)")
+        self.lbl_status = tk.Label(root, text="准备就绪 (Ready)", justify=tk.LEFT)
         self.lbl_status.pack(pady=5)
         
-        self.is_running = False
-
-    def start_clicking_thread(self):
-        if self.is_running:
-            return
+        self.is_recording = False
         
+        # 所有点击任务在同一个 asyncio 线程中运行；进度只保留最新值，
+        # 界面每 100 ms 取一次，点击日志写入环形缓冲而不是标准输出
+        self.channel = ProgressChannel()
+        self.channel.attach_tk(self.root, self.on_progress, 100)
+        self.click_log = RingLog(2000)
+        self.engine = JobEngine(self.channel)
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+
+    def start_clicking(self):
         try:
             clicks = int(self.entry_clicks.get())
             duration = float(self.entry_duration.get())
         except ValueError:
             messagebox.showerror("错误", "请输入有效的数字")
             return
-            
-        self.is_running = True
-        self.btn_start.config(state=tk.DISABLED)
         
-        # Run in a separate thread to keep UI responsive
-        thread = threading.Thread(target=self.run_clicker, args=(clicks, duration))
-        thread.daemon = True
-        thread.start()
+        # 节拍由任务调度，去掉 pyautogui 每次调用后默认的 0.1 秒停顿
+        pyautogui.PAUSE = 0
+        # 脚本在开始前编译成时间线，点击过程中不再解析
+        script = self.entry_script.get().strip()
+        if script:
+            try:
+                timeline = load_script(script)
+            except (OSError, ScriptError) as e:
+                messagebox.showerror("错误", f"无法加载脚本: {e}")
+                return
+            job = ClickJob.from_timeline(f"脚本 {script}", timeline, PyAutoGuiBackend(),
+                                         start_delay=START_DELAY, log=self.click_log)
+        elif clicks > 0:
+            job = ClickJob.uniform(f"点击 {clicks}次/{duration}s", clicks, duration,
+                                   pyautogui.click, start_delay=START_DELAY, log=self.click_log)
+        else:
+            return
+        # 可以同时运行多个任务，每个任务有自己的节拍
+        self.engine.submit(job)
+
+    def toggle_pause(self):
+        for job in self.engine.active_jobs():
+            job.toggle_pause()
+
+    def stop_all(self):
+        self.engine.cancel_all()
+
+    def show_status(self, statuses):
+        """显示各任务的进度、CPS 和剩余时间"""
+        lines = []
+        for status in statuses:
+            progress = f"{status.done}/{status.planned}" if status.planned else f"{status.done}"
+            line = (f"{status.name}: {STATE_TEXT.get(status.state, status.state)} {progress} "
+                    f"{status.cps:.1f} CPS 剩余 {format_eta(status.eta)} 错过 {status.missed}")
+            if status.error:
+                line += f" ({status.error})"
+            lines.append(line)
+        if lines:
+            self.lbl_status.config(text="\n".join(lines))
 
-    def run_clicker(self, clicks, duration):
+    def start_recording(self):
+        if self.is_recording:
+            return
         try:
-            # Countdown
-            for i in range(3, 0, -1):
-                self.update_status(f"{i}秒后开始... (Starting in {i}s)")
-                time.sleep(1)
-            
-            self.update_status("正在点击... (Clicking...)")
-            
-            if clicks <= 0:
-                return
+            recorder = MacroRecorder(self.entry_macro.get().strip()).start()
+        except (OSError, MacroError) as e:
+            messagebox.showerror("错误", f"无法开始录制: {e}")
+            return
+        self.is_recording = True
+        self.btn_record.config(state=tk.DISABLED)
+        self.update_status("录制中，按 Esc 结束... (Recording)")
+
+        def wait_recording():
+            count = recorder.wait()
+            self.is_recording = False
+            self.update_status(f"已录制 {count} 个事件 (Recorded)")
+            self.root.after(0, lambda: self.btn_record.config(state=tk.NORMAL))
+
+        threading.Thread(target=wait_recording, daemon=True).start()
+
+    def start_replay(self):
+        try:
+            speed = float(self.entry_speed.get())
+            if speed <= 0:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("错误", "请输入有效的倍速")
+            return
+        path = self.entry_macro.get().strip()
+        try:
+            player = PyAutoGuiPlayer()
+        except MacroError as e:
+            messagebox.showerror("错误", str(e))
+            return
+        # 宏文件边读边放，不会整体载入内存
+        self.engine.submit(ClickJob(f"回放 {path} x{speed:g}", iter_macro(path, speed), player,
+                                    start_delay=START_DELAY, tolerance_ms=5.0))
+
+    def close(self):
+        self.engine.shutdown()
+        self.root.destroy()
 
-            interval = duration / clicks if clicks > 0 else 0
-            
-            start_time = time.time()
-            
-            for i in range(clicks):
-                pyautogui.click()
-                
-                # Calculate remaining time and sleep
-                elapsed = time.time() - start_time
-                expected_elapsed = (i + 1) * interval
-                sleep_time = expected_elapsed - elapsed
-                
-                if sleep_time > 0:
-                    time.sleep(sleep_time)
-                    
-            self.update_status("完成! (Done!)")
-            messagebox.showinfo("完成", f"已在 {duration}秒内完成 {clicks} 次点击")
-            
-        except Exception as e:
-            self.update_status(f"出错: {str(e)}")
-            print(e)
-        finally:
-            self.is_running = False
-            self.root.after(0, lambda: self.btn_start.config(state=tk.NORMAL))
+    def on_progress(self, key, value):
+        """ProgressChannel 的回调，在 Tk 线程中按固定频率调用"""
+        if key == 'jobs':
+            self.show_status(value)
+        else:
+            self.lbl_status.config(text=value)
 
     def update_status(self, text):
-        self.root.after(0, lambda: self.lbl_status.config(text=text))
+        # 可以在任意线程调用，只保留最新的一条，由 on_progress 显示
+        self.channel.publish('message', text)
 
 if __name__ == "__main__":
     # Fail-safe: Move mouse to upper-left corner to abort
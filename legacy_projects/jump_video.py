@@ -0,0 +1,538 @@
+"""跳一跳的离屏渲染：把一局游戏录成视频帧
+
+FrameRenderer 按 ImmediateRenderer 的图元和样式（平台、障碍物、虚线轨迹、
+落点标记、玩家、粒子、蓄力条）把画面直接画进 (高, 宽, 3) 的 uint8 NumPy
+数组，不需要 Tk：
+
+    * 矩形和描边是数组切片赋值；
+    * 玩家和落点标记的椭圆预先算好掩码，每帧只做一次带裁剪的掩码赋值；
+    * 轨迹的所有线段一次性按 1 像素步长采样，按 5 亮 3 灭的虚线模式筛选后
+      用花式索引写入；粒子同样整批写入。
+
+蓄力条上的百分比用内置的 3x5 点阵数字绘制，"蓄力" 两个汉字省略。
+
+输出为原始 rgb24 字节流（文件、标准输出或 ffmpeg 管道）或 PNG 序列：
+
+    python -m legacy_projects.jump_video --raw run.rgb --frames 1800
+    python -m legacy_projects.jump_video --raw - | ffmpeg -f rawvideo -pix_fmt rgb24 \\
+        -s 1200x360 -r 14.29 -i - run.mp4
+    python -m legacy_projects.jump_video --replay run.jrpl --ffmpeg run.mp4 --fps 60
+    python -m legacy_projects.jump_video --png frames/ --frames 300
+    python -m legacy_projects.jump_video --bench
+
+不指定 --replay 时由 AutoPlayer 自动游玩。--fps 为空时每个物理帧输出一帧，
+否则按给定帧率输出并像 JumpGame 一样对玩家和镜头位置插值。
+"""
+import argparse
+import math
+import os
+import subprocess
+import sys
+import time
+
+try:
+    import numpy as np
+except ImportError:  # 离屏渲染需要 NumPy
+    np = None
+
+try:
+    from legacy_projects.jump_engine import GameState, JumpEngine, PRESS
+    from legacy_projects.jump_autoplay import AutoPlayer
+    from legacy_projects.jump_replay import Recording, ReplayError
+    from legacy_projects.jump_render import (
+        BAR_HEIGHT, BAR_WIDTH, BAR_X, BAR_Y, MARKER_STYLE, MAX_DRAWN_PARTICLES,
+        OBSTACLE_STYLE, PARTICLE_COLORS, PARTICLE_SIZE, PLATFORM_STYLE, PLAYER_STYLE,
+        TRAJECTORY_STYLE, charge_color)
+    from legacy_projects.perf_stats import FrameTimer
+    from legacy_projects.vision import encode_png
+except ImportError:
+    # 作为普通脚本运行时的路径处理
+    from jump_engine import GameState, JumpEngine, PRESS
+    from jump_autoplay import AutoPlayer
+    from jump_replay import Recording, ReplayError
+    from jump_render import (
+        BAR_HEIGHT, BAR_WIDTH, BAR_X, BAR_Y, MARKER_STYLE, MAX_DRAWN_PARTICLES,
+        OBSTACLE_STYLE, PARTICLE_COLORS, PARTICLE_SIZE, PLATFORM_STYLE, PLAYER_STYLE,
+        TRAJECTORY_STYLE, charge_color)
+    from perf_stats import FrameTimer
+    from vision import encode_png
+
+BACKGROUND = '#87CEEB'  # 与 JumpGame 画布的背景色相同
+BAR_BACKGROUND = '#333333'
+BAR_OUTLINE = '#FFFFFF'
+# JumpGame 默认的物理步长（毫秒）
+TICK_MS = 70
+
+# 3x5 点阵字形，每个像素放大 TEXT_SCALE 倍
+GLYPHS = {
+    '0': ('111', '101', '101', '101', '111'),
+    '1': ('010', '110', '010', '010', '111'),
+    '2': ('111', '001', '111', '100', '111'),
+    '3': ('111', '001', '111', '001', '111'),
+    '4': ('101', '101', '111', '001', '001'),
+    '5': ('111', '100', '111', '001', '111'),
+    '6': ('111', '100', '111', '101', '111'),
+    '7': ('111', '001', '001', '001', '001'),
+    '8': ('111', '101', '111', '101', '111'),
+    '9': ('111', '101', '111', '001', '111'),
+    '%': ('101', '001', '010', '100', '101'),
+}
+TEXT_SCALE = 2
+
+
+def rgb(color):
+    """'#RRGGBB' -> (r, g, b)"""
+    return tuple(int(color[i:i + 2], 16) for i in (1, 3, 5))
+
+
+def _oval_masks(size, width, dash=None):
+    """直径为 size、描边宽 width 的圆的 (填充掩码, 描边掩码)
+
+    掩码四周各留 pad 像素给居中的描边，返回 (pad, 填充, 描边)。
+    dash 为 (亮, 灭) 时描边沿圆周按弧长取虚线。
+    """
+    pad = (width + 1) // 2
+    side = size + 2 * pad
+    centers = np.arange(side) + 0.5 - side / 2.0
+    dx, dy = np.meshgrid(centers, centers)
+    radius = size / 2.0
+    distance = np.hypot(dx, dy)
+    fill = distance <= radius - width / 2.0
+    outline = np.abs(distance - radius) <= width / 2.0
+    if dash is not None:
+        arc = (np.arctan2(dy, dx) + math.pi) * radius
+        outline &= arc % (dash[0] + dash[1]) < dash[0]
+    return pad, fill, outline
+
+
+def _text_mask(text):
+    """用 GLYPHS 拼出一行文字的掩码，字符间隔一个点"""
+    columns = []
+    for char in text:
+        glyph = GLYPHS.get(char)
+        if glyph is None:
+            continue
+        if columns:
+            columns.append(np.zeros((5, 1), dtype=bool))
+        columns.append(np.array([[c == '1' for c in row] for row in glyph]))
+    mask = np.hstack(columns) if columns else np.zeros((5, 0), dtype=bool)
+    return np.kron(mask, np.ones((TEXT_SCALE, TEXT_SCALE), dtype=bool))
+
+
+class FrameRenderer:
+    """与 ImmediateRenderer 相同的画面，画进 NumPy RGB 帧缓冲区
+
+    draw() 返回内部缓冲区 frame，下一次 draw() 会覆盖其内容。
+    """
+
+    def __init__(self, width, height, cell_size=30):
+        if np is None:
+            raise ImportError("FrameRenderer 需要安装 NumPy")
+        self.width = width  # 以格为单位，与游戏相同
+        self.height = height
+        self.cell_size = cell_size
+        self.pixel_width = width * cell_size
+        self.pixel_height = height * cell_size
+        self.frame = np.empty((self.pixel_height, self.pixel_width, 3), dtype=np.uint8)
+        self._colors = {}
+        self._rows = {}
+        oval = cell_size - 10
+        self._player = _oval_masks(oval, PLAYER_STYLE['width'])
+        self._marker = _oval_masks(oval, MARKER_STYLE['width'], MARKER_STYLE['dash'])
+        self._texts = {}
+        # 粒子方块内各像素相对左上角的偏移
+        offsets = np.arange(PARTICLE_SIZE)
+        self._particle_dy = offsets[None, :, None]
+        self._particle_dx = offsets[None, None, :]
+
+    def _color(self, color):
+        value = self._colors.get(color)
+        if value is None:
+            value = self._colors[color] = np.array(rgb(color), dtype=np.uint8)
+        return value
+
+    def _row(self, color):
+        """一整行该颜色的像素
+
+        按 (3,) 的颜色广播赋值时 NumPy 逐像素复制 3 个字节，比按行复制慢几十倍，
+        因此矩形填充都从这一行切片复制。
+        """
+        row = self._rows.get(color)
+        if row is None:
+            row = self._rows[color] = np.empty((self.pixel_width, 3), dtype=np.uint8)
+            row[:] = self._color(color)
+        return row
+
+    def _fill(self, x1, y1, x2, y2, row):
+        """用 _row 的像素填充 [x1, x2) x [y1, y2)，坐标四舍五入并裁剪到画面内"""
+        x1 = max(int(round(x1)), 0)
+        y1 = max(int(round(y1)), 0)
+        x2 = min(int(round(x2)), self.pixel_width)
+        y2 = min(int(round(y2)), self.pixel_height)
+        if x1 < x2 and y1 < y2:
+            self.frame[y1:y2, x1:x2] = row[:x2 - x1]
+
+    def _rectangle(self, x1, y1, x2, y2, fill=None, outline=None, width=1):
+        """与 Tk 的 create_rectangle 相同：描边居中压在矩形边界上"""
+        if fill is not None:
+            self._fill(x1, y1, x2, y2, self._row(fill))
+        if outline:
+            color = self._row(outline)
+            a = width // 2
+            b = width - a
+            self._fill(x1 - a, y1 - a, x2 + b, y1 + b, color)
+            self._fill(x1 - a, y2 - a, x2 + b, y2 + b, color)
+            self._fill(x1 - a, y1 + b, x1 + b, y2 - a, color)
+            self._fill(x2 - a, y1 + b, x2 + b, y2 - a, color)
+
+    def _blit(self, mask, x, y, color):
+        """把掩码为真的像素设为 color，mask 左上角位于 (x, y)，超出画面的部分裁掉"""
+        h, w = mask.shape
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, self.pixel_width), min(y + h, self.pixel_height)
+        if x0 < x1 and y0 < y1:
+            self.frame[y0:y1, x0:x1][mask[y0 - y:y1 - y, x0 - x:x1 - x]] = color
+
+    def _oval(self, masks, x, y, fill=None, outline=None):
+        """masks 来自 _oval_masks，(x, y) 为外接框左上角"""
+        pad, fill_mask, outline_mask = masks
+        x = int(round(x)) - pad
+        y = int(round(y)) - pad
+        if fill is not None:
+            self._blit(fill_mask, x, y, self._color(fill))
+        if outline:
+            self._blit(outline_mask, x, y, self._color(outline))
+
+    def _trajectory(self, points, cam):
+        """把相邻轨迹点之间的虚线一次性画出（Tk 中每段是独立的线，虚线从每段起点算起）"""
+        cs = self.cell_size
+        half = cs // 2
+        pts = np.asarray(points, dtype=np.float64)
+        sx = (pts[:, 0] - cam) * cs + half
+        sy = pts[:, 1] * cs + half
+        x0, y0 = sx[:-1], sy[:-1]
+        dx, dy = sx[1:] - x0, sy[1:] - y0
+        length = np.hypot(dx, dy)
+        samples = np.ceil(length).astype(np.int64) + 1
+        segment = np.repeat(np.arange(len(length)), samples)
+        # 每个采样点在所在线段上的弧长（像素）
+        along = np.arange(len(segment)) - np.repeat(np.cumsum(samples) - samples, samples)
+        on, off = TRAJECTORY_STYLE['dash']
+        keep = along % (on + off) < on
+        segment, along = segment[keep], along[keep]
+        t = np.minimum(along / np.maximum(length[segment], 1e-9), 1.0)
+        xs = np.floor(x0[segment] + dx[segment] * t - 0.5).astype(np.int64)
+        ys = np.floor(y0[segment] + dy[segment] * t - 0.5).astype(np.int64)
+        # 线宽 2：每个采样点画 2x2 的方块
+        width = TRAJECTORY_STYLE['width']
+        xs = (xs[:, None, None] + np.arange(width)[None, None, :]).repeat(width, 1).ravel()
+        ys = (ys[:, None, None] + np.arange(width)[None, :, None]).repeat(width, 2).ravel()
+        inside = (xs >= 0) & (xs < self.pixel_width) & (ys >= 0) & (ys < self.pixel_height)
+        self.frame[ys[inside], xs[inside]] = self._color(TRAJECTORY_STYLE['fill'])
+
+    def _particles(self, rects):
+        for kind, coords in rects.items():
+            coords = np.asarray(coords)
+            left = np.rint(coords[:, 0]).astype(np.int64)[:, None, None]
+            top = np.rint(coords[:, 1]).astype(np.int64)[:, None, None]
+            xs = np.broadcast_to(left + self._particle_dx, (len(coords), PARTICLE_SIZE,
+                                                            PARTICLE_SIZE))
+            ys = np.broadcast_to(top + self._particle_dy, xs.shape)
+            inside = (xs >= 0) & (xs < self.pixel_width) & (ys >= 0) & (ys < self.pixel_height)
+            self.frame[ys[inside], xs[inside]] = self._color(PARTICLE_COLORS[kind])
+
+    def _charge_bar(self, game):
+        self._rectangle(BAR_X, BAR_Y, BAR_X + BAR_WIDTH, BAR_Y + BAR_HEIGHT,
+                        fill=BAR_BACKGROUND, outline=BAR_OUTLINE, width=2)
+        progress = min(game.charge_power / game.max_charge_power, 1.0)
+        fill_width = int(BAR_WIDTH * progress)
+        if fill_width > 0:
+            self._rectangle(BAR_X, BAR_Y, BAR_X + fill_width, BAR_Y + BAR_HEIGHT,
+                            fill=charge_color(progress))
+        text = f"{int(progress * 100)}%"
+        mask = self._texts.get(text)
+        if mask is None:
+            mask = self._texts[text] = _text_mask(text)
+        h, w = mask.shape
+        self._blit(mask, BAR_X + (BAR_WIDTH - w) // 2, BAR_Y + (BAR_HEIGHT - h) // 2,
+                   self._color(BAR_OUTLINE))
+
+    def draw(self, game, player_pos=None, camera=None):
+        """player_pos / camera 为插值后的玩家和镜头位置，缺省时使用 game 当前值"""
+        cs = self.cell_size
+        cam = game.camera_offset if camera is None else camera
+        right = cam + game.width
+        self.frame[:] = self._row(BACKGROUND)
+
+        for platform in game.platforms:
+            if platform.x + platform.length > cam and platform.x < right:
+                self._rectangle((platform.x - cam) * cs, platform.y * cs,
+                                (platform.x + platform.length - cam) * cs, (platform.y + 1) * cs,
+                                **PLATFORM_STYLE)
+
+        for obs in game.obstacles:
+            if obs.x + obs.width > cam and obs.x < right:
+                self._rectangle((obs.x - cam) * cs, obs.y * cs,
+                                (obs.x + obs.width - cam) * cs, (obs.y + 1) * cs,
+                                **OBSTACLE_STYLE)
+
+        points = game.trajectory_points
+        if game.charging and points:
+            if len(points) > 1:
+                self._trajectory(points, cam)
+            last_x, last_y = points[-1]
+            self._oval(self._marker, (last_x - cam) * cs + 5, last_y * cs + 5,
+                       outline=MARKER_STYLE['outline'])
+
+        px, py = player_pos or (game.player_x, game.player_y)
+        px -= cam
+        if 0 <= px < game.width and 0 <= int(py) < game.height:
+            self._oval(self._player, px * cs + 5, py * cs + 5,
+                       fill=PLAYER_STYLE['fill'], outline=PLAYER_STYLE['outline'])
+
+        rects = game.particles.rects(cs, PARTICLE_SIZE, MAX_DRAWN_PARTICLES, cam)
+        if rects:
+            self._particles(rects)
+
+        if game.charging:
+            self._charge_bar(game)
+        return self.frame
+
+
+# ---------------------------------------------------------------- 输出
+
+class RawVideoWriter:
+    """把每帧的 RGB 字节原样写入二进制流，对应 ffmpeg 的 -f rawvideo -pix_fmt rgb24"""
+
+    def __init__(self, stream, close=False):
+        self.stream = stream
+        self._close = close
+        self.frames = 0
+
+    @classmethod
+    def open(cls, path):
+        """path 为 '-' 时写到标准输出"""
+        if path == '-':
+            return cls(sys.stdout.buffer)
+        return cls(open(path, 'wb'), close=True)
+
+    def write(self, frame):
+        self.stream.write(frame.data)
+        self.frames += 1
+
+    def close(self):
+        if self._close:
+            self.stream.close()
+        else:
+            self.stream.flush()
+
+
+class FFmpegWriter(RawVideoWriter):
+    """启动 ffmpeg 子进程，从它的标准输入送入原始帧并编码成视频文件"""
+
+    def __init__(self, path, width, height, fps, ffmpeg='ffmpeg'):
+        self.process = subprocess.Popen(
+            [ffmpeg, '-loglevel', 'error', '-y', '-f', 'rawvideo', '-pix_fmt', 'rgb24',
+             '-s', f'{width}x{height}', '-r', f'{fps:g}', '-i', '-',
+             '-pix_fmt', 'yuv420p', path],
+            stdin=subprocess.PIPE)
+        super().__init__(self.process.stdin, close=True)
+
+    def close(self):
+        super().close()
+        if self.process.wait() != 0:
+            raise OSError(f"ffmpeg 退出码 {self.process.returncode}")
+
+
+class PngSequenceWriter:
+    """每帧存成 directory 下的一个 PNG 文件（frame_000000.png ...）"""
+
+    def __init__(self, directory, pattern='frame_{:06d}.png'):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.pattern = pattern
+        self.frames = 0
+
+    def write(self, frame):
+        path = os.path.join(self.directory, self.pattern.format(self.frames))
+        with open(path, 'wb') as f:
+            f.write(encode_png(frame))
+        self.frames += 1
+
+    def close(self):
+        pass
+
+
+# ---------------------------------------------------------------- 录制
+
+def autoplay_run(seed=0, difficulty=1, width=40, height=12, frames=1800):
+    """AutoPlayer 玩一局：先产生初始状态，之后每个物理帧产生一次引擎"""
+    engine = JumpEngine(width, height, difficulty, seed=seed)
+    player = AutoPlayer(engine)
+    yield engine
+    while engine.state == GameState.RUNNING and engine.frame_count < frames:
+        player.act()
+        engine.tick()
+        yield engine
+
+
+def replay_run(recording, engine=None):
+    """按录像的输入重放一局，产生方式与 autoplay_run 相同
+
+    engine 缺省时按录像参数新建。事件的处理顺序与 jump_replay.replay 一致，
+    放完后可以用 engine.state_hash() 与 recording.final_hash 比较。
+    """
+    if engine is None:
+        engine = JumpEngine(recording.width, recording.height, recording.difficulty,
+                            seed=recording.seed)
+    events = recording.iter_events()
+    pending = next(events, None)
+    yield engine
+    while engine.frame_count < recording.final_frame and engine.state == GameState.RUNNING:
+        while pending is not None and pending[0] <= engine.frame_count:
+            if pending[1] == PRESS:
+                engine.on_space_press()
+            else:
+                engine.on_space_release()
+            pending = next(events, None)
+        engine.tick()
+        yield engine
+    while pending is not None:
+        if pending[1] == PRESS:
+            engine.on_space_press()
+        else:
+            engine.on_space_release()
+        pending = next(events, None)
+
+
+def record(run, renderer, writer, fps=None, tick_ms=TICK_MS):
+    """把 run（autoplay_run / replay_run）的每一帧画出来交给 writer，返回输出的帧数
+
+    fps 为空时每个物理帧一帧；否则按 fps 输出，物理帧之间对玩家和镜头插值。
+    """
+    engine = next(run, None)
+    if engine is None:
+        return 0
+    if fps is None:
+        writer.write(renderer.draw(engine))
+        count = 1
+        for engine in run:
+            writer.write(renderer.draw(engine))
+            count += 1
+        return count
+    tick = tick_ms / 1000.0
+    frame_time = 1.0 / fps
+    accumulator = tick
+    count = 0
+    while True:
+        alpha = accumulator / tick
+        writer.write(renderer.draw(engine, engine.interpolated_player(alpha),
+                                   engine.interpolated_camera(alpha)))
+        count += 1
+        accumulator += frame_time
+        while accumulator >= tick:
+            if next(run, None) is None:
+                return count
+            accumulator -= tick
+
+
+def bench(sizes=((40, 12, 30), (60, 15, 30), (40, 12, 15)), frames=600):
+    """自动游玩时每帧的绘制耗时，以及加上写原始帧（丢弃）和编码 PNG 的帧率"""
+    print(f"{'size':>10} {'pixels':>9} {'draw ms':>8} {'p99 ms':>7} {'draw fps':>9} "
+          f"{'raw fps':>8} {'png fps':>8}")
+    with open(os.devnull, 'wb') as sink:
+        for width, height, cell_size in sizes:
+            renderer = FrameRenderer(width, height, cell_size)
+            timer = FrameTimer(window=frames)
+            writer = RawVideoWriter(sink)
+            start = time.perf_counter()
+            for engine in autoplay_run(0, 1, width, height, frames=frames):
+                timer.start()
+                frame = renderer.draw(engine)
+                timer.stop()
+                writer.write(frame)
+            # 录制的总耗时包含引擎模拟，raw fps 为端到端帧率
+            raw_rate = writer.frames / (time.perf_counter() - start)
+            png_frames = max(10, frames // 20)
+            start = time.perf_counter()
+            for _ in range(png_frames):
+                encode_png(frame)
+            png_rate = png_frames / (time.perf_counter() - start)
+            size = f"{renderer.pixel_width}x{renderer.pixel_height}"
+            print(f"{size:>10} {renderer.pixel_width * renderer.pixel_height:>9} "
+                  f"{timer.mean_ms:>8.3f} {timer.p99_ms:>7.3f} {1000 / timer.mean_ms:>9.0f} "
+                  f"{raw_rate:>8.0f} {png_rate:>8.0f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="把跳一跳的一局游戏录成视频帧")
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument('--raw', help="原始 rgb24 帧写入该文件，'-' 为标准输出")
+    output.add_argument('--png', help="PNG 序列输出目录")
+    output.add_argument('--ffmpeg', help="通过 ffmpeg 编码为该视频文件")
+    output.add_argument('--bench', action='store_true', help="测量渲染帧率")
+    parser.add_argument('--replay', help="录像文件（jump_replay 格式），缺省时自动游玩")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--difficulty', type=int, default=1)
+    parser.add_argument('--width', type=int, default=40)
+    parser.add_argument('--height', type=int, default=12)
+    parser.add_argument('--frames', type=int, default=None,
+                        help="自动游玩的最多物理帧数（默认 1800，--bench 时默认 600）")
+    parser.add_argument('--cell-size', type=int, default=30)
+    parser.add_argument('--fps', type=float, default=None,
+                        help="输出帧率，缺省时每个物理帧一帧")
+    args = parser.parse_args(argv)
+    if np is None:
+        print("需要安装 NumPy")
+        return 1
+    if args.bench:
+        bench(frames=args.frames or 600)
+        return 0
+    if not (args.raw or args.png or args.ffmpeg):
+        parser.print_usage()
+        return 2
+
+    recording = None
+    if args.replay:
+        try:
+            recording = Recording.load(args.replay)
+        except (OSError, ReplayError) as e:
+            print(f"{args.replay}: 无法读取 ({e})", file=sys.stderr)
+            return 1
+        engine = JumpEngine(recording.width, recording.height, recording.difficulty,
+                            seed=recording.seed)
+        run = replay_run(recording, engine)
+        renderer = FrameRenderer(recording.width, recording.height, args.cell_size)
+    else:
+        run = autoplay_run(args.seed, args.difficulty, args.width, args.height,
+                           args.frames or 1800)
+        renderer = FrameRenderer(args.width, args.height, args.cell_size)
+    fps = args.fps or 1000.0 / TICK_MS
+    try:
+        if args.raw:
+            writer = RawVideoWriter.open(args.raw)
+        elif args.png:
+            writer = PngSequenceWriter(args.png)
+        else:
+            writer = FFmpegWriter(args.ffmpeg, renderer.pixel_width, renderer.pixel_height, fps)
+    except OSError as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return 1
+
+    start = time.perf_counter()
+    try:
+        count = record(run, renderer, writer, args.fps)
+    finally:
+        writer.close()
+    seconds = time.perf_counter() - start
+    # 输出可能是标准输出，统计信息写到标准错误
+    print(f"{count} 帧 {renderer.pixel_width}x{renderer.pixel_height} @ {fps:.2f} fps  "
+          f"{seconds:.2f}s  {count / seconds:.0f} 帧/秒", file=sys.stderr)
+    if recording is not None and engine.state_hash() != recording.final_hash:
+        print("警告: 重放的最终状态与录像不一致", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
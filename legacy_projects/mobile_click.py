@@ -4,14 +4,37 @@ from kivy.uix.label import Label
 from kivy.uix.textinput import TextInput
 from kivy.uix.button import Button
 from kivy.clock import Clock
-import threading
-import time
-import os
+import importlib
+
+try:
+    from legacy_projects.progress import ProgressChannel, RingLog, format_eta
+except ImportError:
+    # 作为普通脚本运行时的路径处理
+    from progress import ProgressChannel, RingLog, format_eta
 
 # 注意：
 # 1. 此脚本需要在 Android 环境下运行（如 Pydroid 3 或打包成 APK）。
 # 2. 模拟点击 (input tap) 通常需要手机拥有 ROOT 权限，或者在特定环境下才能点击其他 APP。
 # 3. 如果没有 ROOT 权限，此脚本可能无法点击游戏窗口。
+# 4. 点击通过 android_input 注入：有 ROOT 时直接写触摸屏设备，否则使用常驻 shell。
+# 5. 每次按开始都会新增一个点击任务，多个任务可以同时运行，并可暂停/继续/停止。
+# 6. 填写目标图片（PNG）后，点击位置由截图匹配得到，坐标只在找不到目标时使用。
+# 7. 启动时只导入界面需要的模块；注入、asyncio、脚本和截图匹配在第一次按开始时才加载。
+
+# 点击开始前的倒计时（秒）
+START_DELAY = 3
+STATE_TEXT = {'pending': '等待', 'running': '运行中', 'paused': '已暂停', 'done': '完成',
+              'cancelled': '已停止', 'failed': '出错'}
+
+
+def _import(name):
+    """延迟导入本包中的模块"""
+    try:
+        return importlib.import_module('legacy_projects.' + name)
+    except ImportError:
+        # 作为普通脚本运行时的路径处理
+        return importlib.import_module(name)
+
 
 class AutoClickerApp(App):
     def build(self):
@@ -37,58 +60,161 @@ class AutoClickerApp(App):
         self.y_input = TextInput(text='1000', multiline=False, input_filter='int', size_hint_y=None, height=40)
         layout.add_widget(self.y_input)
         
+        # 目标图片（可选，填写后按截图中找到的位置点击）
+        layout.add_widget(Label(text='目标图片 (Template PNG, 可选):', size_hint_y=None, height=30))
+        self.template_input = TextInput(text='', multiline=False, size_hint_y=None, height=40)
+        layout.add_widget(self.template_input)
+        
+        # 点击脚本（可选，填写后忽略上面的次数、时间和坐标）
+        layout.add_widget(Label(text='脚本 (Script, 可选):', size_hint_y=None, height=30))
+        self.script_input = TextInput(text='', multiline=True, size_hint_y=None, height=120)
+        layout.add_widget(self.script_input)
+        
         # 状态标签
-        self.status_label = Label(text='准备就绪 (Ready)', size_hint_y=None, height=30)
+        self.status_label = Label(text='准备就绪 (Ready)', size_hint_y=None, height=90)
         layout.add_widget(self.status_label)
         
-        # 开始按钮
-        self.btn = Button(text='开始 (Start)', size_hint_y=None, height=60, background_color=(0, 1, 0, 1))
+        # 开始 / 暂停 / 停止
+        buttons = BoxLayout(orientation='horizontal', spacing=10, size_hint_y=None, height=60)
+        self.btn = Button(text='开始 (Start)', background_color=(0, 1, 0, 1))
         self.btn.bind(on_press=self.start_clicking)
-        layout.add_widget(self.btn)
+        buttons.add_widget(self.btn)
+        self.btn_pause = Button(text='暂停/继续')
+        self.btn_pause.bind(on_press=self.toggle_pause)
+        buttons.add_widget(self.btn_pause)
+        self.btn_stop = Button(text='停止 (Stop)', background_color=(1, 0, 0, 1))
+        self.btn_stop.bind(on_press=self.stop_all)
+        buttons.add_widget(self.btn_stop)
+        layout.add_widget(buttons)
+        
+        # 进度只保留最新值，界面每 0.2 秒取一次，点击日志写入环形缓冲而不是标准输出
+        self.channel = ProgressChannel()
+        self.channel.attach_kivy(Clock, self.on_progress, 0.2)
+        self.click_log = RingLog(2000)
+        # 注入后端和任务引擎在第一次按开始时创建（见 ensure_engine）
+        self.injector = None
+        self.engine = None
+        # 目标跟踪：同一张模板图片只加载一次，只在有任务运行时截图
+        self.tracker = None
+        self.template_path = None
         
         return layout
 
-    def start_clicking(self, instance):
-        # 禁用按钮防止重复点击
-        self.btn.disabled = True
-        threading.Thread(target=self.run_clicker).start()
+    def ensure_engine(self):
+        """创建所有任务共用的注入后端（第一次点击前在后台打开）和 asyncio 任务引擎"""
+        if self.engine is None:
+            self.injector = _import('android_input').LazyInjector()
+            self.engine = _import('click_jobs').JobEngine(self.channel, status_interval=0.2)
+        return self.engine
 
-    def run_clicker(self):
+    def get_tracker(self, path):
+        """按模板路径创建（或复用）目标跟踪器"""
+        if self.tracker is None or self.template_path != path:
+            if self.tracker is not None:
+                self.tracker.stop()
+            vision = _import('vision')
+            locator = vision.TemplateLocator(vision.load_png(path))
+            self.tracker = vision.TargetTracker(locator, vision.AndroidScreen(), interval=0.2,
+                                                active=lambda: bool(self.engine.active_jobs()))
+            self.template_path = path
+        return self.tracker
+
+    def start_clicking(self, instance):
+        engine = self.ensure_engine()
+        ClickJob = _import('click_jobs').ClickJob
+        click_script = _import('click_script')
         try:
             clicks = int(self.clicks_input.text)
             duration = float(self.duration_input.text)
             x = int(self.x_input.text)
             y = int(self.y_input.text)
-            
-            if clicks <= 0:
+            # 脚本在开始前编译成时间线，点击过程中不再解析
+            script = self.script_input.text.strip()
+            timeline = click_script.compile_script(script) if script else None
+        except (ValueError, click_script.ScriptError) as e:
+            self.update_status(f"错误: {str(e)}")
+            return
+        template = self.template_input.text.strip()
+        tracker = None
+        if template and timeline is None:
+            # 只有用到目标图片时才加载截图匹配（及 NumPy）
+            try:
+                tracker = self.get_tracker(template)
+            except (OSError, _import('vision').VisionError) as e:
+                self.update_status(f"错误: {str(e)}")
                 return
+        
+        # 按固定节拍点击（注意：这通常需要 ROOT 权限才能点击其他 APP）
+        injector = self.injector
+        if timeline is not None:
+            job = ClickJob.from_timeline(f"脚本 {len(timeline)} 个事件", timeline, injector,
+                                         start_delay=START_DELAY, setup=injector.open,
+                                         log=self.click_log)
+        elif clicks > 0 and tracker is not None:
+            def tap():
+                position = tracker.position or (x, y)
+                injector.tap(*position)
 
-            interval = duration / clicks
-            
-            self.update_status(f"3秒后开始... (Starting in 3s)")
-            time.sleep(3)
-            
-            self.update_status("正在运行... (Running...)")
-            
-            for i in range(clicks):
-                # Android 核心点击命令
-                # 注意：这通常需要 ROOT 权限才能点击其他 APP
-                cmd = f"input tap {x} {y}"
-                print(f"Executing: {cmd}")
-                os.system(cmd)
-                
-                time.sleep(interval)
-                
-            self.update_status("完成! (Done!)")
-            
-        except Exception as e:
-            self.update_status(f"错误: {str(e)}")
-        finally:
-            # 恢复按钮状态 (需要在主线程执行)
-            Clock.schedule_once(lambda dt: setattr(self.btn, 'disabled', False))
+            def setup():
+                injector.open()
+                # 开始前先定位一次，之后由后台线程跟踪
+                tracker.refresh()
+                tracker.start()
+
+            job = ClickJob.uniform(f"目标 {clicks}次/{duration}s", clicks, duration, tap,
+                                   start_delay=START_DELAY, setup=setup, log=self.click_log)
+        elif clicks > 0:
+            job = ClickJob.uniform(f"({x},{y}) {clicks}次/{duration}s", clicks, duration,
+                                   lambda: injector.tap(x, y), start_delay=START_DELAY,
+                                   setup=injector.open, log=self.click_log)
+        else:
+            return
+        engine.submit(job)
+
+    def toggle_pause(self, instance):
+        if self.engine is not None:
+            for job in self.engine.active_jobs():
+                job.toggle_pause()
+
+    def stop_all(self, instance):
+        if self.engine is not None:
+            self.engine.cancel_all()
+
+    def show_status(self, statuses):
+        """显示各任务的进度、CPS 和剩余时间"""
+        lines = []
+        for status in statuses:
+            line = (f"{status.name}: {STATE_TEXT.get(status.state, status.state)} "
+                    f"{status.done}/{status.planned} {status.cps:.1f} CPS "
+                    f"剩余 {format_eta(status.eta)} 错过 {status.missed}")
+            if status.error:
+                line += f" ({status.error})"
+            lines.append(line)
+        if lines:
+            self.status_label.text = '\n'.join(lines)
+
+    def on_stop(self):
+        # 退出时停止所有任务并关闭注入后端，事件循环线程是守护线程，不会阻止退出
+        if self.tracker is not None:
+            self.tracker.stop()
+        if self.engine is None:
+            return
+        self.engine.shutdown()
+        try:
+            self.injector.close()
+        except _import('android_input').InjectError:
+            pass
+
+    def on_progress(self, key, value):
+        """ProgressChannel 的回调，在 Kivy 主线程中按固定频率调用"""
+        if key == 'jobs':
+            self.show_status(value)
+        else:
+            self.status_label.text = value
 
     def update_status(self, text):
-        Clock.schedule_once(lambda dt: setattr(self.status_label, 'text', text))
+        # 可以在任意线程调用，只保留最新的一条，由 on_progress 显示
+        self.channel.publish('message', text)
 
 if __name__ == '__main__':
     AutoClickerApp().run()
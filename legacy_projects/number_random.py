@@ -1,62 +1,104 @@
 import random
 
+# 猜测结果
+TOO_SMALL = -1
+CORRECT = 0
+TOO_BIG = 1
 
-def guess_number_game():
-    """随机数猜测游戏"""
-    print("=" * 50)
-    print("欢迎来到随机数猜测游戏！")
-    print("=" * 50)
-    
-    # 生成 1-100 之间的随机数
-    target_number = random.randint(1, 100)
-    attempts = 0
-    max_attempts = 10
-    
-    print(f"\n我想了一个 1-100 之间的数字，你有 {max_attempts} 次机会来猜测它。\n")
-    
-    while attempts < max_attempts:
+
+class GuessGame:
+    """一局猜数字的规则（不做输入输出），可以由程序直接驱动
+
+    guess 返回 TOO_SMALL / CORRECT / TOO_BIG；超出范围的猜测抛出 ValueError，
+    不计入次数。
+    """
+
+    # 网络服务器中同时存在成千上万局，用 __slots__ 省去每个实例的 __dict__
+    __slots__ = ('low', 'high', 'max_attempts', 'target', 'attempts', 'won')
+
+    def __init__(self, low=1, high=100, max_attempts=10, target=None, rng=random):
+        if low > high:
+            raise ValueError("范围下限不能大于上限")
+        if max_attempts < 1:
+            raise ValueError("至少要有一次机会")
+        self.low = low
+        self.high = high
+        self.max_attempts = max_attempts
+        self.target = rng.randint(low, high) if target is None else target
+        self.attempts = 0
+        self.won = False
+
+    @property
+    def remaining(self):
+        return self.max_attempts - self.attempts
+
+    @property
+    def finished(self):
+        return self.won or self.attempts >= self.max_attempts
+
+    def guess(self, number):
+        if self.finished:
+            raise ValueError("本局已经结束")
+        if number < self.low or number > self.high:
+            raise ValueError(f"请输入 {self.low}-{self.high} 之间的数字")
+        self.attempts += 1
+        if number == self.target:
+            self.won = True
+            return CORRECT
+        return TOO_SMALL if number < self.target else TOO_BIG
+
+
+def guess_number_game(low=1, high=100, max_attempts=10, read=input, write=print, rng=random):
+    """随机数猜测游戏（read / write 默认为 input / print）"""
+    write("=" * 50)
+    write("欢迎来到随机数猜测游戏！")
+    write("=" * 50)
+
+    # 生成 low-high 之间的随机数
+    game = GuessGame(low, high, max_attempts, rng=rng)
+
+    write(f"\n我想了一个 {low}-{high} 之间的数字，你有 {max_attempts} 次机会来猜测它。\n")
+
+    while not game.finished:
         try:
-            guess = int(input(f"请输入你的猜测（第 {attempts + 1}/{max_attempts} 次）: "))
-            
+            guess = int(read(f"请输入你的猜测（第 {game.attempts + 1}/{max_attempts} 次）: "))
+
             # 检查输入范围
-            if guess < 1 or guess > 100:
-                print("❌ 请输入 1-100 之间的数字！\n")
+            if guess < low or guess > high:
+                write(f"❌ 请输入 {low}-{high} 之间的数字！\n")
                 continue
-            
-            attempts += 1
-            
+
             # 比较猜测和目标数字
-            if guess == target_number:
-                print(f"\n🎉 恭喜你！你猜对了！答案是 {target_number}")
-                print(f"✨ 你用了 {attempts} 次机会！\n")
+            result = game.guess(guess)
+            if result == CORRECT:
+                write(f"\n🎉 恭喜你！你猜对了！答案是 {game.target}")
+                write(f"✨ 你用了 {game.attempts} 次机会！\n")
                 return True
-            elif guess < target_number:
-                remaining = max_attempts - attempts
-                print(f"⬆️  你的猜测太小了！还剩 {remaining} 次机会\n")
+            elif result == TOO_SMALL:
+                write(f"⬆️  你的猜测太小了！还剩 {game.remaining} 次机会\n")
             else:
-                remaining = max_attempts - attempts
-                print(f"⬇️  你的猜测太大了！还剩 {remaining} 次机会\n")
-        
+                write(f"⬇️  你的猜测太大了！还剩 {game.remaining} 次机会\n")
+
         except ValueError:
-            print("❌ 请输入一个有效的数字！\n")
+            write("❌ 请输入一个有效的数字！\n")
             continue
-    
+
     # 如果用尽所有机会
-    print(f"\n😢 很遗憾，你没有猜中。答案是 {target_number}")
-    print(f"💡 正确答案是: {target_number}\n")
+    write(f"\n😢 很遗憾，你没有猜中。答案是 {game.target}")
+    write(f"💡 正确答案是: {game.target}\n")
     return False
 
 
-def play_again():
+def play_again(read=input, write=print):
     """询问是否再玩一次"""
     while True:
-        choice = input("是否想再玩一次？(y/n): ").lower()
+        choice = read("是否想再玩一次？(y/n): ").lower()
         if choice == 'y':
             return True
         elif choice == 'n':
             return False
         else:
-            print("请输入 'y' 或 'n'")
+            write("请输入 'y' 或 'n'")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,347 @@
+"""猜数字的多人网络服务（asyncio，按行收发的文本协议）
+
+每个连接是一局接一局的猜数字，规则与 number_random.GuessGame 相同。协议：
+
+    服务器 -> GAME 1 100 10          新的一局：范围和次数
+    客户端 -> 50
+    服务器 -> SMALL 9 / BIG 9        猜小了 / 猜大了，后面是剩余次数
+              WIN 3 / LOSE 42        猜中（用了几次）/ 次数用完（答案）
+    客户端 -> NEW                    再来一局（对应 play_again）
+    客户端 -> QUIT                   服务器回复 BYE 后断开
+              ERR 说明               无效输入，不计入次数
+
+每个连接直接用一个带 __slots__ 的 Session（asyncio.Protocol）处理，没有
+额外的读循环协程，数千个连接也只占很少的内存。一个清理任务定期关闭超过
+idle_timeout 秒没有发送任何数据的连接。
+
+自带压力测试：在同一进程中启动服务器和大量本地客户端（用二分查找猜数），
+统计每秒完成的会话数和每次请求的响应延迟。客户端收到回复后立即发下一个请求，
+所有连接同时在线时延迟约为 连接数 / 每秒请求数，可以用 --concurrency 限制：
+
+    python -m legacy_projects.number_server serve --port 8765
+    python -m legacy_projects.number_server bench --clients 2000 --games 5
+    python -m legacy_projects.number_server load --port 8765 --clients 500
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from array import array
+
+try:
+    from legacy_projects.number_random import CORRECT, TOO_SMALL, GuessGame
+    from legacy_projects.number_solver import binary_guess
+    from legacy_projects.perf_stats import percentile
+except ImportError:
+    # 作为普通脚本运行时的路径处理
+    from number_random import CORRECT, TOO_SMALL, GuessGame
+    from number_solver import binary_guess
+    from perf_stats import percentile
+
+# 单行最长字节数，超过视为异常客户端
+MAX_LINE = 256
+
+
+class Session(asyncio.Protocol):
+    """一个连接的全部状态"""
+
+    __slots__ = ('server', 'transport', 'game', 'buffer', 'last_active', 'games')
+
+    def __init__(self, server):
+        self.server = server
+        self.transport = None
+        self.game = None
+        self.buffer = b''
+        self.last_active = 0.0
+        self.games = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.last_active = time.monotonic()
+        self.server.opened(self)
+        self.new_game()
+
+    def connection_lost(self, exc):
+        self.server.closed(self)
+
+    def data_received(self, data):
+        self.last_active = time.monotonic()
+        buffer = self.buffer + data
+        lines = buffer.split(b'\n')
+        self.buffer = lines.pop()
+        if len(self.buffer) > MAX_LINE:
+            self.send('ERR 行过长')
+            self.transport.close()
+            return
+        for line in lines:
+            self.handle(line.strip())
+            if self.transport.is_closing():
+                return
+
+    def send(self, text):
+        self.transport.write(text.encode('utf-8') + b'\n')
+
+    def new_game(self):
+        server = self.server
+        self.game = GuessGame(server.low, server.high, server.max_attempts, rng=server.rng)
+        self.games += 1
+        server.stats['games'] += 1
+        self.send(f'GAME {server.low} {server.high} {server.max_attempts}')
+
+    def handle(self, line):
+        server = self.server
+        server.stats['requests'] += 1
+        command = line.upper()
+        if command == b'NEW':
+            self.new_game()
+            return
+        if command == b'QUIT':
+            self.send('BYE')
+            self.transport.close()
+            return
+        try:
+            number = int(line)
+        except ValueError:
+            self.send('ERR 请输入一个有效的数字')
+            return
+        game = self.game
+        if game.finished:
+            self.send('ERR 本局已经结束，发送 NEW 开始新的一局')
+            return
+        try:
+            result = game.guess(number)
+        except ValueError as e:
+            self.send(f'ERR {e}')
+            return
+        if result == CORRECT:
+            server.stats['wins'] += 1
+            self.send(f'WIN {game.attempts}')
+        elif game.finished:
+            self.send(f'LOSE {game.target}')
+        else:
+            self.send(f"{'SMALL' if result == TOO_SMALL else 'BIG'} {game.remaining}")
+
+
+class GuessServer:
+    """猜数字服务器，sessions 为当前所有连接"""
+
+    def __init__(self, host='127.0.0.1', port=8765, low=1, high=100, max_attempts=10,
+                 idle_timeout=60.0, seed=None):
+        self.host = host
+        self.port = port
+        self.low = low
+        self.high = high
+        self.max_attempts = max_attempts
+        self.idle_timeout = idle_timeout
+        self.rng = random.Random(seed)
+        self.sessions = set()
+        self.stats = {'connections': 0, 'closed': 0, 'evicted': 0, 'games': 0, 'wins': 0,
+                      'requests': 0}
+        self.server = None
+        self._sweeper = None
+
+    def opened(self, session):
+        self.sessions.add(session)
+        self.stats['connections'] += 1
+
+    def closed(self, session):
+        self.sessions.discard(session)
+        self.stats['closed'] += 1
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        self.server = await loop.create_server(lambda: Session(self), self.host, self.port,
+                                               backlog=4096)
+        # port=0 时使用系统分配的端口
+        self.port = self.server.sockets[0].getsockname()[1]
+        self._sweeper = asyncio.create_task(self._evict_idle())
+        return self
+
+    async def _evict_idle(self):
+        """定期关闭空闲的连接；一个任务处理所有连接，不为每个连接设定时器"""
+        interval = max(0.05, self.idle_timeout / 4)
+        while True:
+            await asyncio.sleep(interval)
+            deadline = time.monotonic() - self.idle_timeout
+            for session in [s for s in self.sessions if s.last_active < deadline]:
+                self.stats['evicted'] += 1
+                session.send('BYE 空闲超时')
+                session.transport.close()
+
+    async def close(self):
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+        if self.server is not None:
+            self.server.close()
+            for session in list(self.sessions):
+                session.transport.close()
+            await self.server.wait_closed()
+
+
+# ---------------------------------------------------------------- 压力测试
+
+class LoadReport:
+    """压力测试结果，latency_ns 为每个请求从发送到收到回复的时间"""
+
+    def __init__(self, sessions, games, failures, latency_ns, seconds):
+        self.sessions = sessions
+        self.games = games
+        self.failures = failures
+        self.latency_ns = latency_ns
+        self.seconds = seconds
+
+    @property
+    def requests(self):
+        return len(self.latency_ns)
+
+    @property
+    def sessions_per_second(self):
+        return self.sessions / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def requests_per_second(self):
+        return self.requests / self.seconds if self.seconds > 0 else 0.0
+
+    def latency_ms(self, pct):
+        return percentile(self.latency_ns, pct) / 1e6
+
+    def summary(self):
+        return (f"{self.sessions} 个会话 {self.games} 局 {self.requests} 个请求 "
+                f"{self.seconds:.2f}s  {self.sessions_per_second:.0f} 会话/秒 "
+                f"{self.requests_per_second:.0f} 请求/秒  延迟 p50 {self.latency_ms(50):.2f}ms "
+                f"p99 {self.latency_ms(99):.2f}ms max {self.latency_ms(100):.2f}ms  "
+                f"失败 {self.failures}")
+
+
+async def _client(host, port, games, latency):
+    """一个本地客户端：连续玩 games 局（二分查找），返回完成的局数"""
+    reader, writer = await asyncio.open_connection(host, port)
+    record = latency.append
+    clock = time.perf_counter_ns
+    try:
+        header = (await reader.readline()).split()
+        played = 0
+        while True:
+            low, high = int(header[1]), int(header[2])
+            while True:
+                guess = binary_guess(low, high)
+                sent = clock()
+                writer.write(b'%d\n' % guess)
+                reply = (await reader.readline()).split()
+                record(clock() - sent)
+                if reply[0] == b'SMALL':
+                    low = guess + 1
+                elif reply[0] == b'BIG':
+                    high = guess - 1
+                else:
+                    break
+            played += 1
+            if played == games:
+                break
+            sent = clock()
+            writer.write(b'NEW\n')
+            header = (await reader.readline()).split()
+            record(clock() - sent)
+        writer.write(b'QUIT\n')
+        await reader.readline()
+        return played
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, clients=1000, games=5, concurrency=None):
+    """用 clients 个客户端（最多同时 concurrency 个连接）各玩 games 局，返回 LoadReport"""
+    concurrency = concurrency or clients
+    latency = array('q')
+    semaphore = asyncio.Semaphore(concurrency)
+    played = []
+    failures = 0
+
+    async def one():
+        nonlocal failures
+        async with semaphore:
+            try:
+                played.append(await _client(host, port, games, latency))
+            except (OSError, IndexError, ValueError, asyncio.IncompleteReadError):
+                failures += 1
+
+    # 计时包含建立和关闭连接
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(clients)))
+    seconds = time.perf_counter() - start
+    return LoadReport(len(played), sum(played), failures, latency, seconds)
+
+
+async def bench(clients=2000, games=5, concurrency=None, max_attempts=10, high=100):
+    """在同一进程中启动服务器和本地客户端"""
+    server = await GuessServer(port=0, high=high, max_attempts=max_attempts,
+                               idle_timeout=30).start()
+    try:
+        report = await run_load(server.host, server.port, clients, games, concurrency)
+    finally:
+        await server.close()
+    return report, server
+
+
+async def serve(args):
+    server = await GuessServer(args.host, args.port, args.low, args.high, args.attempts,
+                               args.idle, args.seed).start()
+    print(f"监听 {server.host}:{server.port}，范围 {args.low}-{args.high}，"
+          f"{args.attempts} 次机会，空闲 {args.idle:.0f}s 断开")
+    last = dict(server.stats)
+    try:
+        while True:
+            await asyncio.sleep(10)
+            stats = dict(server.stats)
+            print(f"在线 {len(server.sessions)}  新连接 {(stats['connections'] - last['connections']) / 10:.1f}/s  "
+                  f"请求 {(stats['requests'] - last['requests']) / 10:.1f}/s  "
+                  f"累计 {stats['games']} 局  超时断开 {stats['evicted']}")
+            last = stats
+    finally:
+        await server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="猜数字网络服务与压力测试")
+    sub = parser.add_subparsers(dest='command', required=True)
+    serve_parser = sub.add_parser('serve', help="启动服务器")
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8765)
+    serve_parser.add_argument('--low', type=int, default=1)
+    serve_parser.add_argument('--high', type=int, default=100)
+    serve_parser.add_argument('--attempts', type=int, default=10)
+    serve_parser.add_argument('--idle', type=float, default=60.0, help="空闲多少秒后断开")
+    serve_parser.add_argument('--seed', type=int, default=None)
+    for name, text in (('bench', "在本进程中启动服务器并压测"), ('load', "压测已运行的服务器")):
+        p = sub.add_parser(name, help=text)
+        p.add_argument('--clients', type=int, default=2000, help="客户端（会话）总数")
+        p.add_argument('--games', type=int, default=5, help="每个会话玩几局")
+        p.add_argument('--concurrency', type=int, default=None, help="同时连接数，默认全部")
+        if name == 'load':
+            p.add_argument('--host', default='127.0.0.1')
+            p.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == 'serve':
+            asyncio.run(serve(args))
+        elif args.command == 'bench':
+            report, server = asyncio.run(bench(args.clients, args.games, args.concurrency))
+            print(report.summary())
+            print(f"服务器：{server.stats['connections']} 个连接 {server.stats['games']} 局 "
+                  f"{server.stats['requests']} 个请求")
+        else:
+            report = asyncio.run(run_load(args.host, args.port, args.clients, args.games,
+                                          args.concurrency))
+            print(report.summary())
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        print(f"错误: {e}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,348 @@
+"""猜数字的最优策略与批量模拟
+
+每次猜测把候选区间分成左右两半，k 次猜测最多能区分 2^k - 1 个数，因此：
+    * 最坏情况下需要 ceil(log2(n + 1)) 次，取中点的二分查找可以达到；
+    * 次数不够时（2^k - 1 < n），任何策略的胜率都不超过 (2^k - 1) / n，
+      二分查找同样可以达到；
+    * 目标均匀分布时，取中点得到的判定树各层都是满的，平均次数也是最少的。
+目标不均匀（例如玩家偏爱某些数）时，optimal_tree 用 Knuth 的动态规划求出
+平均次数最少的判定树。
+
+binary_distribution 直接按区间长度逐层计算二分查找的次数分布，只有 O(log n)
+种不同的区间长度，10^12 的范围也是瞬间完成。simulate 用 NumPy 向量化地同时
+进行大量对局（每轮只保留未结束的对局），simulate_many 再把对局分给进程池：
+
+    python -m legacy_projects.number_solver --high 1e12 --attempts 30 --games 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:  # 没有 NumPy 时逐局模拟
+    np = None
+
+try:
+    from legacy_projects.number_random import CORRECT, TOO_SMALL, GuessGame
+except ImportError:
+    # 作为普通脚本运行时的路径处理
+    from number_random import CORRECT, TOO_SMALL, GuessGame
+
+# optimal_tree 是 O(n^2) 的动态规划，只用于较小的范围
+MAX_TREE_SIZE = 2000
+
+
+# ---------------------------------------------------------------- 策略
+
+def binary_guess(low, high, rng=None):
+    """取中点；low / high 可以是整数，也可以是 NumPy 数组"""
+    return (low + high) // 2
+
+
+def random_guess(low, high, rng=None):
+    """在剩余区间里随便猜（模拟不用技巧的玩家）"""
+    if np is not None and isinstance(low, np.ndarray):
+        return rng.integers(low, high + 1)
+    return (rng or random).randint(low, high)
+
+
+def third_guess(low, high, rng=None):
+    """总是猜区间的三分之一处（偏向小数的玩家）"""
+    return low + (high - low) // 3
+
+
+STRATEGIES = {'binary': binary_guess, 'random': random_guess, 'third': third_guess}
+
+
+def play(game, strategy=binary_guess, rng=None):
+    """用 strategy(low, high, rng) 驱动一局 GuessGame，猜中时返回次数，否则返回 None"""
+    low, high = game.low, game.high
+    while not game.finished:
+        guess = strategy(low, high, rng)
+        result = game.guess(guess)
+        if result == CORRECT:
+            return game.attempts
+        if result == TOO_SMALL:
+            low = guess + 1
+        else:
+            high = guess - 1
+    return None
+
+
+# ---------------------------------------------------------------- 解析结果
+
+def worst_case_attempts(n):
+    """n 个候选数时，最优策略在最坏情况下需要的次数"""
+    return n.bit_length()
+
+
+def max_range(attempts):
+    """attempts 次内一定能猜中的最大范围大小"""
+    return (1 << attempts) - 1
+
+
+def win_probability(n, attempts):
+    """目标均匀分布时，任何策略在 attempts 次内猜中的最大概率"""
+    return min(n, max_range(attempts)) / n
+
+
+def binary_distribution(n, max_attempts=None):
+    """二分查找的精确次数分布：返回列表，第 i 项为第 i + 1 次猜中的目标个数
+
+    长度为 s 的区间取中点后分成 (s - 1) // 2 和 s // 2 两段，与区间位置无关，
+    所以每层只需要记录各种长度各有几段。次数用完时没猜中的个数为
+    n - sum(结果)。
+    """
+    if max_attempts is None:
+        max_attempts = worst_case_attempts(n)
+    counts = []
+    level = {n: 1} if n > 0 else {}
+    while level and len(counts) < max_attempts:
+        counts.append(sum(level.values()))
+        children = {}
+        for size, k in level.items():
+            for child in ((size - 1) // 2, size // 2):
+                if child:
+                    children[child] = children.get(child, 0) + k
+        level = children
+    return counts
+
+
+def optimal_tree(weights):
+    """目标按 weights 分布时平均次数最少的判定树（Knuth 的 O(n^2) 动态规划）
+
+    返回 (平均次数, roots)，roots[i][j] 为区间 [i, j]（下标从 0 开始）
+    应该猜的下标。
+    """
+    n = len(weights)
+    if n == 0:
+        return 0.0, []
+    if n > MAX_TREE_SIZE:
+        raise ValueError(f"范围过大（{n} > {MAX_TREE_SIZE}）")
+    total = float(sum(weights))
+    prefix = [0.0]
+    for w in weights:
+        prefix.append(prefix[-1] + w / total)
+    # cost[i][j] 为区间 [i, j) 的加权深度和（包含本层），cost[i][i] = 0
+    cost = [[0.0] * (n + 1) for _ in range(n + 1)]
+    roots = [[0] * n for _ in range(n)]
+    for i in range(n):
+        cost[i][i + 1] = prefix[i + 1] - prefix[i]
+        roots[i][i] = i
+    for length in range(2, n + 1):
+        for i in range(n - length + 1):
+            j = i + length
+            # Knuth：最优根的位置随区间单调，只需在两个子区间的最优根之间找
+            best, best_root = None, i
+            for r in range(roots[i][j - 2], roots[i + 1][j - 1] + 1):
+                c = cost[i][r] + cost[r + 1][j]
+                if best is None or c < best:
+                    best, best_root = c, r
+            cost[i][j] = best + prefix[j] - prefix[i]
+            roots[i][j - 1] = best_root
+    return cost[0][n], roots
+
+
+class TreeStrategy:
+    """按 optimal_tree 的结果猜测，可以直接传给 play"""
+
+    def __init__(self, low, weights):
+        self.low = low
+        self.expected, self.roots = optimal_tree(weights)
+
+    def __call__(self, low, high, rng=None):
+        return self.low + self.roots[low - self.low][high - self.low]
+
+
+# ---------------------------------------------------------------- 批量模拟
+
+class Distribution:
+    """次数分布：counts[a] 为第 a 次猜中的局数，counts[0] 为没有猜中的局数"""
+
+    def __init__(self, max_attempts, counts=None, seconds=0.0):
+        self.max_attempts = max_attempts
+        self.counts = list(counts) if counts is not None else [0] * (max_attempts + 1)
+        self.seconds = seconds
+
+    @classmethod
+    def exact(cls, n, max_attempts):
+        """二分查找的精确分布（把每个目标数当作一局）"""
+        hits = binary_distribution(n, max_attempts)
+        hits += [0] * (max_attempts - len(hits))
+        return cls(max_attempts, [n - sum(hits)] + hits)
+
+    def __add__(self, other):
+        return Distribution(self.max_attempts,
+                            [a + b for a, b in zip(self.counts, other.counts)],
+                            self.seconds + other.seconds)
+
+    @property
+    def games(self):
+        return sum(self.counts)
+
+    @property
+    def wins(self):
+        return self.games - self.counts[0]
+
+    @property
+    def win_rate(self):
+        return self.wins / self.games if self.games else 0.0
+
+    @property
+    def mean_attempts(self):
+        """猜中的局平均用了几次"""
+        wins = self.wins
+        return sum(a * c for a, c in enumerate(self.counts)) / wins if wins else 0.0
+
+    def percentile(self, pct):
+        """猜中的局中，pct% 在几次以内猜中"""
+        need = pct / 100 * self.wins
+        seen = 0
+        for attempts in range(1, self.max_attempts + 1):
+            seen += self.counts[attempts]
+            if seen >= need:
+                return attempts
+        return self.max_attempts
+
+    def format(self, width=40):
+        """每个次数一行，附带比例条"""
+        games = self.games or 1
+        peak = max(self.counts) or 1
+        lines = []
+        for attempts in list(range(1, self.max_attempts + 1)) + [0]:
+            count = self.counts[attempts]
+            if not count and attempts:
+                continue
+            label = f"{attempts:>4}" if attempts else "未中"
+            bar = '#' * round(count / peak * width)
+            lines.append(f"{label} {count:>12} {count / games:8.3%} {bar}")
+        return '\n'.join(lines)
+
+
+def _simulate_python(games, low, high, max_attempts, strategy, seed):
+    rng = random.Random(seed)
+    counts = [0] * (max_attempts + 1)
+    for _ in range(games):
+        game = GuessGame(low, high, max_attempts, rng=rng)
+        counts[play(game, strategy, rng) or 0] += 1
+    return counts
+
+
+def simulate(games, low=1, high=100, max_attempts=10, strategy='binary', seed=None,
+             batch=1 << 20):
+    """模拟 games 局，返回 Distribution
+
+    每批同时进行 batch 局：所有对局同一轮猜测，猜中或次数用完的对局从数组中
+    移除，后面各轮只处理剩下的对局。
+    """
+    guess = STRATEGIES[strategy] if isinstance(strategy, str) else strategy
+    start = time.perf_counter()
+    if np is None:
+        counts = _simulate_python(games, low, high, max_attempts, guess, seed)
+        return Distribution(max_attempts, counts, time.perf_counter() - start)
+    rng = np.random.default_rng(seed)
+    counts = np.zeros(max_attempts + 1, dtype=np.int64)
+    for first in range(0, games, batch):
+        size = min(batch, games - first)
+        target = rng.integers(low, high + 1, size, dtype=np.int64)
+        lo = np.full(size, low, dtype=np.int64)
+        hi = np.full(size, high, dtype=np.int64)
+        for attempt in range(1, max_attempts + 1):
+            g = guess(lo, hi, rng)
+            hit = g == target
+            counts[attempt] += np.count_nonzero(hit)
+            keep = ~hit
+            target, g = target[keep], g[keep]
+            lo = np.where(g < target, g + 1, lo[keep])
+            hi = np.where(g > target, g - 1, hi[keep])
+            if target.size == 0:
+                break
+        counts[0] += target.size
+    return Distribution(max_attempts, counts.tolist(), time.perf_counter() - start)
+
+
+def _simulate_chunk(args):
+    """在工作进程中模拟一批对局"""
+    return simulate(*args)
+
+
+def simulate_many(games, low=1, high=100, max_attempts=10, strategy='binary', seed=None,
+                  workers=None, executor=None):
+    """把 games 局分给多个进程模拟，各进程使用由 seed 派生的独立随机数流"""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 and executor is None:
+        return simulate(games, low, high, max_attempts, strategy, seed)
+    parts = workers * 4
+    sizes = [games // parts + (i < games % parts) for i in range(parts)]
+    if np is not None:
+        seeds = np.random.SeedSequence(seed).spawn(parts)
+    else:
+        seeds = [random.Random(seed).getrandbits(64) + i for i in range(parts)]
+    jobs = [(size, low, high, max_attempts, strategy, s)
+            for size, s in zip(sizes, seeds) if size]
+    start = time.perf_counter()
+    if executor is None:
+        with ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(_simulate_chunk, jobs))
+    else:
+        results = list(executor.map(_simulate_chunk, jobs))
+    total = Distribution(max_attempts)
+    for result in results:
+        total = total + result
+    total.seconds = time.perf_counter() - start
+    return total
+
+
+# ---------------------------------------------------------------- 命令行
+
+def _parse_int(text):
+    """'1000' / '1e12' / '10**12' -> int"""
+    if '**' in text:
+        base, exp = text.split('**', 1)
+        return int(base) ** int(exp)
+    try:
+        return int(text)
+    except ValueError:
+        return int(float(text))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="猜数字的最优策略与批量模拟")
+    parser.add_argument('--low', type=_parse_int, default=1)
+    parser.add_argument('--high', type=_parse_int, default=100, help="如 100、1e12")
+    parser.add_argument('--attempts', type=int, default=None,
+                        help="次数上限，默认为最坏情况所需的次数")
+    parser.add_argument('--games', type=_parse_int, default=1_000_000, help="模拟局数，0 表示不模拟")
+    parser.add_argument('--strategy', default='binary', choices=sorted(STRATEGIES))
+    parser.add_argument('--workers', type=int, default=None, help="进程数，默认为 CPU 核数")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    n = args.high - args.low + 1
+    if n < 1:
+        parser.error("范围为空")
+    need = worst_case_attempts(n)
+    attempts = args.attempts or need
+    print(f"范围 {args.low}-{args.high}（{n} 个数），最坏情况需要 {need} 次，"
+          f"{attempts} 次内的最大胜率 {win_probability(n, attempts):.4%}")
+
+    exact = Distribution.exact(n, attempts)
+    print(f"\n二分查找（精确）：胜率 {exact.win_rate:.4%}  平均 {exact.mean_attempts:.3f} 次")
+    print(exact.format())
+
+    if args.games > 0:
+        result = simulate_many(args.games, args.low, args.high, attempts, args.strategy,
+                               args.seed, args.workers)
+        print(f"\n{args.strategy} 模拟 {result.games} 局：胜率 {result.win_rate:.4%}  "
+              f"平均 {result.mean_attempts:.3f} 次  P50 {result.percentile(50)}  "
+              f"P99 {result.percentile(99)}  {result.games / result.seconds:,.0f} 局/秒")
+        print(result.format())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
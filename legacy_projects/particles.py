@@ -0,0 +1,183 @@
+"""粒子特效
+
+ParticlePool 把所有粒子存放在连续的 NumPy 数组中（结构数组：x、y、vx、vy、
+age、lifetime、kind 各占一列），一次调用完成整批粒子的移动、重力和寿命
+剔除。未安装 NumPy 时 create_particle_pool 返回 SlotParticlePool，
+它用带 __slots__ 的 Particle 对象实现同样的接口。
+"""
+import random
+
+try:
+    import numpy as np
+except ImportError:  # NumPy 为可选依赖
+    np = None
+
+
+# 每种特效的参数：数量、水平速度范围、垂直速度范围、寿命（帧）
+BURSTS = {
+    'land': (24, (-0.5, 0.5), (-1.0, -0.3), 8),
+    'death': (120, (-1.2, 1.2), (-1.8, 0.2), 16),
+    'powerup': (60, (-0.8, 0.8), (-1.5, -0.5), 12),
+}
+# 特效种类编号（kind 列）与颜色
+KINDS = tuple(BURSTS)
+COLORS = {'land': '#DEB887', 'death': '#FF4500', 'powerup': '#FFD700'}
+
+GRAVITY = 0.1
+
+
+class Particle:
+    """粒子特效"""
+    __slots__ = ('x', 'y', 'char', 'lifetime', 'age', 'vx', 'vy', 'kind')
+
+    def __init__(self, x, y, char='*', lifetime=5, rng=random, kind=0,
+                 vx_range=(-0.5, 0.5), vy_range=(-1, -0.5)):
+        self.x = x
+        self.y = y
+        self.char = char
+        self.lifetime = lifetime
+        self.age = 0
+        self.kind = kind
+        self.vx = rng.uniform(*vx_range)
+        self.vy = rng.uniform(*vy_range)
+
+    def update(self):
+        self.x += self.vx
+        self.y += self.vy
+        self.vy += GRAVITY  # 重力
+        self.age += 1
+        return self.age < self.lifetime
+
+
+class ParticlePool:
+    """基于 NumPy 连续数组的粒子池，存活粒子始终紧凑地排在前 count 个位置"""
+
+    def __init__(self, capacity=20000, seed=None):
+        self.capacity = capacity
+        self.count = 0
+        self.rng = np.random.default_rng(seed)
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.age = np.zeros(capacity, dtype=np.int32)
+        self.lifetime = np.zeros(capacity, dtype=np.int32)
+        self.kind = np.zeros(capacity, dtype=np.int8)
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+
+    def emit(self, x, y, count, vx_range, vy_range, lifetime, kind=0):
+        """在 (x, y) 处发射 count 个粒子，超出容量的部分丢弃"""
+        start = self.count
+        count = min(count, self.capacity - start)
+        if count <= 0:
+            return 0
+        end = start + count
+        self.x[start:end] = x
+        self.y[start:end] = y
+        self.vx[start:end] = self.rng.uniform(vx_range[0], vx_range[1], count)
+        self.vy[start:end] = self.rng.uniform(vy_range[0], vy_range[1], count)
+        self.age[start:end] = 0
+        self.lifetime[start:end] = lifetime
+        self.kind[start:end] = kind
+        self.count = end
+        return count
+
+    def burst(self, kind, x, y):
+        """按 BURSTS 中的预设发射一组特效粒子"""
+        count, vx_range, vy_range, lifetime = BURSTS[kind]
+        return self.emit(x, y, count, vx_range, vy_range, lifetime, KINDS.index(kind))
+
+    def update(self):
+        """整批更新位置、重力和寿命，并剔除死亡粒子，返回存活数量"""
+        n = self.count
+        if n == 0:
+            return 0
+        x, y, vx, vy, age = self.x[:n], self.y[:n], self.vx[:n], self.vy[:n], self.age[:n]
+        x += vx
+        y += vy
+        vy += GRAVITY
+        age += 1
+        alive = age < self.lifetime[:n]
+        live = int(np.count_nonzero(alive))
+        if live < n:
+            # 把存活粒子压缩到数组前部
+            for column in (self.x, self.y, self.vx, self.vy, self.age, self.lifetime, self.kind):
+                column[:live] = column[:n][alive]
+        self.count = live
+        return live
+
+    def rects(self, scale, size, limit=None, offset_x=0.0):
+        """按 kind 分组返回存活粒子的屏幕矩形 {kind: [(x1, y1, x2, y2), ...]}
+
+        offset_x 为镜头左边缘的世界坐标。
+        """
+        n = self.count if limit is None else min(self.count, limit)
+        if n == 0:
+            return {}
+        half = size / 2.0
+        left = (self.x[:n] - offset_x) * scale - half
+        top = self.y[:n] * scale - half
+        coords = np.stack((left, top, left + size, top + size), axis=1)
+        kinds = self.kind[:n]
+        groups = {}
+        for index, name in enumerate(KINDS):
+            mask = kinds == index
+            if mask.any():
+                groups[name] = [tuple(row) for row in coords[mask].tolist()]
+        return groups
+
+
+class SlotParticlePool:
+    """未安装 NumPy 时的后备实现：用带 __slots__ 的 Particle 对象逐个更新"""
+
+    def __init__(self, capacity=20000, seed=None):
+        self.capacity = capacity
+        self.rng = random.Random(seed)
+        self.particles = []
+
+    def __len__(self):
+        return len(self.particles)
+
+    @property
+    def count(self):
+        return len(self.particles)
+
+    def clear(self):
+        self.particles = []
+
+    def emit(self, x, y, count, vx_range, vy_range, lifetime, kind=0):
+        count = min(count, self.capacity - len(self.particles))
+        rng = self.rng
+        self.particles.extend(Particle(x, y, lifetime=lifetime, rng=rng, kind=kind,
+                                       vx_range=vx_range, vy_range=vy_range)
+                              for _ in range(max(0, count)))
+        return max(0, count)
+
+    def burst(self, kind, x, y):
+        count, vx_range, vy_range, lifetime = BURSTS[kind]
+        return self.emit(x, y, count, vx_range, vy_range, lifetime, KINDS.index(kind))
+
+    def update(self):
+        self.particles = [p for p in self.particles if p.update()]
+        return len(self.particles)
+
+    def rects(self, scale, size, limit=None, offset_x=0.0):
+        half = size / 2.0
+        groups = {}
+        for p in self.particles[:limit]:
+            left = (p.x - offset_x) * scale - half
+            top = p.y * scale - half
+            groups.setdefault(KINDS[p.kind], []).append((left, top, left + size, top + size))
+        return groups
+
+
+def create_particle_pool(capacity=20000, seed=None):
+    """有 NumPy 时使用数组粒子池，否则使用 __slots__ 后备实现"""
+    if np is not None:
+        return ParticlePool(capacity, seed)
+    return SlotParticlePool(capacity, seed)
@@ -0,0 +1,74 @@
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+def percentile(samples, pct):
+    """最近秩法求百分位数，samples 为空时返回 0"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+class FrameTimer:
+    """滚动窗口内的帧耗时统计（单位：秒，显示用毫秒）"""
+
+    def __init__(self, window=120):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self._start = 0.0
+
+    def start(self):
+        self._start = time.perf_counter()
+
+    def stop(self):
+        elapsed = time.perf_counter() - self._start
+        self.add(elapsed)
+        return elapsed
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+        self.count += 1
+
+    def reset(self):
+        self.samples.clear()
+        self.count = 0
+
+    @property
+    def mean_ms(self):
+        if not self.samples:
+            return 0.0
+        return sum(self.samples) / len(self.samples) * 1000
+
+    @property
+    def max_ms(self):
+        return max(self.samples, default=0.0) * 1000
+
+    @property
+    def p99_ms(self):
+        return percentile(self.samples, 99) * 1000
+
+
+class StageProfiler:
+    """按阶段（物理、碰撞、绘制等）分别统计耗时"""
+
+    def __init__(self, stages, window=240):
+        self.timers = {name: FrameTimer(window) for name in stages}
+
+    def add(self, stage, seconds):
+        self.timers[stage].add(seconds)
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timers[name].add(time.perf_counter() - start)
+
+    def summary(self):
+        """各阶段平均/p99 耗时的一行文本"""
+        return '  '.join(f"{name} {timer.mean_ms:.2f}/{timer.p99_ms:.2f}ms"
+                         for name, timer in self.timers.items())
@@ -0,0 +1,120 @@
+"""进度与日志的低开销通道
+
+ProgressChannel：生产者（点击线程）随时 publish(键, 值)，同一个键只保留最新值；
+界面线程按固定刷新频率调用 pump()，只把有变化的键交给回调。点击再多，界面
+每秒也只更新固定次数。
+
+RateMeter：按最近一段时间窗口计算速率（CPS）和剩余时间（ETA）。
+
+RingLog：固定容量的环形日志，只保存原始元组，需要查看时才格式化，
+代替每次点击都 print 到标准输出。
+"""
+import threading
+import time
+from collections import deque
+
+
+class ProgressChannel:
+    """按键保存最新值的进度通道（任意线程 publish，界面线程 pump）"""
+
+    def __init__(self):
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def publish(self, key, value):
+        with self._lock:
+            self._values[key] = value
+
+    def take(self):
+        """取出自上次以来有变化的 {键: 最新值}"""
+        with self._lock:
+            values, self._values = self._values, {}
+        return values
+
+    def pump(self, callback):
+        """把变化的键逐个交给 callback(键, 值)，返回交付的数量"""
+        values = self.take()
+        for key, value in values.items():
+            callback(key, value)
+        return len(values)
+
+    def attach_tk(self, root, callback, interval_ms=100):
+        """用 Tk 的 after 按固定间隔 pump"""
+        def tick():
+            self.pump(callback)
+            root.after(interval_ms, tick)
+
+        root.after(interval_ms, tick)
+
+    def attach_kivy(self, clock, callback, interval=0.2):
+        """用 Kivy 的 Clock 按固定间隔 pump，返回 ClockEvent"""
+        return clock.schedule_interval(lambda dt: self.pump(callback), interval)
+
+
+class RateMeter:
+    """最近 window 秒内的平均速率"""
+
+    def __init__(self, window=2.0):
+        self.window = window
+        self.samples = deque()
+
+    def update(self, done, now=None):
+        """记录当前累计数量，返回速率（每秒）"""
+        now = time.perf_counter() if now is None else now
+        samples = self.samples
+        samples.append((now, done))
+        while len(samples) > 2 and now - samples[1][0] >= self.window:
+            samples.popleft()
+        return self.rate
+
+    @property
+    def rate(self):
+        if len(self.samples) < 2:
+            return 0.0
+        (t0, d0), (t1, d1) = self.samples[0], self.samples[-1]
+        return (d1 - d0) / (t1 - t0) if t1 > t0 else 0.0
+
+    def eta(self, done, total):
+        """按当前速率估计的剩余秒数，无法估计时返回 None"""
+        rate = self.rate
+        if total is None or rate <= 0:
+            return None
+        return max(0.0, (total - done) / rate)
+
+
+def format_eta(seconds):
+    """剩余秒数 -> 'm:ss'，未知时为 '--:--'"""
+    if seconds is None:
+        return '--:--'
+    seconds = int(seconds + 0.5)
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
+
+class RingLog:
+    """固定容量的环形日志，append 只保存元组，不做格式化"""
+
+    def __init__(self, capacity=4096):
+        self.entries = deque(maxlen=capacity)
+        self.total = 0
+
+    def append(self, *fields):
+        self.entries.append((time.perf_counter_ns(), fields))
+        self.total += 1
+
+    def __len__(self):
+        return len(self.entries)
+
+    def lines(self, last=None):
+        """格式化最近 last 条（默认全部）"""
+        entries = list(self.entries)
+        if last is not None:
+            entries = entries[-last:]
+        if not entries:
+            return []
+        base = entries[0][0]
+        return [f"+{(t - base) / 1e6:10.3f}ms " + ' '.join(str(f) for f in fields)
+                for t, fields in entries]
+
+    def dump(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(self.lines()) + '\n')
@@ -0,0 +1,64 @@
+import math
+
+
+class ColumnIndex:
+    """按列分桶的空间索引
+
+    每个实体按其占据的整数列登记到对应的桶中，查询某个 x 坐标下的
+    候选实体只需一次字典查找（O(1)），不再需要遍历整个列表。
+    桶内保持插入顺序，与原来按列表顺序遍历的结果一致。
+    """
+
+    _EMPTY = ()
+
+    def __init__(self):
+        # 列号 -> 该列上的实体列表（只读，调用方已知整数列号时可直接查询）
+        self.columns = {}
+        self._spans = {}
+        # 每次增删实体都会递增，供缓存判断布局是否变化
+        self.version = 0
+
+    def __len__(self):
+        return len(self._spans)
+
+    def add(self, entity, start, end):
+        """登记实体，占据 [start, end) 列"""
+        key = id(entity)
+        if key in self._spans:
+            self.remove(entity)
+        self._spans[key] = (start, end)
+        buckets = self.columns
+        for col in range(start, end):
+            bucket = buckets.get(col)
+            if bucket is None:
+                buckets[col] = [entity]
+            else:
+                bucket.append(entity)
+        self.version += 1
+
+    def remove(self, entity):
+        """移除实体，不存在时忽略"""
+        span = self._spans.pop(id(entity), None)
+        if span is None:
+            return
+        buckets = self.columns
+        for col in range(span[0], span[1]):
+            bucket = buckets.get(col)
+            if bucket is None:
+                continue
+            for i, item in enumerate(bucket):
+                if item is entity:
+                    del bucket[i]
+                    break
+            if not bucket:
+                del buckets[col]
+        self.version += 1
+
+    def clear(self):
+        self.columns.clear()
+        self._spans.clear()
+        self.version += 1
+
+    def at(self, x):
+        """返回覆盖 x 所在列的实体（x 可以是浮点数）"""
+        return self.columns.get(math.floor(x), self._EMPTY)
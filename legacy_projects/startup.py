@@ -0,0 +1,174 @@
+"""启动耗时报告与字节码预编译
+
+启动报告在子进程中以 python -X importtime 导入入口模块（默认 mobile_click），
+汇总导入总耗时、按顶层包分组的耗时和最慢的模块；--cold 时把字节码缓存指向
+一个空的临时目录，模拟第一次启动（需要编译所有源码）。加上 --history 会把
+结果追加到 CSV 文件，便于比较各个版本的冷启动时间。
+
+    python main.py --startup-report [--cold] [--runs 3] [--history startup.csv]
+    python main.py --compile          # 预编译 main.py 与 legacy_projects 的字节码
+"""
+import argparse
+import compileall
+import configparser
+import csv
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import namedtuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MODULE = 'legacy_projects.mobile_click'
+
+# self_us 为模块自身的导入耗时，cumulative_us 含其导入的子模块，depth 为嵌套层数
+ImportTime = namedtuple('ImportTime', 'name self_us cumulative_us depth')
+StartupProfile = namedtuple('StartupProfile', 'module imports wall_ms ok error')
+
+
+def parse_importtime(text):
+    """解析 -X importtime 的输出（标准错误），返回 ImportTime 列表"""
+    imports = []
+    for line in text.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # 表头
+        name = fields[2].rstrip()
+        stripped = name.lstrip()
+        depth = (len(name) - len(stripped) - 1) // 2
+        imports.append(ImportTime(stripped, int(fields[0]), int(fields[1]), depth))
+    return imports
+
+
+def profile_import(module=DEFAULT_MODULE, cold=False):
+    """在新的解释器中导入 module，返回 StartupProfile"""
+    env = dict(os.environ)
+    env['PYTHONPATH'] = ROOT + os.pathsep + env.get('PYTHONPATH', '')
+    with tempfile.TemporaryDirectory() as cache:
+        if cold:
+            # 空的字节码缓存目录：所有模块（含标准库）都要重新编译
+            env['PYTHONPYCACHEPREFIX'] = cache
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                                cwd=ROOT, env=env, capture_output=True, text=True)
+        wall_ms = (time.perf_counter() - start) * 1000
+    imports = parse_importtime(result.stderr)
+    error = None
+    if result.returncode != 0:
+        lines = [l for l in result.stderr.splitlines() if not l.startswith('import time:')]
+        error = lines[-1] if lines else f"退出码 {result.returncode}"
+    return StartupProfile(module, imports, wall_ms, result.returncode == 0, error)
+
+
+def module_ms(profile):
+    """入口模块的累计导入耗时（毫秒），导入失败时为已导入部分的总和"""
+    for item in profile.imports:
+        if item.name == profile.module:
+            return item.cumulative_us / 1000
+    return sum(item.cumulative_us for item in profile.imports if item.depth == 0) / 1000
+
+
+def group_by_package(imports):
+    """按顶层包汇总模块自身耗时，返回 [(包名, 微秒)]，从大到小"""
+    totals = {}
+    for item in imports:
+        package = item.name.split('.', 1)[0]
+        totals[package] = totals.get(package, 0) + item.self_us
+    return sorted(totals.items(), key=lambda kv: kv[1], reverse=True)
+
+
+def app_version(spec=None):
+    """读取 buildozer.spec 中的版本号"""
+    parser = configparser.ConfigParser(interpolation=None)
+    try:
+        parser.read(spec or os.path.join(ROOT, 'buildozer.spec'), encoding='utf-8')
+        return parser.get('app', 'version')
+    except (configparser.Error, UnicodeDecodeError):
+        return '?'
+
+
+def append_history(path, profile, cold):
+    """追加一行记录，返回文件中已有的历史记录（不含本次）"""
+    rows = []
+    new = not os.path.exists(path)
+    if not new:
+        with open(path, newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+    fields = ['date', 'version', 'python', 'module', 'cold', 'import_ms', 'wall_ms']
+    with open(path, 'a', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fields)
+        if new:
+            writer.writeheader()
+        writer.writerow({
+            'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'version': app_version(),
+            'python': '.'.join(map(str, sys.version_info[:3])),
+            'module': profile.module,
+            'cold': int(cold),
+            'import_ms': f"{module_ms(profile):.1f}",
+            'wall_ms': f"{profile.wall_ms:.1f}",
+        })
+    return rows
+
+
+def print_report(profile, runs, cold, top=15):
+    kind = '冷启动' if cold else '热启动'
+    print(f"{profile.module}  {kind}，{runs} 次取最快")
+    if not profile.ok:
+        print(f"导入失败: {profile.error}")
+    print(f"导入耗时 {module_ms(profile):8.1f} ms   解释器总耗时 {profile.wall_ms:8.1f} ms")
+    print("\n按顶层包（模块自身耗时）:")
+    for package, us in group_by_package(profile.imports)[:top]:
+        print(f"  {us / 1000:8.1f} ms  {package}")
+    print("\n最慢的模块（自身 / 累计）:")
+    slowest = sorted(profile.imports, key=lambda item: item.self_us, reverse=True)[:top]
+    for item in slowest:
+        print(f"  {item.self_us / 1000:8.1f} / {item.cumulative_us / 1000:8.1f} ms  {item.name}")
+
+
+def compile_sources(optimize=-1):
+    """预编译 main.py 与 legacy_projects 的字节码，返回是否全部成功"""
+    ok = compileall.compile_file(os.path.join(ROOT, 'main.py'), quiet=1, optimize=optimize)
+    ok &= compileall.compile_dir(os.path.join(ROOT, 'legacy_projects'), quiet=1,
+                                 optimize=optimize)
+    return bool(ok)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="启动耗时报告与字节码预编译")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument('--startup-report', action='store_true', help="测量入口模块的导入耗时")
+    mode.add_argument('--compile', action='store_true', help="预编译字节码")
+    parser.add_argument('--module', default=DEFAULT_MODULE, help="要测量的模块")
+    parser.add_argument('--runs', type=int, default=3, help="测量次数，取最快的一次")
+    parser.add_argument('--cold', action='store_true', help="使用空的字节码缓存")
+    parser.add_argument('--top', type=int, default=15, help="列出的条目数")
+    parser.add_argument('--history', help="把结果追加到这个 CSV 文件")
+    args = parser.parse_args(argv)
+
+    if args.compile:
+        start = time.perf_counter()
+        ok = compile_sources()
+        print(f"预编译{'完成' if ok else '有错误'}，用时 {(time.perf_counter() - start) * 1000:.0f} ms")
+        return 0 if ok else 1
+
+    profiles = [profile_import(args.module, args.cold) for _ in range(max(1, args.runs))]
+    best = min(profiles, key=module_ms)
+    print_report(best, len(profiles), args.cold, args.top)
+    if args.history:
+        previous = append_history(args.history, best, args.cold)
+        same = [row for row in previous
+                if row['module'] == best.module and row['cold'] == str(int(args.cold))]
+        if same:
+            print("\n历史记录:")
+            for row in same[-5:]:
+                print(f"  {row['date']}  v{row['version']:<8} 导入 {row['import_ms']:>8} ms  "
+                      f"总计 {row['wall_ms']:>8} ms")
+    return 0 if best.ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,539 @@
+"""截图模板匹配，用于自动定位点击目标
+
+TemplateLocator 在截图中查找模板图片的位置：
+    * 先在逐级缩小一半的图像金字塔顶层做完整搜索，再逐级在小范围内细化；
+    * 匹配分数为零均值归一化互相关（ZNCC），分子用 NumPy FFT 计算，
+      分母用积分图计算，全部向量化；
+    * 记住上一次的匹配区域，下一帧先在其附近搜索，分数够高就不再全图搜索；
+    * 帧内容的 CRC 与上一帧相同时直接返回上一次的结果。
+
+截图来源：Android 的 screencap（原始 RGBA 输出，免去 PNG 编解码），桌面的
+pyautogui.screenshot，以及用于测试的 PNG 文件（自带一个只依赖 zlib 的 PNG
+读写器）。
+
+    python -m legacy_projects.vision locate 模板.png 截图.png [...]
+    python -m legacy_projects.vision bench
+"""
+import struct
+import subprocess
+import sys
+import threading
+import time
+import zlib
+from collections import namedtuple
+
+try:
+    import numpy as np
+    from numpy.lib.stride_tricks import as_strided
+except ImportError:  # 模板匹配需要 NumPy
+    np = None
+
+try:
+    import pyautogui
+except ImportError:  # 只在桌面截图时需要
+    pyautogui = None
+
+
+class VisionError(Exception):
+    """图片无法解析或缺少依赖"""
+
+
+class Match(namedtuple('Match', 'x y width height score')):
+    """匹配结果，(x, y) 为模板左上角在截图中的位置"""
+
+    __slots__ = ()
+
+    @property
+    def center(self):
+        return self.x + self.width // 2, self.y + self.height // 2
+
+
+def _require_numpy():
+    if np is None:
+        raise VisionError("模板匹配需要安装 NumPy")
+
+
+# ---------------------------------------------------------------- PNG 读写
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+_PNG_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+
+# 还原 Average / Paeth 过滤时每批处理的行数，决定斜排缓冲区的大小
+UNFILTER_BAND = 512
+
+
+def _unfilter_wavefront(rows, height, width, bpp):
+    """按反对角线整批还原含 Average / Paeth 过滤的行
+
+    这两种过滤让每个像素依赖左、上、左上三个已还原的像素，同一行内只能按
+    顺序计算；但 x + y 相同的像素（同一条反对角线）互不依赖。把每批
+    UNFILTER_BAND 行斜排成 skew[x + y + 2, y + 1]（第 0 行放上一批的最后一行），
+    每条对角线和它的三个邻居就都是连续的一段，共循环 width + 行数 - 1 次。
+    五种过滤都只用到这三个邻居，各行的过滤类型不同也可以一起算。
+    """
+    out = np.empty((height, width, bpp), dtype=np.uint8)
+    prev = np.zeros((width, bpp), dtype=np.int16)
+    zero = np.zeros(bpp, dtype=np.int16)
+    for top in range(0, height, UNFILTER_BAND):
+        band = rows[top:top + UNFILTER_BAND]
+        count = len(band)
+        raw = np.zeros((width + count + 1, count + 1, bpp), dtype=np.int16)
+        skew = np.zeros_like(raw)
+        # skew[x + y + 2, y + 1] 按 [y, x] 排列的视图，比花式索引快得多
+        s0, s1, s2 = raw.strides
+        shape, strides = (count, width, bpp), (s0 + s1, s0, s2)
+        as_strided(raw[2:, 1:], shape, strides)[:] = band[:, 1:].reshape(shape)
+        skew[1:width + 1, 0] = prev
+        kinds = band[:, 0].astype(np.intp)
+        present = set(kinds.tolist())
+        for d in range(width + count - 1):
+            y0 = max(0, d - width + 1)
+            y1 = min(count - 1, d) + 1
+            a = skew[d + 1, y0 + 1:y1 + 1]
+            b = skew[d + 1, y0:y1]
+            c = skew[d, y0:y1]
+            choices = [zero, a, b, zero, zero]
+            if 3 in present:
+                choices[3] = (a + b) >> 1
+            if 4 in present:
+                pa = np.abs(b - c)
+                pb = np.abs(a - c)
+                pc = np.abs(a + b - 2 * c)
+                choices[4] = np.where((pa <= pb) & (pa <= pc), a, np.where(pb <= pc, b, c))
+            if len(present) == 1:
+                predictor = choices[kinds[0]]
+            else:
+                predictor = np.choose(kinds[y0:y1, None], choices)
+            skew[d + 2, y0 + 1:y1 + 1] = (raw[d + 2, y0 + 1:y1 + 1] + predictor) & 0xFF
+        block = as_strided(skew[2:, 1:], shape, strides)
+        out[top:top + count] = block
+        prev = block[-1].copy()
+    return out.reshape(height, -1)
+
+
+def decode_png(data):
+    """解码 8 位非隔行 PNG，返回 (高, 宽, 通道) 的 uint8 数组（调色板图展开为 RGB）"""
+    _require_numpy()
+    if not data.startswith(PNG_SIGNATURE):
+        raise VisionError("不是 PNG 文件")
+    pos = len(PNG_SIGNATURE)
+    header = None
+    palette = None
+    idat = []
+    while pos + 8 <= len(data):
+        length, kind = struct.unpack_from('>I4s', data, pos)
+        chunk = data[pos + 8:pos + 8 + length]
+        pos += 12 + length
+        if kind == b'IHDR':
+            header = struct.unpack('>IIBBBBB', chunk)
+        elif kind == b'PLTE':
+            palette = np.frombuffer(chunk, dtype=np.uint8).reshape(-1, 3)
+        elif kind == b'IDAT':
+            idat.append(chunk)
+        elif kind == b'IEND':
+            break
+    if header is None:
+        raise VisionError("PNG 缺少 IHDR")
+    width, height, depth, color, _, _, interlace = header
+    if depth != 8 or interlace or color not in _PNG_CHANNELS:
+        raise VisionError(f"不支持的 PNG 格式（位深 {depth}，颜色类型 {color}，隔行 {interlace}）")
+    bpp = _PNG_CHANNELS[color]
+    stride = width * bpp
+    raw = np.frombuffer(zlib.decompress(b''.join(idat)), dtype=np.uint8)
+    rows = raw[:height * (stride + 1)].reshape(height, stride + 1)
+    max_kind = int(rows[:, 0].max(initial=0))
+    if max_kind > 4:
+        raise VisionError(f"未知的 PNG 行过滤类型: {max_kind}")
+    if max_kind >= 3:
+        out = _unfilter_wavefront(rows, height, width, bpp)
+    else:
+        out = np.empty((height, stride), dtype=np.uint8)
+        prev = np.zeros(stride, dtype=np.uint8)
+        for y in range(height):
+            kind = rows[y, 0]
+            line = rows[y, 1:]
+            if kind == 0:
+                out[y] = line
+            elif kind == 1:
+                # Sub：每个通道沿行方向的累加和（uint8 自然按 256 取模）
+                out[y] = np.cumsum(line.reshape(width, bpp), axis=0, dtype=np.uint8).ravel()
+            else:
+                out[y] = line + prev
+            prev = out[y]
+    image = out.reshape(height, width, bpp)
+    if color == 3:
+        if palette is None:
+            raise VisionError("调色板 PNG 缺少 PLTE")
+        image = palette[image[:, :, 0]]
+    return image
+
+
+def encode_png(image):
+    """把 (高, 宽[, 通道]) 的 uint8 数组编码为 PNG（不做行过滤）"""
+    _require_numpy()
+    image = np.ascontiguousarray(image, dtype=np.uint8)
+    if image.ndim == 2:
+        image = image[:, :, None]
+    height, width, channels = image.shape
+    color = {1: 0, 2: 4, 3: 2, 4: 6}[channels]
+    rows = np.zeros((height, width * channels + 1), dtype=np.uint8)
+    rows[:, 1:] = image.reshape(height, -1)
+
+    def chunk(kind, body):
+        return (struct.pack('>I', len(body)) + kind + body
+                + struct.pack('>I', zlib.crc32(kind + body) & 0xFFFFFFFF))
+
+    return (PNG_SIGNATURE
+            + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, color, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(rows.tobytes(), 6))
+            + chunk(b'IEND', b''))
+
+
+def load_png(path):
+    with open(path, 'rb') as f:
+        return decode_png(f.read())
+
+
+def save_png(path, image):
+    with open(path, 'wb') as f:
+        f.write(encode_png(image))
+
+
+def decode_screencap(data):
+    """解析 `screencap`（不带 -p）的原始输出，返回 (高, 宽, 4) 的 RGBA 视图
+
+    头部为 宽、高、像素格式 三个 uint32，较新的系统还多一个色彩空间字段。
+    """
+    _require_numpy()
+    if len(data) < 12:
+        raise VisionError("screencap 输出过短")
+    width, height, fmt = struct.unpack_from('<III', data)
+    pixels = width * height * 4
+    header = len(data) - pixels
+    if header not in (12, 16) or fmt != 1:
+        raise VisionError(f"无法解析 screencap 输出（{width}x{height}，格式 {fmt}）")
+    return np.frombuffer(data, dtype=np.uint8, offset=header).reshape(height, width, 4)
+
+
+# ---------------------------------------------------------------- 匹配
+
+def to_gray(image):
+    """RGB(A) / 灰度 uint8 图 -> float32 灰度图"""
+    _require_numpy()
+    if image.ndim == 2:
+        return image.astype(np.float32)
+    if image.shape[2] < 3:
+        return image[:, :, 0].astype(np.float32)
+    rgb = image[:, :, :3].astype(np.float32)
+    return rgb @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+
+def downscale(image):
+    """长宽各缩小一半（2x2 取平均）"""
+    h, w = image.shape[0] // 2 * 2, image.shape[1] // 2 * 2
+    return image[:h, :w].reshape(h // 2, 2, w // 2, 2).mean(axis=(1, 3), dtype=np.float32)
+
+
+def _window_sums(image, h, w):
+    """每个 h x w 窗口内像素之和（积分图）"""
+    ii = np.zeros((image.shape[0] + 1, image.shape[1] + 1))
+    np.cumsum(np.cumsum(image, axis=0, dtype=np.float64), axis=1, out=ii[1:, 1:])
+    return ii[h:, w:] - ii[:-h, w:] - ii[h:, :-w] + ii[:-h, :-w]
+
+
+def match_template(image, template):
+    """返回每个位置的 ZNCC 分数图，形状为 (H - h + 1, W - w + 1)，取值 [-1, 1]"""
+    H, W = image.shape
+    h, w = template.shape
+    if h > H or w > W:
+        return np.zeros((0, 0))
+    t = template - template.mean()
+    t_norm = np.sqrt((t * t).sum())
+    # 与翻转后的模板做卷积即为互相关；模板完全落在图内的位置不受循环卷积影响
+    spectrum = np.fft.rfft2(image, (H, W)) * np.fft.rfft2(t[::-1, ::-1], (H, W))
+    numerator = np.fft.irfft2(spectrum, (H, W))[h - 1:, w - 1:]
+    n = h * w
+    sums = _window_sums(image, h, w)
+    variance = _window_sums(image * image, h, w) - sums * sums / n
+    denominator = np.sqrt(np.maximum(variance, 0)) * t_norm
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scores = np.where(denominator > 1e-6 * n, numerator / denominator, 0.0)
+    return scores
+
+
+def _best(scores):
+    y, x = np.unravel_index(int(np.argmax(scores)), scores.shape)
+    return int(y), int(x), float(scores[y, x])
+
+
+class TemplateLocator:
+    """在截图中定位模板，带附近搜索和帧缓存
+
+    min_score 以下的结果视为没有找到；min_size 限制金字塔顶层模板的最小边长；
+    顶层缩小后细节会丢失，因此保留 candidates 个候选分别向下细化。
+    """
+
+    def __init__(self, template, min_score=0.8, min_size=16, max_levels=4, margin=None,
+                 candidates=5):
+        _require_numpy()
+        gray = to_gray(template)
+        self.templates = [gray]
+        while (len(self.templates) <= max_levels
+               and min(self.templates[-1].shape) // 2 >= min_size):
+            self.templates.append(downscale(self.templates[-1]))
+        self.height, self.width = gray.shape
+        self.min_score = min_score
+        self.candidates = candidates
+        # 附近搜索时在上次位置四周扩展的像素数
+        self.margin = margin if margin is not None else max(self.height, self.width) // 2
+        self.last = None
+        self.last_key = None
+        self.stats = {'cached': 0, 'near': 0, 'full': 0}
+
+    def _search_region(self, image, template, top, left, bottom, right):
+        """在 image[top:bottom, left:right] 中匹配，返回 (y, x, score)"""
+        top, left = max(0, top), max(0, left)
+        bottom, right = min(image.shape[0], bottom), min(image.shape[1], right)
+        scores = match_template(image[top:bottom, left:right], template)
+        if scores.size == 0:
+            return None
+        y, x, score = _best(scores)
+        return top + y, left + x, score
+
+    def search(self, gray):
+        """金字塔全图搜索：顶层完整匹配取前几个候选，逐级向下在 ±2 像素内细化"""
+        pyramid = [gray]
+        for _ in range(len(self.templates) - 1):
+            pyramid.append(downscale(pyramid[-1]))
+        level = len(self.templates) - 1
+        while level > 0 and (pyramid[level].shape[0] < self.templates[level].shape[0]
+                             or pyramid[level].shape[1] < self.templates[level].shape[1]):
+            level -= 1
+        scores = match_template(pyramid[level], self.templates[level])
+        if scores.size == 0:
+            return None
+        best = None
+        for y, x, score in self._candidates(scores, self.templates[level].shape):
+            for lower in range(level - 1, -1, -1):
+                template = self.templates[lower]
+                th, tw = template.shape
+                y, x = y * 2, x * 2
+                found = self._search_region(pyramid[lower], template, y - 2, x - 2,
+                                            y + th + 3, x + tw + 3)
+                if found is None:
+                    break
+                y, x, score = found
+            if best is None or score > best[2]:
+                best = (y, x, score)
+            if score >= self.min_score:
+                break
+        if best is None:
+            # 纯色画面（如黑屏）的 ZNCC 全为 0，没有任何候选
+            return None
+        y, x, score = best
+        return Match(x, y, self.width, self.height, score)
+
+    def _candidates(self, scores, shape):
+        """按分数从高到低取出最多 candidates 个互不重叠的峰值"""
+        scores = scores.copy()
+        h, w = shape
+        for _ in range(self.candidates):
+            y, x, score = _best(scores)
+            if score <= 0:
+                return
+            yield y, x, score
+            scores[max(0, y - h // 2):y + h // 2 + 1, max(0, x - w // 2):x + w // 2 + 1] = -1
+
+    def search_near(self, frame, match):
+        """只在上一次匹配位置附近搜索（原始分辨率，只转换这一块的灰度）"""
+        m = self.margin
+        top, left = max(0, match.y - m), max(0, match.x - m)
+        region = to_gray(frame[top:match.y + self.height + m, left:match.x + self.width + m])
+        found = self._search_region(region, self.templates[0], 0, 0, *region.shape)
+        if found is None:
+            return None
+        y, x, score = found
+        return Match(left + x, top + y, self.width, self.height, score)
+
+    def locate(self, frame):
+        """返回 Match，找不到（分数低于 min_score）时返回 None"""
+        frame = np.ascontiguousarray(frame)
+        key = (frame.shape, zlib.crc32(frame.data))
+        if key == self.last_key:
+            self.stats['cached'] += 1
+            return self.last
+        result = None
+        if self.last is not None:
+            near = self.search_near(frame, self.last)
+            if near is not None and near.score >= self.min_score:
+                self.stats['near'] += 1
+                result = near
+        if result is None:
+            self.stats['full'] += 1
+            found = self.search(to_gray(frame))
+            result = found if found is not None and found.score >= self.min_score else None
+        self.last_key = key
+        # 没找到时保留旧位置，下一帧仍先在附近搜索
+        if result is not None:
+            self.last = result
+        return result
+
+
+# ---------------------------------------------------------------- 截图来源
+
+class AndroidScreen:
+    """调用 screencap 获取原始 RGBA 截图"""
+
+    def __init__(self, su=False):
+        self.args = ['su', '-c', 'screencap'] if su else ['screencap']
+
+    def grab(self):
+        try:
+            result = subprocess.run(self.args, capture_output=True, check=True)
+        except (OSError, subprocess.CalledProcessError) as e:
+            raise VisionError(f"截图失败: {e}") from e
+        return decode_screencap(result.stdout)
+
+
+class DesktopScreen:
+    """用 pyautogui 截取桌面"""
+
+    def grab(self):
+        if pyautogui is None:
+            raise VisionError("桌面截图需要安装 pyautogui")
+        _require_numpy()
+        return np.asarray(pyautogui.screenshot())
+
+
+class FileScreen:
+    """依次返回 PNG 文件中的图像（循环），用于测试"""
+
+    def __init__(self, paths):
+        self.frames = [load_png(path) for path in paths]
+        self.index = 0
+
+    def grab(self):
+        frame = self.frames[self.index % len(self.frames)]
+        self.index += 1
+        return frame
+
+
+class TargetTracker:
+    """后台线程按 interval 秒截图并定位目标，position 为最新的目标中心
+
+    最近一次截图中找不到目标时 position 为 None，调用方应回退到固定坐标，
+    而不是一直点击目标消失前的位置。
+
+    active 为可选的回调，返回 False 时暂停截图（例如没有任务在运行时）。
+    """
+
+    def __init__(self, locator, screen, interval=0.2, active=None):
+        self.locator = locator
+        self.screen = screen
+        self.interval = interval
+        self.active = active
+        self.position = None
+        self.error = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def refresh(self):
+        """截图一次并更新 position，返回 Match 或 None（此时 position 也清空）"""
+        match = self.locator.locate(self.screen.grab())
+        self.position = match.center if match is not None else None
+        return match
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='target-tracker',
+                                            daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self.active is None or self.active():
+                try:
+                    self.refresh()
+                    self.error = None
+                except Exception as e:
+                    # 任何异常都只记录下来，不能让跟踪线程退出
+                    self.error = str(e) if isinstance(e, VisionError) else repr(e)
+            self._stop.wait(self.interval)
+
+    def stop(self):
+        self._stop.set()
+
+
+# ---------------------------------------------------------------- 命令行
+
+def _synthetic_frames(count, width=1080, height=2400, size=120, seed=0):
+    """生成带纹理的背景和一个沿路径移动的目标，返回 (模板, [(帧, 真实位置)])"""
+    rng = np.random.default_rng(seed)
+    noise = rng.integers(0, 256, (height // 8, width // 8, 3), dtype=np.uint8)
+    background = np.repeat(np.repeat(noise, 8, axis=0), 8, axis=1)
+    template = rng.integers(0, 256, (size, size, 3), dtype=np.uint8)
+    frames = []
+    for i in range(count):
+        x = 100 + (i * 37) % (width - size - 200)
+        y = 300 + (i * 53) % (height - size - 600)
+        frame = background.copy()
+        frame[y:y + size, x:x + size] = template
+        frames.append((frame, (x, y)))
+    return template, frames
+
+
+def bench(frames=30):
+    _require_numpy()
+    template, data = _synthetic_frames(frames)
+    locator = TemplateLocator(template)
+    times = {'full': [], 'near': [], 'cached': []}
+    errors = 0
+    for i, (frame, (x, y)) in enumerate(data):
+        for repeat in range(2):
+            before = dict(locator.stats)
+            start = time.perf_counter()
+            match = locator.locate(frame)
+            elapsed = time.perf_counter() - start
+            kind = next(k for k in locator.stats if locator.stats[k] != before[k])
+            times[kind].append(elapsed)
+            if match is None or (match.x, match.y) != (x, y):
+                errors += 1
+    print(f"1080x2400 帧，模板 {template.shape[1]}x{template.shape[0]}，金字塔 "
+          f"{len(locator.templates)} 层")
+    for kind, samples in times.items():
+        if samples:
+            print(f"{kind:<7} {len(samples):>4} 次  平均 {sum(samples) / len(samples) * 1000:7.2f} ms"
+                  f"  最慢 {max(samples) * 1000:7.2f} ms")
+    print(f"定位错误 {errors}")
+
+
+def main(argv=None):
+    args = sys.argv[1:] if argv is None else argv
+    if args[:1] == ['bench']:
+        bench()
+        return 0
+    if len(args) < 3 or args[0] != 'locate':
+        print(__doc__)
+        return 2
+    try:
+        locator = TemplateLocator(load_png(args[1]))
+        for path in args[2:]:
+            frame = load_png(path)
+            start = time.perf_counter()
+            match = locator.locate(frame)
+            elapsed = (time.perf_counter() - start) * 1000
+            if match is None:
+                print(f"{path}: 未找到 ({elapsed:.1f} ms)")
+            else:
+                print(f"{path}: 中心 {match.center}  分数 {match.score:.3f} ({elapsed:.1f} ms)")
+    except (OSError, VisionError) as e:
+        print(f"错误: {e}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
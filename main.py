@@ -4,11 +4,22 @@ import os
 # 将当前目录添加到系统路径，确保能找到 legacy_projects 包
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-try:
-    from legacy_projects.mobile_click import AutoClickerApp
-except ImportError:
-    # 如果直接导入失败，尝试作为普通脚本运行时的路径处理
-    from mobile_click import AutoClickerApp
+# 启动器只依赖标准库里已经加载的模块；Kivy 界面在 run_app 中才导入，
+# 命令行工具（启动耗时报告、预编译）不会加载 Kivy。
 
-if __name__ == '__main__':
+
+def run_app():
+    try:
+        from legacy_projects.mobile_click import AutoClickerApp
+    except ImportError:
+        # 如果直接导入失败，尝试作为普通脚本运行时的路径处理
+        from mobile_click import AutoClickerApp
     AutoClickerApp().run()
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] in (['--startup-report'], ['--compile']):
+        # python main.py --startup-report [选项]  /  python main.py --compile
+        from legacy_projects.startup import main
+        sys.exit(main(sys.argv[1:]))
+    run_app()
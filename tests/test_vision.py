@@ -0,0 +1,68 @@
+"""vision 模板匹配的回归测试，使用 fixtures/vision 下的 PNG 截图和模板
+
+截图是跳一跳游戏（jump_video.FrameRenderer 渲染，蓄力中带轨迹和蓄力条）的
+画面，模板是其中的玩家。PNG 按 libpng 的方式逐行自适应选择过滤类型保存，
+读取时会经过 Sub / Up / Paeth 的还原。
+
+    python -m pytest tests
+"""
+import os
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from legacy_projects.vision import (  # noqa: E402
+    FileScreen, TargetTracker, TemplateLocator, decode_png, encode_png, load_png)
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures', 'vision')
+
+# 截图 -> 玩家中心（像素）
+EXPECTED = {
+    'jump_screen_1.png': (165, 285),
+    'jump_screen_2.png': (315, 195),
+}
+# 同一局中玩家不在画面上的一帧（仍有平台、障碍物、轨迹和落点标记）
+NO_PLAYER = 'jump_no_player.png'
+
+
+def fixture(name):
+    return os.path.join(FIXTURES, name)
+
+
+@pytest.fixture
+def locator():
+    return TemplateLocator(load_png(fixture('jump_player.png')))
+
+
+@pytest.mark.parametrize('name, center', sorted(EXPECTED.items()))
+def test_locate_fixture(locator, name, center):
+    match = locator.locate(FileScreen([fixture(name)]).grab())
+    assert match is not None
+    assert match.center == center
+    assert match.score >= locator.min_score
+
+
+def test_no_match(locator):
+    assert locator.locate(FileScreen([fixture(NO_PLAYER)]).grab()) is None
+
+
+def test_uniform_frame(locator):
+    # 黑屏：ZNCC 全为 0，没有候选
+    assert locator.locate(np.zeros((360, 1200, 3), dtype=np.uint8)) is None
+
+
+def test_tracker_falls_back_when_target_disappears(locator):
+    names = sorted(EXPECTED) + [NO_PLAYER]
+    tracker = TargetTracker(locator, FileScreen([fixture(name) for name in names]))
+    positions = []
+    for _ in names:
+        tracker.refresh()
+        positions.append(tracker.position)
+    assert positions == [EXPECTED[name] for name in sorted(EXPECTED)] + [None]
+
+
+def test_filtered_png_matches_unfiltered():
+    image = load_png(fixture('jump_screen_1.png'))
+    assert image.shape == (360, 1200, 3)
+    assert np.array_equal(decode_png(encode_png(image)), image)